@@ -8,6 +8,7 @@ import sys
 import logging
 import importlib
 import inspect
+import threading
 
 from flask import json
 
@@ -40,13 +41,25 @@ class InferenceEngineFactory:
     _engine_types = {}
     _engine_display_names = {}
     _discovery_complete = False
+    _discovery_lock = threading.RLock()
     
     @classmethod
     def _discover_engines(cls):
-        """Automatically discover and register engine classes from the engines folder"""
+        """Automatically discover and register engine classes from the engines folder
+        
+        Discovery may be started from a background thread during node startup,
+        so concurrent callers wait for the scan in progress instead of running
+        their own.
+        """
         if cls._discovery_complete:
             return
-            
+        with cls._discovery_lock:
+            if not cls._discovery_complete:
+                cls._scan_engines()
+    
+    @classmethod
+    def _scan_engines(cls):
+        """Import the modules in the engines folder and register their engine classes"""
         logger.info("Starting automatic engine discovery...")
         
         # Get the engines directory path
@@ -361,10 +374,11 @@ class InferenceEngineFactory:
     @classmethod
     def rediscover_engines(cls):
         """Force re-discovery of engines (useful for development)"""
-        cls._discovery_complete = False
-        cls._engine_types.clear()
-        cls._engine_display_names.clear()
-        cls._discover_engines()
+        with cls._discovery_lock:
+            cls._discovery_complete = False
+            cls._engine_types.clear()
+            cls._engine_display_names.clear()
+            cls._discover_engines()
         logger.info("Forced engine re-discovery completed")
     
     @classmethod
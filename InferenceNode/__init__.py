@@ -6,11 +6,18 @@ This package contains the main inference node implementation and supporting comp
 
 from .inference_node import InferenceNode
 
-# Try to import optional components
-try:
-    from .telemetry import NodeTelemetry
-except ImportError:
-    NodeTelemetry = None
+
+def __getattr__(name):
+    """Import optional components on first access; NodeTelemetry is None without psutil"""
+    if name == "NodeTelemetry":
+        try:
+            from .telemetry import NodeTelemetry
+        except ImportError:
+            NodeTelemetry = None
+        globals()[name] = NodeTelemetry
+        return NodeTelemetry
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __version__ = "1.0.0"
 __all__ = ["InferenceNode", "NodeTelemetry"]
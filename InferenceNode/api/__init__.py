@@ -2,48 +2,85 @@
 API module for InferenceNode
 Handles route registration for all API endpoints
 """
+import importlib
+import json
+
+from flask import Blueprint
+
+# (module, register function) pairs, in registration order. Modules are
+# imported on demand by register_routes so importing the api package stays
+# cheap and each route module's dependencies load only when registered.
+_ROUTE_REGISTRARS = [
+    # Web page routes
+    ('routes_web', 'register_web_routes'),
+    # API routes
+    ('routes_models', 'register_model_routes'),
+    ('routes_publisher', 'register_publisher_routes'),
+    ('routes_pipelines', 'register_pipeline_routes'),
+    ('routes_telemetry', 'register_telemetry_routes'),
+    ('routes_hardware', 'register_hardware_routes'),
+    ('routes_logs', 'register_log_routes'),
+    ('routes_node', 'register_node_routes'),
+    ('routes_discovery', 'register_discovery_routes'),
+    ('routes_frame_sources', 'register_frame_source_routes'),
+    ('routes_engines', 'register_engine_routes'),
+]
+
+
+def preload_route_modules():
+    """Import the route modules and their helpers ahead of register_routes
+    
+    Meant to run on a background thread while the node is still starting up,
+    so the imports overlap with other initialization instead of delaying it.
+    """
+    for module_name in ('responses', 'io_pool', 'compression', 'errors'):
+        importlib.import_module(f'.{module_name}', __package__)
+    for module_name, _ in _ROUTE_REGISTRARS:
+        importlib.import_module(f'.{module_name}', __package__)
+
 
 def register_routes(app, node):
-    """Register all API routes with the Flask app"""
-    from .routes_models import register_model_routes
-    from .routes_web import register_web_routes
-    from .routes_publisher import register_publisher_routes
-    from .routes_pipelines import register_pipeline_routes
-    from .routes_telemetry import register_telemetry_routes
-    from .routes_hardware import register_hardware_routes
-    from .routes_logs import register_log_routes
-    from .routes_node import register_node_routes
-    from .routes_discovery import register_discovery_routes
-    from .routes_frame_sources import register_frame_source_routes
-    from .routes_engines import register_engine_routes
-    
-    # Register web page routes
-    register_web_routes(app, node)
-    
-    # Register API routes
-    register_model_routes(app, node)
-    register_publisher_routes(app, node)
-    register_pipeline_routes(app, node)
-    register_telemetry_routes(app, node)
-    register_hardware_routes(app, node)
-    register_log_routes(app, node)
-    register_node_routes(app, node)
-    register_discovery_routes(app, node)
-    register_frame_source_routes(app, node)
-    register_engine_routes(app, node)
+    """Register all API routes with the Flask app
+    
+    Each route module registers its views on its own Blueprint (named after
+    the module, e.g. 'discovery'), which is then attached to the app once.
+    """
+    # Fast JSON encoding for every jsonify() response
+    from .responses import install_json_provider
+    install_json_provider(app)
+    
+    # Shared bounded pool for routes that fan out network-bound work
+    from .io_pool import init_io_pool
+    init_io_pool(app)
+    
+    # gzip/Brotli for JSON bodies on the way out
+    from .compression import init_compression
+    init_compression(app)
+    
+    for module_name, register_name in _ROUTE_REGISTRARS:
+        module = importlib.import_module(f'.{module_name}', __package__)
+        blueprint = Blueprint(module_name[len('routes_'):], module.__name__)
+        getattr(module, register_name)(blueprint, node)
+        app.register_blueprint(blueprint)
+    
+    # App-wide JSON error handlers; API routes raise instead of catching
+    from .errors import register_error_handlers
+    register_error_handlers(app, node)
     
     # Health check endpoint
     from flask import jsonify
-    from datetime import datetime
+    from .responses import json_response
+    from ..utils import iso_now
+    
+    # Only the timestamp varies between health checks, so the rest of the body
+    # is serialized once here and the handler just appends the current time
+    version = node.node_info.get('version', getattr(node, '__version__', '0.1.0'))
+    health_body_prefix = f'{{"status":"healthy","version":{json.dumps(version)},"timestamp":"'.encode('utf-8')
     
     @app.route('/health', methods=['GET'])
     def health_check():
         """Health check endpoint for Docker and monitoring"""
-        return jsonify({
-            'status': 'healthy',
-            'timestamp': datetime.now().isoformat(),
-            'version': node.node_info.get('version', getattr(node, '__version__', '0.1.0'))
-        })
+        return json_response(health_body_prefix + iso_now().encode('ascii') + b'"}')
     
     @app.route('/api/info', methods=['GET'])
     def get_node_info():
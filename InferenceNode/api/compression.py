@@ -0,0 +1,71 @@
+"""
+Response compression for InferenceNode API routes
+Handles gzip and Brotli encoding of JSON responses
+"""
+import gzip
+
+from flask import request
+
+# Brotli is optional; gzip is used when it is not installed
+try:
+    import brotli
+    HAS_BROTLI = True
+except ImportError:
+    brotli = None
+    HAS_BROTLI = False
+
+# Only JSON bodies are compressed; MJPEG frames and images are already compressed
+COMPRESS_MIMETYPES = frozenset({'application/json'})
+
+# Smaller bodies fit in a packet anyway and are not worth the CPU
+COMPRESS_MIN_SIZE = 500
+
+# Low levels keep per-request CPU small while still shrinking repetitive JSON a lot
+GZIP_LEVEL = 4
+BROTLI_QUALITY = 4
+
+
+def _choose_encoding():
+    """Pick the best content coding the client accepts, or None"""
+    accepted = request.accept_encodings
+    if HAS_BROTLI and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+
+def _compress_response(response):
+    if (response.status_code != 200
+            or response.direct_passthrough
+            or response.is_streamed
+            or response.mimetype not in COMPRESS_MIMETYPES
+            or 'Content-Encoding' in response.headers):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = _choose_encoding()
+    if encoding is None:
+        return response
+
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return response
+
+    if encoding == 'br':
+        response.set_data(brotli.compress(data, quality=BROTLI_QUALITY))
+    else:
+        response.set_data(gzip.compress(data, compresslevel=GZIP_LEVEL))
+    response.headers['Content-Encoding'] = encoding
+
+    # The encoded bytes differ from the identity body, so a strong ETag
+    # computed on the JSON no longer holds; keep it as a weak validator
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_compression(app):
+    """Compress JSON responses for clients that accept gzip or Brotli"""
+    app.after_request(_compress_response)
@@ -0,0 +1,41 @@
+"""
+API error handling for InferenceNode
+Defines service-unavailable exceptions and registers app-wide JSON error handlers
+"""
+from flask import request
+from werkzeug.exceptions import HTTPException, InternalServerError, ServiceUnavailable
+
+from .responses import error_response
+
+
+class DiscoveryUnavailable(ServiceUnavailable):
+    """Raised by discovery routes when the node runs without a discovery manager"""
+    description = 'Discovery manager not available'
+
+
+class LogManagerUnavailable(InternalServerError):
+    """Raised by log routes when the node runs without a log manager"""
+    description = 'Log manager not available'
+
+
+def _is_api_request() -> bool:
+    return request.path.startswith('/api/')
+
+
+def register_error_handlers(app, node):
+    """Register JSON error handlers so API routes can raise instead of catching"""
+
+    @app.errorhandler(HTTPException)
+    def handle_http_exception(e):
+        """Render HTTP errors raised by API routes as {"error": description}"""
+        if not _is_api_request():
+            return e
+        return error_response(e.description, e.code)
+
+    @app.errorhandler(Exception)
+    def handle_unexpected_exception(e):
+        """Log unhandled route errors and answer with a 500"""
+        node.logger.error("Unhandled error on %s: %s", request.path, e)
+        if not _is_api_request():
+            return InternalServerError()
+        return error_response(str(e), 500)
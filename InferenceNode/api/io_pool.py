@@ -0,0 +1,26 @@
+"""
+Shared I/O thread pool for InferenceNode API routes
+Bounds the threads used by routes that fan out network-bound work
+"""
+import atexit
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from flask import current_app
+
+IO_POOL_EXTENSION = 'io_pool'
+
+
+def init_io_pool(app) -> ThreadPoolExecutor:
+    """Create the app's shared I/O pool and shut it down at interpreter exit"""
+    pool = ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 4) * 4),
+                              thread_name_prefix='api-io')
+    app.extensions[IO_POOL_EXTENSION] = pool
+    atexit.register(pool.shutdown, wait=False)
+    return pool
+
+
+def get_io_pool() -> Optional[ThreadPoolExecutor]:
+    """Get the shared I/O pool of the current app, if one was created"""
+    return current_app.extensions.get(IO_POOL_EXTENSION)
@@ -0,0 +1,135 @@
+"""
+Background jobs for InferenceNode API routes
+Handles long-running work on daemon threads with progress clients can follow
+"""
+import os
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Seconds a finished job, and any file it produced, is kept for the client to collect
+JOB_RETENTION = 600.0
+
+
+class Job:
+    """State and progress of one background job
+
+    Every change bumps a sequence number and wakes waiters, so progress
+    streams block in wait() instead of polling.
+    """
+
+    def __init__(self, kind: str):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.state = 'running'
+        self.progress = {}
+        self.result = None
+        self.error = None
+        self.finished_at = None
+        # File produced by the job; removed when the job is discarded
+        self.output_path = None
+        self._seq = 0
+        self._changed = threading.Condition()
+
+    def _publish(self):
+        self._seq += 1
+        self._changed.notify_all()
+
+    def update(self, **progress):
+        """Merge fields into the job's progress and notify waiters"""
+        with self._changed:
+            self.progress.update(progress)
+            self._publish()
+
+    def finish(self, result: Any = None):
+        """Mark the job as done with a JSON-serializable result"""
+        with self._changed:
+            self.state = 'done'
+            self.result = result
+            self.finished_at = time.monotonic()
+            self._publish()
+
+    def fail(self, error: str):
+        """Mark the job as failed with an error message"""
+        with self._changed:
+            self.state = 'error'
+            self.error = error
+            self.finished_at = time.monotonic()
+            self._publish()
+
+    def snapshot(self) -> dict:
+        """Get a JSON-serializable view of the job"""
+        with self._changed:
+            return {
+                'job_id': self.id,
+                'kind': self.kind,
+                'state': self.state,
+                'progress': dict(self.progress),
+                'result': self.result,
+                'error': self.error
+            }
+
+    def wait(self, last_seq: int, timeout: float) -> Tuple[int, bool]:
+        """Block until the job changes after last_seq or timeout passes
+
+        Returns (seq, changed) where seq is the sequence number to pass next time.
+        """
+        with self._changed:
+            changed = self._changed.wait_for(lambda: self._seq != last_seq, timeout)
+            return self._seq, changed
+
+
+class JobRegistry:
+    """Jobs keyed by id, each run on its own daemon thread
+
+    Finished jobs are dropped JOB_RETENTION seconds after they end, or as soon
+    as discard() is called once their result has been collected.
+    """
+
+    def __init__(self, logger, retention: float = JOB_RETENTION):
+        self.logger = logger
+        self.retention = retention
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def start(self, kind: str, target: Callable[..., Any], *args) -> Job:
+        """Run target(job, *args) in the background; its return value becomes the result"""
+        self._prune()
+        job = Job(kind)
+        with self._lock:
+            self._jobs[job.id] = job
+        thread = threading.Thread(target=self._run, args=(job, target, args),
+                                  name=f'{kind}-job', daemon=True)
+        thread.start()
+        return job
+
+    def _run(self, job: Job, target: Callable[..., Any], args: tuple):
+        try:
+            job.finish(target(job, *args))
+        except Exception as e:
+            self.logger.error(f"{job.kind} job {job.id} failed: {str(e)}")
+            job.fail(str(e))
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Get a job by id, or None if it is unknown or expired"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def discard(self, job_id: str):
+        """Forget a job and delete the file it produced"""
+        with self._lock:
+            job = self._jobs.pop(job_id, None)
+        if job is not None and job.output_path:
+            try:
+                os.unlink(job.output_path)
+            except OSError:
+                pass
+
+    def _prune(self):
+        cutoff = time.monotonic() - self.retention
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items()
+                       if job.finished_at is not None and job.finished_at < cutoff]
+        for job_id in expired:
+            self.discard(job_id)
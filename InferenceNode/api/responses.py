@@ -0,0 +1,237 @@
+"""
+Shared response helpers for InferenceNode API routes
+Handles pre-serialized JSON bodies and cached payloads
+"""
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+from flask import Response, request
+from werkzeug.exceptions import BadRequest, RequestEntityTooLarge
+
+# orjson is optional; it encodes in C and returns bytes directly
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    orjson = None
+    HAS_ORJSON = False
+
+
+# msgspec is optional; without it clients asking for MessagePack get JSON
+try:
+    import msgspec
+    HAS_MSGSPEC = True
+except ImportError:
+    msgspec = None
+    HAS_MSGSPEC = False
+
+MSGPACK_MIMETYPE = 'application/msgpack'
+
+
+# Flask 2.2+ lets apps replace the encoder behind jsonify()
+try:
+    from flask.json.provider import DefaultJSONProvider
+except ImportError:
+    DefaultJSONProvider = None
+
+
+def json_bytes(payload: Any) -> bytes:
+    """Serialize a payload to compact JSON bytes"""
+    if HAS_ORJSON:
+        return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
+
+def _msgpack_default(obj: Any) -> Any:
+    """Convert numpy scalars and arrays, which msgspec cannot encode natively"""
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    raise NotImplementedError(f'Cannot encode {type(obj).__name__} as MessagePack')
+
+
+_msgpack_encoder = msgspec.msgpack.Encoder(enc_hook=_msgpack_default) if HAS_MSGSPEC else None
+
+
+def wants_msgpack() -> bool:
+    """Check whether the client prefers MessagePack to JSON and it can be produced"""
+    if not HAS_MSGSPEC:
+        return False
+    return request.accept_mimetypes.best_match(['application/json', MSGPACK_MIMETYPE]) == MSGPACK_MIMETYPE
+
+
+def negotiated_response(payload: Any) -> Response:
+    """Serialize a payload as MessagePack or JSON, following the Accept header"""
+    if wants_msgpack():
+        response = Response(_msgpack_encoder.encode(payload), mimetype=MSGPACK_MIMETYPE)
+    else:
+        response = json_response(json_bytes(payload))
+    response.vary.add('Accept')
+    return response
+
+
+def json_loads(raw: bytes) -> Any:
+    """Parse JSON bytes, raising ValueError on malformed input"""
+    if HAS_ORJSON:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+# Largest JSON request body request_json() will read and parse
+MAX_JSON_BODY_BYTES = 16 * 1024 ** 2
+
+
+def request_json(default: Any = None, max_length: int = MAX_JSON_BODY_BYTES) -> Any:
+    """Parse the raw request body as JSON, skipping Flask's get_json wrapper
+
+    Returns default for an empty body, raises BadRequest for malformed JSON and
+    RequestEntityTooLarge for bodies over max_length bytes. A declared
+    Content-Length is checked before anything is read.
+    """
+    if request.content_length is not None and request.content_length > max_length:
+        raise RequestEntityTooLarge(f'JSON body exceeds {max_length} bytes')
+    raw = request.get_data(cache=False)
+    if len(raw) > max_length:
+        raise RequestEntityTooLarge(f'JSON body exceeds {max_length} bytes')
+    if not raw:
+        return default
+    try:
+        return json_loads(raw)
+    except ValueError:
+        raise BadRequest('Invalid JSON body')
+
+
+def json_response(body: bytes, status: int = 200) -> Response:
+    """Wrap pre-serialized JSON bytes in a Flask response"""
+    return Response(body, status=status, mimetype='application/json')
+
+
+def error_response(message: str, status: int = 500) -> Response:
+    """Build a JSON error response of the form {"error": message}"""
+    return json_response(json_bytes({'error': message}), status)
+
+
+def json_array_chunks(items: List[Any], chunk_size: int = 200) -> Iterator[bytes]:
+    """Yield a JSON array of items as byte chunks of at most chunk_size elements"""
+    yield b'['
+    for start in range(0, len(items), chunk_size):
+        chunk = json_bytes(items[start:start + chunk_size])
+        if start:
+            yield b','
+        yield chunk[1:-1]
+    yield b']'
+
+
+def payload_etag(body: bytes) -> str:
+    """Compute a short content hash of a serialized body for use as an ETag"""
+    return hashlib.blake2b(body, digest_size=8).hexdigest()
+
+
+def conditional_json_response(body: bytes, etag: str, max_age: Optional[int] = None) -> Response:
+    """Build a JSON response with an ETag, answering 304 if the client copy is current"""
+    response = json_response(body)
+    response.set_etag(etag)
+    if max_age is not None:
+        response.cache_control.max_age = max_age
+    return response.make_conditional(request)
+
+
+def not_modified_if_current(etag: str) -> Optional[Response]:
+    """Return a 304 response if the client already holds etag, else None
+    
+    Lets routes skip building and serializing a payload the client has cached.
+    """
+    # Compressed responses carry weak ETags, so compare weakly as make_conditional does
+    if not request.if_none_match.contains_weak(etag):
+        return None
+    response = Response(status=304)
+    response.set_etag(etag)
+    return response
+
+
+class CachedPayload:
+    """JSON payload that is built once and reused until it expires
+
+    Args:
+        builder: Callable returning the JSON-serializable payload
+        ttl: Seconds before the payload is rebuilt, or None to keep it forever
+    """
+
+    def __init__(self, builder: Callable[[], Any], ttl: Optional[float] = None):
+        self.builder = builder
+        self.ttl = ttl
+        self._entry = None  # (body, etag, built_at)
+        self._lock = threading.Lock()
+
+    def _fresh_entry(self) -> Optional[Tuple[bytes, str, float]]:
+        entry = self._entry
+        if entry is not None and (self.ttl is None or time.monotonic() - entry[2] < self.ttl):
+            return entry
+        return None
+
+    def _get_entry(self) -> Tuple[bytes, str, float]:
+        entry = self._fresh_entry()
+        if entry is None:
+            with self._lock:
+                entry = self._fresh_entry()
+                if entry is None:
+                    body = json_bytes(self.builder())
+                    entry = (body, payload_etag(body), time.monotonic())
+                    self._entry = entry
+        return entry
+
+    def get(self) -> bytes:
+        """Get the serialized payload, rebuilding it if stale"""
+        return self._get_entry()[0]
+
+    def response(self, max_age: Optional[int] = None) -> Response:
+        """Serve the payload with an ETag, returning 304 when the client copy is current"""
+        body, etag, _ = self._get_entry()
+        return conditional_json_response(body, etag, max_age)
+
+    def invalidate(self):
+        """Force the payload to be rebuilt on the next request"""
+        self._entry = None
+
+
+if HAS_ORJSON and DefaultJSONProvider is not None:
+    class OrjsonProvider(DefaultJSONProvider):
+        """Flask JSON provider that encodes with orjson
+        
+        Types orjson cannot encode (and datetimes, to keep Flask's HTTP date
+        format) are passed to Flask's default hook. Calls with options orjson
+        does not support, such as indent, use the stdlib provider.
+        """
+        
+        def _options(self) -> int:
+            options = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME
+            if self.sort_keys:
+                options |= orjson.OPT_SORT_KEYS
+            return options
+        
+        def _encode(self, obj: Any) -> bytes:
+            return orjson.dumps(obj, default=self.default, option=self._options())
+        
+        def dumps(self, obj: Any, **kwargs: Any) -> str:
+            if kwargs.keys() - {'separators'}:
+                return super().dumps(obj, **kwargs)
+            return self._encode(obj).decode('utf-8')
+        
+        def loads(self, s, **kwargs: Any) -> Any:
+            if kwargs:
+                return super().loads(s, **kwargs)
+            return orjson.loads(s)
+        
+        def response(self, *args: Any, **kwargs: Any) -> Response:
+            obj = self._prepare_response_obj(args, kwargs)
+            return self._app.response_class(self._encode(obj), mimetype=self.mimetype)
+else:
+    OrjsonProvider = None
+
+
+def install_json_provider(app):
+    """Make jsonify() encode with orjson when it is installed"""
+    if OrjsonProvider is not None:
+        app.json = OrjsonProvider(app)
@@ -3,8 +3,17 @@ Node discovery API routes for InferenceNode
 Handles network discovery and node management
 """
 
-from flask import jsonify, request
-from datetime import datetime
+from flask import jsonify
+
+from .errors import DiscoveryUnavailable
+from .io_pool import get_io_pool
+from .responses import json_bytes, json_response, request_json
+from ..utils import iso_now
+
+# Constant error bodies, serialized once at import
+NODE_NOT_FOUND_BODY = json_bytes({'error': 'Node not found'})
+ACTION_REQUIRED_BODY = json_bytes({'error': 'Action required'})
+OPERATIONS_REQUIRED_BODY = json_bytes({'error': 'ops list required'})
 
 
 def register_discovery_routes(app, node):
@@ -13,78 +22,88 @@ def register_discovery_routes(app, node):
     @app.route('/api/discovery/nodes', methods=['GET'])
     def get_discovered_nodes():
         """Get all discovered nodes"""
-        try:
-            if not node.discovery_manager:
-                return jsonify({'error': 'Discovery manager not available'}), 503
-            
-            nodes = node.discovery_manager.get_discovered_nodes()
-            return jsonify({
-                'nodes': nodes,
-                'count': len(nodes),
-                'timestamp': datetime.now().isoformat()
-            })
-        except Exception as e:
-            node.logger.error(f"Get discovered nodes error: {str(e)}")
-            return jsonify({'error': str(e)}), 500
+        if not node.discovery_manager:
+            raise DiscoveryUnavailable()
+        
+        nodes = node.discovery_manager.get_discovered_nodes()
+        return jsonify({
+            'nodes': nodes,
+            'count': len(nodes),
+            'timestamp': iso_now()
+        })
     
     @app.route('/api/discovery/nodes/refresh', methods=['POST'])
     def refresh_discovered_nodes():
         """Refresh all discovered nodes"""
-        try:
-            if not node.discovery_manager:
-                return jsonify({'error': 'Discovery manager not available'}), 503
-            
-            # Trigger refresh of all nodes
-            node.discovery_manager.refresh_all_nodes()
-            
-            # Return updated node list
-            nodes = node.discovery_manager.get_discovered_nodes()
-            return jsonify({
-                'success': True,
-                'message': 'Nodes refreshed successfully',
-                'nodes': nodes,
-                'count': len(nodes),
-                'timestamp': datetime.now().isoformat()
-            })
-        except Exception as e:
-            node.logger.error(f"Refresh discovered nodes error: {str(e)}")
-            return jsonify({'error': str(e)}), 500
+        if not node.discovery_manager:
+            raise DiscoveryUnavailable()
+        
+        # Trigger refresh of all nodes
+        node.discovery_manager.refresh_all_nodes(executor=get_io_pool())
+        
+        # Return updated node list
+        nodes = node.discovery_manager.get_discovered_nodes()
+        return jsonify({
+            'success': True,
+            'message': 'Nodes refreshed successfully',
+            'nodes': nodes,
+            'count': len(nodes),
+            'timestamp': iso_now()
+        })
     
     @app.route('/api/discovery/nodes/<node_id>', methods=['GET'])
     def get_discovered_node(node_id):
         """Get specific discovered node information"""
-        try:
-            if not node.discovery_manager:
-                return jsonify({'error': 'Discovery manager not available'}), 503
-            
-            discovered_node = node.discovery_manager.get_node(node_id)
-            if not discovered_node:
-                return jsonify({'error': 'Node not found'}), 404
-            
-            return jsonify(discovered_node)
-        except Exception as e:
-            node.logger.error(f"Get discovered node error: {str(e)}")
-            return jsonify({'error': str(e)}), 500
+        if not node.discovery_manager:
+            raise DiscoveryUnavailable()
+        
+        discovered_node = node.discovery_manager.get_node(node_id)
+        if not discovered_node:
+            return json_response(NODE_NOT_FOUND_BODY, 404)
+        
+        return jsonify(discovered_node)
     
     @app.route('/api/discovery/nodes/<node_id>/control', methods=['POST'])
     def control_discovered_node(node_id):
         """Control discovered node operations"""
+        if not node.discovery_manager:
+            raise DiscoveryUnavailable()
+        
+        data = request_json({})
+        if not isinstance(data, dict):
+            data = {}
+        action = data.get('action')
+        
+        if not action:
+            return json_response(ACTION_REQUIRED_BODY, 400)
+        
+        result = node.discovery_manager.control_node(node_id, action)
+        
+        if 'error' in result:
+            return jsonify(result), 400
+        
+        return jsonify(result)
+    
+    @app.route('/api/discovery/nodes/control/batch', methods=['POST'])
+    def control_discovered_nodes_batch():
+        """Run several node control operations in one request"""
+        if not node.discovery_manager:
+            raise DiscoveryUnavailable()
+        
+        data = request_json({})
+        if not isinstance(data, dict):
+            data = {}
+        operations = data.get('ops')
+        
+        if not isinstance(operations, list):
+            return json_response(OPERATIONS_REQUIRED_BODY, 400)
+        
         try:
-            if not node.discovery_manager:
-                return jsonify({'error': 'Discovery manager not available'}), 503
-            
-            data = request.get_json()
-            action = data.get('action')
-            
-            if not action:
-                return jsonify({'error': 'Action required'}), 400
-            
-            result = node.discovery_manager.control_node(node_id, action)
-            
-            if 'error' in result:
-                return jsonify(result), 400
-            
-            return jsonify(result)
-        except Exception as e:
-            node.logger.error(f"Control discovered node error: {str(e)}")
-            return jsonify({'error': str(e)}), 500
+            results = node.discovery_manager.control_nodes_batch(operations, executor=get_io_pool())
+        except ValueError as e:
+            # Too many operations for one batch
+            return jsonify({'error': str(e)}), 400
+        return jsonify({
+            'results': results,
+            'count': len(results)
+        })
@@ -2,24 +2,27 @@
 Inference Engine API Routes
 Handles inference engine discovery and information
 """
-from flask import jsonify
+from InferenceEngine import InferenceEngineFactory
+
+from .responses import CachedPayload, json_response
 
 
 def register_engine_routes(app, node):
     """Register all inference engine-related routes"""
     
+    def build_engine_listing():
+        """Build the /api/inference/engines payload (a bare list of engine metadata)"""
+        return InferenceEngineFactory.get_available_engines_with_metadata()
+    
+    # The engine registry is fixed once the node has started, so the listing is
+    # built at registration; call engines_cache.invalidate() if that changes
+    engines_cache = CachedPayload(build_engine_listing)
+    try:
+        engines_cache.get()
+    except Exception as e:
+        node.logger.warning("Could not prebuild inference engine listing: %s", e)
+    
     @app.route('/api/inference/engines', methods=['GET'])
     def get_inference_engines():
         """Get available inference engines with their metadata"""
-        try:
-            from InferenceEngine import InferenceEngineFactory
-            engine_types = InferenceEngineFactory.get_available_engines_with_metadata()
-            
-            return jsonify({
-                'status': 'success',
-                'engine_types': engine_types
-            })
-            
-        except Exception as e:
-            node.logger.error(f"Get inference engines error: {str(e)}")
-            return jsonify({'error': str(e)}), 500
+        return json_response(engines_cache.get())
@@ -2,81 +2,112 @@
 Frame Source API Routes
 Handles frame source discovery and configuration
 """
+import inspect
+
 from flask import request, jsonify
 
+from .responses import CachedPayload, json_bytes, json_response
+
+# Served when the frame_source package is not installed; serialized once at import.
+# Clients detect it through the FALLBACK_HEADER response header.
+FALLBACK_FRAME_SOURCES_BODY = json_bytes([
+    {
+        'type': 'webcam',
+        'name': 'Webcam',
+        'description': 'Local webcam or camera device',
+        'icon': 'fas fa-video',
+        'primary': True,
+        'available': True,
+        'config_schema': {
+            'fields': [
+                {'name': 'source', 'type': 'number', 'label': 'Camera Index', 'default': 0, 'required': True},
+                {'name': 'width', 'type': 'number', 'label': 'Width', 'default': 640, 'required': False},
+                {'name': 'height', 'type': 'number', 'label': 'Height', 'default': 480, 'required': False}
+            ]
+        }
+    }
+])
+FALLBACK_HEADER = 'X-Frame-Sources-Fallback'
+
+# Seconds clients may reuse the frame source listing before revalidating
+FRAME_SOURCES_MAX_AGE = 30
+
+
+def _get_frame_source_class(factory, source_type):
+    """Look up the frame source class registered for source_type, if the factory exposes it
+    
+    Only the public get_class() API is used; factories without it return None
+    and callers fall back to creating an instance.
+    """
+    get_class = getattr(factory, 'get_class', None)
+    if callable(get_class):
+        return get_class(source_type)
+    return None
+
+
+def _has_class_level_discover(source_class) -> bool:
+    """Check whether discover() can be called without an instance"""
+    try:
+        discover = inspect.getattr_static(source_class, 'discover')
+    except AttributeError:
+        return False
+    return isinstance(discover, (classmethod, staticmethod))
+
 
 def register_frame_source_routes(app, node):
     """Register all frame source-related routes"""
     
+    def build_frame_source_listing():
+        """Build the /api/frame-sources list, adding upload support to video_file"""
+        from frame_source import get_available_sources
+        frame_sources = get_available_sources()
+        
+        # Enhance video_file source with upload capability
+        for source in frame_sources:
+            if source.get('type') == 'video_file' and 'config_schema' in source:
+                schema = source['config_schema']
+                # Check if it has a fields array
+                if 'fields' in schema and isinstance(schema['fields'], list):
+                    fields = schema['fields']
+                    fields_by_name = {f.get('name'): f for f in fields}
+                    # Check if upload_file field doesn't already exist
+                    if 'upload_file' not in fields_by_name:
+                        # Insert upload_file field at the beginning
+                        upload_field = {
+                            'name': 'upload_file',
+                            'type': 'file',
+                            'label': 'Upload Video File',
+                            'description': 'Upload a video file (MP4, AVI, MOV, etc.)',
+                            'accept': '.mp4,.avi,.mov,.mkv,.wmv,.flv,.webm,.m4v,.mpg,.mpeg',
+                            'upload_endpoint': '/api/media/upload-video',
+                            'required': False
+                        }
+                        fields.insert(0, upload_field)
+                        
+                        # Update the source field description to mention upload
+                        source_field = fields_by_name.get('source')
+                        if source_field:
+                            source_field['description'] = 'Path to the video file (auto-populated after upload, or enter manually)'
+                            source_field['placeholder'] = 'Enter file path or upload a video above'
+        
+        return frame_sources
+    
+    # get_available_sources() is static for the process lifetime, so the enhanced
+    # listing is built and serialized once on first request
+    frame_sources_cache = CachedPayload(build_frame_source_listing)
+    
     @app.route('/api/frame-sources', methods=['GET'])
     def get_frame_sources():
         """Get available frame source types with their metadata"""
         try:
-            from frame_source import get_available_sources
-            frame_sources = get_available_sources()
-            
-            # Enhance video_file source with upload capability
-            for source in frame_sources:
-                if source.get('type') == 'video_file' and 'config_schema' in source:
-                    schema = source['config_schema']
-                    # Check if it has a fields array
-                    if 'fields' in schema and isinstance(schema['fields'], list):
-                        # Check if upload_file field doesn't already exist
-                        has_upload_field = any(f.get('name') == 'upload_file' for f in schema['fields'])
-                        if not has_upload_field:
-                            # Insert upload_file field at the beginning
-                            upload_field = {
-                                'name': 'upload_file',
-                                'type': 'file',
-                                'label': 'Upload Video File',
-                                'description': 'Upload a video file (MP4, AVI, MOV, etc.)',
-                                'accept': '.mp4,.avi,.mov,.mkv,.wmv,.flv,.webm,.m4v,.mpg,.mpeg',
-                                'upload_endpoint': '/api/media/upload-video',
-                                'required': False
-                            }
-                            schema['fields'].insert(0, upload_field)
-                            
-                            # Update the source field description to mention upload
-                            for field in schema['fields']:
-                                if field.get('name') == 'source':
-                                    field['description'] = 'Path to the video file (auto-populated after upload, or enter manually)'
-                                    field['placeholder'] = 'Enter file path or upload a video above'
-            
-            return jsonify({
-                'status': 'success',
-                'frame_sources': frame_sources
-            })
+            return frame_sources_cache.response(max_age=FRAME_SOURCES_MAX_AGE)
             
         except ImportError as e:
-            node.logger.warning(f"FrameSource module not available: {str(e)}. Using fallback frame sources.")
+            node.logger.warning("FrameSource module not available: %s. Using fallback frame sources.", e)
             # Provide fallback frame sources
-            fallback_sources = [
-                {
-                    'type': 'webcam',
-                    'name': 'Webcam',
-                    'description': 'Local webcam or camera device',
-                    'icon': 'fas fa-video',
-                    'primary': True,
-                    'available': True,
-                    'config_schema': {
-                        'fields': [
-                            {'name': 'source', 'type': 'number', 'label': 'Camera Index', 'default': 0, 'required': True},
-                            {'name': 'width', 'type': 'number', 'label': 'Width', 'default': 640, 'required': False},
-                            {'name': 'height', 'type': 'number', 'label': 'Height', 'default': 480, 'required': False}
-                        ]
-                    }
-                }
-            ]
-            
-            return jsonify({
-                'status': 'success',
-                'frame_sources': fallback_sources,
-                'fallback': True
-            })
-            
-        except Exception as e:
-            node.logger.error(f"Get frame sources error: {str(e)}")
-            return jsonify({'error': str(e)}), 500
+            response = json_response(FALLBACK_FRAME_SOURCES_BODY)
+            response.headers[FALLBACK_HEADER] = 'true'
+            return response
     
     @app.route('/api/frame-sources/<source_type>/discover', methods=['GET'])
     def discover_frame_sources(source_type):
@@ -97,26 +128,23 @@ def register_frame_source_routes(app, node):
                 # else:
                 #     # Try to create a frame source instance for discovery
                 try:
-                    frame_source = FrameSourceFactory.create(capture_type=source_type)
-                    if hasattr(frame_source, 'discover'):
-                        discovered = frame_source.discover()
-                        # Ensure the returned data has the expected format
-                        if isinstance(discovered, list):
-                            devices = discovered
-                        else:
-                            devices = []
-                    elif hasattr(frame_source.__class__, 'discover'):
-                        discovered = frame_source.__class__.discover()
-                        if isinstance(discovered, list):
-                            devices = discovered
-                        else:
-                            devices = []
+                    # Prefer a class-level discover() so no device handle is opened
+                    source_class = _get_frame_source_class(FrameSourceFactory, source_type)
+                    if source_class is not None and _has_class_level_discover(source_class):
+                        discovered = source_class.discover()
                     else:
-                        devices = []
+                        frame_source = FrameSourceFactory.create(capture_type=source_type)
+                        try:
+                            discovered = frame_source.discover() if hasattr(frame_source, 'discover') else []
+                        finally:
+                            if hasattr(frame_source, 'close'):
+                                frame_source.close()
                     
+                    # Ensure the returned data has the expected format
+                    devices = discovered if isinstance(discovered, list) else []
                     success = True
                 except Exception as inner_e:
-                    app.logger.debug(f"Could not create {source_type} frame source for discovery: {str(inner_e)}")
+                    node.logger.debug("Could not create %s frame source for discovery: %s", source_type, inner_e)
                     devices = []
                 
                 # app.logger.info(f"Discovered {len(devices)} devices for {source_type}")
@@ -138,7 +166,7 @@ def register_frame_source_routes(app, node):
             })
             
         except Exception as e:
-            app.logger.error(f"Frame source device discovery error for {source_type}: {str(e)}")
+            node.logger.error("Frame source device discovery error for %s: %s", source_type, e)
             return jsonify({
                 'success': False,
                 'error': str(e),
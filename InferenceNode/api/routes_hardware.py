@@ -3,82 +3,73 @@ Hardware detection API routes for InferenceNode
 Handles hardware information and device formatting
 """
 
-from flask import jsonify, request
+from flask import jsonify
+
+from .responses import CachedPayload, json_bytes, json_response, request_json
+
+# Constant error bodies, serialized once at import
+MISSING_FORMAT_FIELDS_BODY = json_bytes({'error': 'Missing required fields: engine and device'})
+INVALID_FORMAT_FIELDS_BODY = json_bytes({'error': 'engine and device must be strings'})
+
+# Hardware topology is static for the node's lifetime, so the payload is only
+# rebuilt every HARDWARE_CACHE_TTL seconds or when the detector reports a change
+HARDWARE_CACHE_TTL = 30.0
 
 
 def register_hardware_routes(app, node):
     """Register all hardware-related routes with the Flask app"""
     
+    def build_hardware_info():
+        """Build the /api/hardware payload from the hardware detector"""
+        # Every detector call below reads the hardware_info captured at startup,
+        # so there is no device I/O to overlap; bind the detector once instead
+        detector = node.hardware_detector
+        
+        hardware_info = {
+            'detected_hardware': detector.hardware_info,
+            'available_devices': detector.available_devices,
+            'optimal_device': detector.get_optimal_device_for_hardware(),
+            'intel_gpu_details': detector.get_intel_gpu_summary(),
+            'nvidia_gpu_details': detector.get_nvidia_gpu_summary(),
+            'device_capabilities': {
+                'nvidia_gpu': detector.has_nvidia_gpu(),
+                'nvidia_gpu_count': detector.get_nvidia_gpu_count(),
+                'intel_gpu': detector.has_intel_gpu(),
+                'intel_gpu_count': detector.get_intel_gpu_count(),
+                'intel_cpu': detector.has_intel_cpu(),
+                'intel_npu': detector.has_intel_npu(),
+                'amd_gpu': detector.has_amd_gpu(),
+                'amd_cpu': detector.has_amd_cpu(),
+                'apple_silicon': detector.has_apple_silicon(),
+                'apple_neural_engine': detector.has_apple_neural_engine()
+            }
+        }
+        return hardware_info
+    
+    hardware_cache = CachedPayload(build_hardware_info, ttl=HARDWARE_CACHE_TTL)
+    node.hardware_detector.on_change(hardware_cache.invalidate)
+    
     @app.route('/api/hardware', methods=['GET'])
     def get_hardware_info():
         """Get detailed hardware information and available devices"""
-        try:
-            # Get Intel GPU details for enhanced display
-            intel_gpu_details = node.hardware_detector.get_intel_gpu_details()
-            intel_gpu_info = {}
-            for device_id, details in intel_gpu_details.items():
-                intel_gpu_info[device_id] = {
-                    'name': details['name'],
-                    'type': details['type'],
-                    'is_igpu': details['is_igpu'],
-                    'friendly_name': node.hardware_detector.get_intel_gpu_friendly_name(device_id),
-                    'description': node.hardware_detector.get_intel_gpu_description(device_id)
-                }
-            
-            # Get NVIDIA GPU details for enhanced display
-            nvidia_gpu_details = node.hardware_detector.get_nvidia_gpu_details()
-            nvidia_gpu_info = {}
-            for device_id, details in nvidia_gpu_details.items():
-                nvidia_gpu_info[device_id] = {
-                    'name': details['name'],
-                    'uuid': details['uuid'],
-                    'friendly_name': node.hardware_detector.get_nvidia_gpu_friendly_name(device_id),
-                    'description': node.hardware_detector.get_nvidia_gpu_description(device_id)
-                }
-            
-            hardware_info = {
-                'detected_hardware': node.hardware_detector.hardware_info,
-                'available_devices': node.hardware_detector.available_devices,
-                'optimal_device': node.hardware_detector.get_optimal_device_for_hardware(),
-                'intel_gpu_details': intel_gpu_info,
-                'nvidia_gpu_details': nvidia_gpu_info,
-                'device_capabilities': {
-                    'nvidia_gpu': node.hardware_detector.has_nvidia_gpu(),
-                    'nvidia_gpu_count': node.hardware_detector.get_nvidia_gpu_count(),
-                    'intel_gpu': node.hardware_detector.has_intel_gpu(),
-                    'intel_gpu_count': node.hardware_detector.get_intel_gpu_count(),
-                    'intel_cpu': node.hardware_detector.has_intel_cpu(),
-                    'intel_npu': node.hardware_detector.has_intel_npu(),
-                    'amd_gpu': node.hardware_detector.has_amd_gpu(),
-                    'amd_cpu': node.hardware_detector.has_amd_cpu(),
-                    'apple_silicon': node.hardware_detector.has_apple_silicon(),
-                    'apple_neural_engine': node.hardware_detector.has_apple_neural_engine()
-                }
-            }
-            return jsonify(hardware_info)
-        except Exception as e:
-            node.logger.error(f"Hardware info error: {str(e)}")
-            return jsonify({'error': f'Failed to get hardware info: {str(e)}'}), 500
+        return hardware_cache.response(max_age=int(HARDWARE_CACHE_TTL))
     
     @app.route('/api/hardware/format-device', methods=['POST'])
     def format_device_for_engine():
         """Format a device string for a specific inference engine"""
-        try:
-            data = request.get_json()
-            if not data or 'engine' not in data or 'device' not in data:
-                return jsonify({'error': 'Missing required fields: engine and device'}), 400
-            
-            engine = data['engine']
-            device = data['device']
-            
-            formatted_device = node.hardware_detector.format_for(engine, device)
-            
-            return jsonify({
-                'original_device': device,
-                'formatted_device': formatted_device,
-                'engine': engine
-            })
-            
-        except Exception as e:
-            node.logger.error(f"Format device error: {str(e)}")
-            return jsonify({'error': f'Failed to format device: {str(e)}'}), 500
+        data = request_json()
+        if not isinstance(data, dict) or 'engine' not in data or 'device' not in data:
+            return json_response(MISSING_FORMAT_FIELDS_BODY, 400)
+        
+        engine = data['engine']
+        device = data['device']
+        if not isinstance(engine, str) or not isinstance(device, str):
+            return json_response(INVALID_FORMAT_FIELDS_BODY, 400)
+        
+        formatted_device = node.hardware_detector.format_for(engine, device)
+        
+        return jsonify({
+            'original_device': device,
+            'formatted_device': formatted_device,
+            'engine': engine
+        })
@@ -2,10 +2,195 @@
 Model management API routes for InferenceNode
 Handles model upload, download, listing, and deletion
 """
+import glob
 import os
+import secrets
+import stat
+import sys
 import tempfile
-from datetime import datetime
-from flask import request, jsonify
+import time
+from urllib.parse import quote
+from flask import Response, request, jsonify
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.formparser import parse_form_data
+from werkzeug.utils import secure_filename
+
+from .responses import conditional_json_response, json_bytes, not_modified_if_current, payload_etag
+
+# Upper bounds on multipart upload bodies
+MAX_MODEL_UPLOAD_BYTES = 8 * 1024 ** 3
+MAX_VIDEO_UPLOAD_BYTES = 32 * 1024 ** 3
+
+# Catalogs larger than this are streamed model by model instead of being
+# serialized (and cached) as a single body
+STREAM_MODELS_THRESHOLD = 500
+
+# Video container formats accepted by upload-video
+ALLOWED_VIDEO_EXTENSIONS = frozenset({'.mp4', '.avi', '.mov', '.mkv', '.wmv', '.flv', '.webm', '.m4v', '.mpg', '.mpeg'})
+INVALID_VIDEO_TYPE_MESSAGE = f'Invalid file type. Allowed types: {", ".join(sorted(ALLOWED_VIDEO_EXTENSIONS))}'
+
+# Write buffer for uploaded video files and downloaded models
+UPLOAD_BUFFER_SIZE = 1024 * 1024
+
+# Pretrained Ultralytics weights are published as GitHub release assets
+ULTRALYTICS_ASSET_URL = 'https://github.com/ultralytics/assets/releases/latest/download/{}'
+DOWNLOAD_TIMEOUT = (10, 60)  # (connect, read) seconds
+
+
+def _file_extension(filename):
+    """Get the lowercased extension of a filename, including the dot"""
+    _, dot, ext = filename.rpartition('.')
+    return '.' + ext.lower() if dot else ''
+
+
+def _safe_upload_name(filename):
+    """Strip path components and unsafe characters from a client-supplied filename
+    
+    Keeps the extension even when secure_filename drops the whole stem
+    (e.g. for names written entirely in non-ASCII characters).
+    """
+    safe_name = secure_filename(filename)
+    ext = _file_extension(filename)
+    if not safe_name.lower().endswith(ext):
+        safe_name = f"{safe_name or 'upload'}{ext}"
+    return safe_name
+
+
+def _parse_streamed_upload(stream_factory, max_content_length):
+    """Parse the multipart request body, writing file parts through stream_factory
+    
+    Werkzeug writes each file part straight into the object returned by
+    stream_factory instead of spooling it to a temporary file first. If parsing
+    fails partway (a client disconnect or a body over the limit), every file
+    opened so far is closed and removed before the error is re-raised.
+    """
+    opened = []
+    
+    def tracking_factory(*args, **kwargs):
+        stream = stream_factory(*args, **kwargs)
+        opened.append(stream)
+        return stream
+    
+    try:
+        _, form, files = parse_form_data(
+            request.environ,
+            stream_factory=tracking_factory,
+            max_content_length=max_content_length
+        )
+    except BaseException:
+        for stream in opened:
+            try:
+                stream.close()
+            except Exception:
+                pass
+            _discard_upload(getattr(stream, 'name', None))
+        raise
+    return form, files
+
+
+def _close_upload_streams(files):
+    """Close the file objects Werkzeug wrote the uploaded parts into"""
+    for _, storage in files.items(multi=True):
+        try:
+            storage.stream.close()
+        except Exception:
+            pass
+
+
+def _discard_upload(path):
+    """Remove a partially written or rejected upload"""
+    try:
+        os.unlink(path)
+    except (FileNotFoundError, TypeError):
+        pass
+
+
+def _copy_request_body(dst, content_length):
+    """Copy a raw request body of content_length bytes into the open file dst
+    
+    When the WSGI server has spooled the body to a real file (waitress does for
+    large requests), the bytes are moved with os.sendfile inside the kernel;
+    otherwise they are copied through a 1 MiB buffer. Only Linux can sendfile
+    into a regular file; macOS and the BSDs require a socket destination.
+    """
+    source = request.environ['wsgi.input']
+    src_fd = None
+    if sys.platform.startswith('linux') and hasattr(os, 'sendfile'):
+        try:
+            # Sockets and in-memory buffers fail one of these checks
+            src_fd = source.fileno()
+            offset = source.tell()
+            if not stat.S_ISREG(os.fstat(src_fd).st_mode):
+                src_fd = None
+        except (AttributeError, OSError, ValueError):
+            src_fd = None
+    
+    if src_fd is not None:
+        dst.flush()
+        start = offset
+        end = offset + content_length
+        try:
+            while offset < end:
+                sent = os.sendfile(dst.fileno(), src_fd, offset, end - offset)
+                if sent == 0:
+                    raise IOError('Request body ended before Content-Length bytes were received')
+                offset += sent
+        except OSError:
+            if offset != start:
+                raise
+            # e.g. filesystems that do not support sendfile; nothing was copied
+            # yet, so fall through to the buffered copy
+        else:
+            source.seek(offset)
+            return
+    
+    remaining = content_length
+    while remaining > 0:
+        chunk = request.stream.read(min(UPLOAD_BUFFER_SIZE, remaining))
+        if not chunk:
+            raise IOError('Request body ended before Content-Length bytes were received')
+        dst.write(chunk)
+        remaining -= len(chunk)
+
+
+def _download_to_staging(url, model_repo):
+    """Stream a URL into a new file in the model repository's staging directory
+    
+    The content hash is computed while the chunks arrive so the repository
+    does not have to read the file back. Returns (staged_path, content_hash).
+    """
+    import requests
+    
+    digest = model_repo.new_content_hash()
+    staged = model_repo.open_staging_file()
+    try:
+        with staged, requests.get(url, stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(chunk_size=UPLOAD_BUFFER_SIZE):
+                staged.write(chunk)
+                digest.update(chunk)
+    except Exception:
+        _discard_upload(staged.name)
+        raise
+    return staged.name, digest.hexdigest()
+
+
+def _find_ultralytics_weights(model_name):
+    """Look up a model file in the known Ultralytics download locations"""
+    candidates = []
+    try:
+        from ultralytics.utils import SETTINGS
+        weights_dir = SETTINGS.get('weights_dir')
+        if weights_dir:
+            candidates.append(os.path.join(weights_dir, model_name))
+    except Exception:
+        pass
+    candidates.append(os.path.join(os.path.expanduser('~'), '.ultralytics', 'cache', model_name))
+    
+    for candidate in candidates:
+        if os.path.isfile(candidate):
+            return candidate
+    return None
 
 
 def register_model_routes(app, node):
@@ -15,33 +200,40 @@ def register_model_routes(app, node):
     def upload_model():
         """Upload a model file"""
         try:
-            if 'file' not in request.files:
-                return jsonify({'error': 'No file provided'}), 400
-            
-            file = request.files['file']
-            engine_type = request.form.get('engine_type', 'custom')
-            description = request.form.get('description', '')
-            name = request.form.get('name', '')
+            def staging_factory(total_content_length, content_type, filename, content_length=None):
+                return node.model_repo.open_staging_file()
             
-            if file.filename == '':
-                return jsonify({'error': 'No file selected'}), 400
+            try:
+                form, files = _parse_streamed_upload(staging_factory, MAX_MODEL_UPLOAD_BYTES)
+            except RequestEntityTooLarge:
+                return jsonify({'error': 'Model file is too large'}), 413
             
-            # Save uploaded file temporarily
-            temp_dir = tempfile.gettempdir()
-            temp_path = os.path.join(temp_dir, file.filename or 'uploaded_model')
-            file.save(temp_path)
+            staged_paths = [storage.stream.name for _, storage in files.items(multi=True)]
+            _close_upload_streams(files)
             
             try:
-                # Store model in repository
-                model_id = node.model_repo.store_model(
-                    temp_path, 
+                if 'file' not in files:
+                    return jsonify({'error': 'No file provided'}), 400
+                
+                file = files['file']
+                engine_type = form.get('engine_type', 'custom')
+                description = form.get('description', '')
+                name = form.get('name', '')
+                
+                if file.filename == '':
+                    return jsonify({'error': 'No file selected'}), 400
+                
+                # The upload is already in the repository's staging directory,
+                # so storing it is a rename rather than a copy
+                model_id = node.model_repo.ingest_streamed(
+                    file.stream.name,
                     file.filename or 'uploaded_model',
                     engine_type,
                     description,
                     name
                 )
                 
-                node.logger.info(f"Model uploaded successfully: {model_id}")
+                node.logger.info("Model uploaded successfully: %s", model_id)
                 
                 return jsonify({
                     'model_id': model_id, 
@@ -50,56 +242,98 @@ def register_model_routes(app, node):
                 })
                 
             finally:
-                # Clean up temp file
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
+                # Clean up anything that was not moved into the repository
+                for staged_path in staged_paths:
+                    _discard_upload(staged_path)
             
         except Exception as e:
-            node.logger.error(f"Model upload error: {str(e)}")
+            node.logger.error("Model upload error: %s", e)
             return jsonify({'error': str(e)}), 500
     
     @app.route('/api/media/upload-video', methods=['POST'])
     def upload_video():
-        """Upload a video file to the media directory"""
+        """Upload a video file to the media directory
+        
+        Accepts either a multipart form with a 'file' part or the raw video as
+        the request body, with its name in the 'filename' query parameter.
+        """
         try:
-            if 'file' not in request.files:
-                return jsonify({'error': 'No file provided'}), 400
+            # Create media directory if it doesn't exist
+            media_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'media')
+            os.makedirs(media_dir, exist_ok=True)
             
-            file = request.files['file']
+            def media_path(filename):
+                # Generate unique filename to avoid conflicts; the random suffix
+                # keeps concurrent uploads within the same second apart
+                stamp = f"{int(time.time())}_{secrets.token_hex(4)}"
+                return os.path.join(media_dir, f"{stamp}_{_safe_upload_name(filename)}")
             
-            if file.filename == '' or file.filename is None:
-                return jsonify({'error': 'No file selected'}), 400
+            def uploaded_response(file_path, original_filename):
+                safe_filename = os.path.basename(file_path)
+                node.logger.info("Video file uploaded successfully: %s", safe_filename)
+                return jsonify({
+                    'status': 'uploaded',
+                    'filename': safe_filename,
+                    'path': file_path,
+                    'message': f'Video {original_filename} uploaded successfully'
+                })
             
-            # Validate file extension
-            allowed_extensions = {'.mp4', '.avi', '.mov', '.mkv', '.wmv', '.flv', '.webm', '.m4v', '.mpg', '.mpeg'}
-            file_ext = os.path.splitext(file.filename)[1].lower()
+            if request.mimetype != 'multipart/form-data':
+                # Raw body upload: no multipart framing, so the body is copied to
+                # the destination as-is
+                filename = request.args.get('filename', '')
+                if not filename:
+                    return jsonify({'error': 'No file selected'}), 400
+                if _file_extension(filename) not in ALLOWED_VIDEO_EXTENSIONS:
+                    return jsonify({'error': INVALID_VIDEO_TYPE_MESSAGE}), 400
+                if request.content_length is None:
+                    return jsonify({'error': 'Content-Length header is required'}), 411
+                if request.content_length > MAX_VIDEO_UPLOAD_BYTES:
+                    return jsonify({'error': 'Video file is too large'}), 413
+                
+                file_path = media_path(filename)
+                try:
+                    with open(file_path, 'wb') as dst:
+                        _copy_request_body(dst, request.content_length)
+                except Exception:
+                    _discard_upload(file_path)
+                    raise
+                return uploaded_response(file_path, filename)
             
-            if file_ext not in allowed_extensions:
-                return jsonify({'error': f'Invalid file type. Allowed types: {", ".join(allowed_extensions)}'}), 400
+            def media_factory(total_content_length, content_type, filename, content_length=None):
+                # Write accepted videos straight to their final location in the media
+                # directory; anything else goes to a throwaway temp file
+                if _file_extension(filename or '') not in ALLOWED_VIDEO_EXTENSIONS:
+                    return tempfile.TemporaryFile()
+                return open(media_path(filename), 'w+b', buffering=UPLOAD_BUFFER_SIZE)
             
-            # Create media directory if it doesn't exist
-            media_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'media')
-            os.makedirs(media_dir, exist_ok=True)
+            try:
+                _, files = _parse_streamed_upload(media_factory, MAX_VIDEO_UPLOAD_BYTES)
+            except RequestEntityTooLarge:
+                return jsonify({'error': 'Video file is too large'}), 413
             
-            # Generate unique filename to avoid conflicts
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            safe_filename = f"{timestamp}_{file.filename}"
-            file_path = os.path.join(media_dir, safe_filename)
+            # Keep only the expected part; discard any other uploaded files
+            file = files.get('file')
+            _close_upload_streams(files)
+            for _, storage in files.items(multi=True):
+                if storage is not file:
+                    _discard_upload(storage.stream.name)
             
-            # Save the uploaded file
-            file.save(file_path)
+            if file is None:
+                return jsonify({'error': 'No file provided'}), 400
             
-            node.logger.info(f"Video file uploaded successfully: {safe_filename}")
+            if file.filename == '' or file.filename is None:
+                _discard_upload(file.stream.name)
+                return jsonify({'error': 'No file selected'}), 400
             
-            return jsonify({
-                'status': 'uploaded',
-                'filename': safe_filename,
-                'path': file_path,
-                'message': f'Video {file.filename} uploaded successfully'
-            })
+            # Validate file extension
+            if _file_extension(file.filename) not in ALLOWED_VIDEO_EXTENSIONS:
+                return jsonify({'error': INVALID_VIDEO_TYPE_MESSAGE}), 400
+            
+            return uploaded_response(file.stream.name, file.filename)
             
         except Exception as e:
-            node.logger.error(f"Video upload error: {str(e)}")
+            node.logger.error("Video upload error: %s", e)
             return jsonify({'error': str(e)}), 500
     
     @app.route('/api/models/download-ultralytics', methods=['POST'])
@@ -117,7 +351,7 @@ def register_model_routes(app, node):
             if not model_name:
                 return jsonify({'error': 'Model name is required'}), 400
             
-            node.logger.info(f"Starting download of Ultralytics model: {model_name}")
+            node.logger.info("Starting download of Ultralytics model: %s", model_name)
             
             try:
                 # Import ultralytics - this should be available if user selected ultralytics
@@ -125,6 +359,40 @@ def register_model_routes(app, node):
             except ImportError:
                 return jsonify({'error': 'Ultralytics package not available. Please install ultralytics: pip install ultralytics'}), 500
             
+            # Generate description if not provided
+            if not description:
+                description = f"Pre-trained {model_name} model from Ultralytics"
+            
+            # Generate name if not provided - use model name without extension
+            if not name:
+                name = os.path.splitext(model_name)[0]
+            
+            # Stream the release asset straight into the repository when it is
+            # published there; this avoids loading the model just to download it
+            try:
+                staged_path, content_hash = _download_to_staging(
+                    ULTRALYTICS_ASSET_URL.format(quote(model_name)), node.model_repo
+                )
+            except Exception as stream_error:
+                node.logger.info("Direct download of %s unavailable (%s), using Ultralytics loader", model_name, stream_error)
+            else:
+                try:
+                    model_id = node.model_repo.ingest_streamed(
+                        staged_path, model_name, 'ultralytics', description, name,
+                        content_hash=content_hash
+                    )
+                finally:
+                    _discard_upload(staged_path)
+                
+                node.logger.info("Ultralytics model downloaded and stored successfully: %s", model_id)
+                
+                return jsonify({
+                    'model_id': model_id,
+                    'status': 'downloaded',
+                    'model_name': model_name,
+                    'message': f'Model {model_name} downloaded and uploaded successfully'
+                })
+            
             # Track if model was downloaded to project root (for cleanup)
             project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
             project_root_model_path = os.path.join(project_root, model_name)
@@ -132,7 +400,7 @@ def register_model_routes(app, node):
             
             try:
                 # Download the model using ultralytics
-                node.logger.info(f"Downloading {model_name} from Ultralytics...")
+                node.logger.info("Downloading %s from Ultralytics...", model_name)
                 
                 # Initialize YOLO with the model name - this will download it automatically
                 model = YOLO(model_name)
@@ -148,47 +416,34 @@ def register_model_routes(app, node):
                     model_path = model.ckpt_path
                 
                 if not model_path or not os.path.exists(model_path):
-                    # Try to find the model in ultralytics cache
-                    cache_dir = os.path.join(os.path.expanduser('~'), '.ultralytics', 'cache')
-                    potential_path = os.path.join(cache_dir, model_name)
+                    model_path = _find_ultralytics_weights(model_name)
                     
-                    if os.path.exists(potential_path):
-                        model_path = potential_path
                     # Check if it was downloaded to project root
-                    elif os.path.exists(project_root_model_path):
+                    if not model_path and os.path.exists(project_root_model_path):
                         model_path = project_root_model_path
-                        node.logger.info(f"Found model in project root: {project_root_model_path}")
-                    else:
-                        # Search for the model file in the cache directory
-                        for root, dirs, files in os.walk(cache_dir):
-                            for file in files:
-                                if file == model_name:
-                                    model_path = os.path.join(root, file)
-                                    break
-                            if model_path:
-                                break
+                        node.logger.info("Found model in project root: %s", project_root_model_path)
+                    
+                    if not model_path:
+                        # Last resort: search the cache tree, stopping at the first match
+                        cache_dir = os.path.join(os.path.expanduser('~'), '.ultralytics', 'cache')
+                        pattern = os.path.join(glob.escape(cache_dir), '**', glob.escape(model_name))
+                        model_path = next(glob.iglob(pattern, recursive=True), None)
                 
                 if not model_path or not isinstance(model_path, str) or not os.path.exists(model_path):
                     return jsonify({'error': f'Failed to locate downloaded model: {model_name}'}), 500
                 
-                # Generate description if not provided
-                if not description:
-                    description = f"Pre-trained {model_name} model from Ultralytics"
-                
-                # Generate name if not provided - use model name without extension
-                if not name:
-                    name = os.path.splitext(model_name)[0]
-                
-                # Store the model in the repository
+                # Store the model in the repository; a copy that Ultralytics left in
+                # the project root would be cleaned up anyway, so move it instead
                 model_id = node.model_repo.store_model(
                     model_path,
                     model_name,
                     'ultralytics',  # Engine type
                     description,
-                    name
+                    name,
+                    move=(model_path == project_root_model_path and not model_was_in_root_before)
                 )
                 
-                node.logger.info(f"Ultralytics model downloaded and stored successfully: {model_id}")
+                node.logger.info("Ultralytics model downloaded and stored successfully: %s", model_id)
                 
                 return jsonify({
                     'model_id': model_id,
@@ -198,39 +453,65 @@ def register_model_routes(app, node):
                 })
                 
             except Exception as download_error:
-                node.logger.error(f"Error downloading Ultralytics model {model_name}: {str(download_error)}")
+                node.logger.error("Error downloading Ultralytics model %s: %s", model_name, download_error)
                 return jsonify({'error': f'Failed to download model: {str(download_error)}'}), 500
                 
             finally:
                 # Clean up model file from project root if it was downloaded there
                 try:
-                    # Only delete if the file exists in project root AND it wasn't there before download
-                    if (os.path.exists(project_root_model_path) and 
-                        not model_was_in_root_before and 
-                        os.path.isfile(project_root_model_path)):
-                        os.remove(project_root_model_path)
-                        node.logger.info(f"Cleaned up downloaded model from project root: {project_root_model_path}")
+                    # Only delete the file if it wasn't in the project root before download
+                    if not model_was_in_root_before:
+                        os.unlink(project_root_model_path)
+                        node.logger.info("Cleaned up downloaded model from project root: %s", project_root_model_path)
+                except (FileNotFoundError, IsADirectoryError):
+                    # Nothing was downloaded there, or the path is not a plain file
+                    pass
                 except Exception as cleanup_error:
-                    node.logger.warning(f"Failed to cleanup model file from project root: {cleanup_error}")
+                    node.logger.warning("Failed to cleanup model file from project root: %s", cleanup_error)
             
         except Exception as e:
-            node.logger.error(f"Download Ultralytics model error: {str(e)}")
+            node.logger.error("Download Ultralytics model error: %s", e)
             return jsonify({'error': str(e)}), 500
     
+    # Serialized listing for the repository revision it was built from:
+    # (listing_rev, body, etag)
+    listing_entry = [None]
+    
+    def get_listing_entry():
+        """Get the serialized model listing, rebuilding it after repository changes"""
+        rev = node.model_repo.listing_rev
+        entry = listing_entry[0]
+        if entry is None or entry[0] != rev:
+            body = json_bytes({
+                'models': node.model_repo.list_models(),
+                'stats': node.model_repo.get_storage_stats()
+            })
+            entry = (rev, body, payload_etag(body))
+            listing_entry[0] = entry
+        return entry
+    
+    def generate_listing():
+        """Yield the model listing as JSON, encoding one model at a time"""
+        stats = node.model_repo.get_storage_stats()
+        yield b'{"stats":' + json_bytes(stats) + b',"models":{'
+        separator = b''
+        for model_id, metadata in node.model_repo.iter_models():
+            yield separator + json_bytes(model_id) + b':' + json_bytes(metadata)
+            separator = b','
+        yield b'}}'
+    
     @app.route('/api/models', methods=['GET'])
     def list_models():
         """List all uploaded models"""
         try:
-            models = node.model_repo.list_models()
-            stats = node.model_repo.get_storage_stats()
+            if node.model_repo.model_count() > STREAM_MODELS_THRESHOLD:
+                return Response(generate_listing(), mimetype='application/json')
             
-            return jsonify({
-                'models': models,
-                'stats': stats
-            })
+            _, body, etag = get_listing_entry()
+            return conditional_json_response(body, etag)
             
         except Exception as e:
-            node.logger.error(f"List models error: {str(e)}")
+            node.logger.error("List models error: %s", e)
             return jsonify({'error': str(e)}), 500
     
     @app.route('/api/models/<model_id>', methods=['GET'])
@@ -241,10 +522,17 @@ def register_model_routes(app, node):
             if not metadata:
                 return jsonify({'error': 'Model not found'}), 404
             
-            return jsonify(metadata)
+            # A model's metadata only changes when it is stored again, which
+            # rewrites its upload date
+            etag = payload_etag(f"{model_id}|{metadata.get('upload_date')}|{metadata.get('file_size')}".encode('utf-8'))
+            not_modified = not_modified_if_current(etag)
+            if not_modified is not None:
+                return not_modified
+            
+            return conditional_json_response(json_bytes(metadata), etag)
             
         except Exception as e:
-            node.logger.error(f"Get model info error: {str(e)}")
+            node.logger.error("Get model info error: %s", e)
             return jsonify({'error': str(e)}), 500
     
     @app.route('/api/models/<model_id>', methods=['DELETE'])
@@ -262,5 +550,5 @@ def register_model_routes(app, node):
             })
             
         except Exception as e:
-            node.logger.error(f"Delete model error: {str(e)}")
+            node.logger.error("Delete model error: %s", e)
             return jsonify({'error': str(e)}), 500
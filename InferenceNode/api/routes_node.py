@@ -5,98 +5,238 @@ Handles node information, configuration, and restart
 
 from flask import jsonify, request
 import platform
-import tempfile
 import threading
 import subprocess
 import sys
 import os
+import shutil
+import time
+import uuid
+import concurrent.futures
+from functools import lru_cache
 
-try:
-    from ..settings_manager import save_settings
-    from ..utils import parse_windows_platform
-    from .._version import __version__
-except ImportError:
-    from InferenceNode.settings_manager import save_settings
-    from InferenceNode.utils import parse_windows_platform
-    from InferenceNode._version import __version__
+from ..settings_manager import request_save
+from ..utils import RESTART_WAIT_ENV, platform_info
+from .._version import __version__
+
+from .io_pool import get_io_pool
+from .responses import CachedPayload, json_response
+
+# Node info is polled by the UI; the full payload is reused for this many seconds
+NODE_INFO_TTL = 2.0
+
+# GPU and storage inventories rarely change, so they are re-probed less often
+HARDWARE_DETAILS_TTL = 30.0
+
+# Longest a node-info build waits for a GPU or storage probe
+PROBE_TIMEOUT = 5.0
+
+# Seconds between sending the restart response and tearing the node down
+RESTART_DELAY = 0.5
+
+# Longest a node relaunched on Windows waits for this process to release the port
+RESTART_PORT_WAIT = 10.0
+
+
+def _format_mac_address(node_id: int) -> str:
+    """Format a 48-bit hardware address as colon-separated hex pairs"""
+    hex_str = format(node_id, '012x')
+    return ':'.join(hex_str[i:i + 2] for i in range(0, 12, 2))
+
+
+def _disk_usage(path: str):
+    """Get (total, used, free) bytes for the filesystem containing path"""
+    if hasattr(os, 'statvfs'):
+        st = os.statvfs(path)
+        total = st.f_blocks * st.f_frsize
+        used = (st.f_blocks - st.f_bfree) * st.f_frsize
+        return total, used, st.f_bavail * st.f_frsize
+    return tuple(shutil.disk_usage(path))
+
+
+class _CpuSampler:
+    """Background sampler that keeps a recent system CPU percentage
+    
+    psutil.cpu_percent(interval=...) blocks for the whole interval, so a daemon
+    thread does the blocking measurement and requests just read the last value.
+    """
+    
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self.percent = 0.0
+        self._thread = None
+    
+    def start(self):
+        """Start the sampling thread if it is not already running"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='cpu-sampler', daemon=True)
+            self._thread.start()
+    
+    def _run(self):
+        import psutil
+        while True:
+            self.percent = psutil.cpu_percent(interval=self.interval)
+
+
+class _TimedValue:
+    """Value computed by a callable and reused until it is ttl seconds old"""
+    
+    def __init__(self, compute, ttl: float):
+        self.compute = compute
+        self.ttl = ttl
+        self._value = None
+        self._computed_at = None
+        self._lock = threading.Lock()
+    
+    def get(self):
+        """Get the cached value, recomputing it if stale"""
+        with self._lock:
+            now = time.monotonic()
+            if self._computed_at is None or now - self._computed_at >= self.ttl:
+                self._value = self.compute()
+                self._computed_at = now
+            return self._value
+    
+    def invalidate(self):
+        """Recompute the value on the next get()"""
+        with self._lock:
+            self._computed_at = None
 
 
 def register_node_routes(app, node):
     """Register all node-related routes with the Flask app"""
     
-    @app.route('/api/node/info', methods=['GET'])
-    def get_detailed_node_info():
-        """Get comprehensive node information for the node info page"""
+    # uuid.getnode() may enumerate network interfaces, so read it only once
+    mac_address = _format_mac_address(uuid.getnode())
+    cpu_sampler = _CpuSampler()
+    cpu_sampler.start()
+    gpu_details = _TimedValue(node.hardware_detector.get_gpu_details, HARDWARE_DETAILS_TTL)
+    storage_details = _TimedValue(node.hardware_detector.get_storage_details, HARDWARE_DETAILS_TTL)
+    # GPU details read before background detection finishes list no GPUs
+    node.hardware_detector.on_change(gpu_details.invalidate)
+    
+    def _probe_result(future, what):
+        """Wait for a hardware probe, reporting an empty list if it hangs"""
         try:
-            import psutil
-            import socket
-            import uuid
-            import time
-            from datetime import datetime
-            
-            # Get system info
-            memory = psutil.virtual_memory()
-            disk = psutil.disk_usage('/')
-            boot_time = psutil.boot_time()
-            
-            detailed_info = {
-                'success': True,
-                'data': {
-                    # Basic system information
-                    'node_id': node.node_id,
-                    'version': __version__,
-                    'platform': parse_windows_platform(platform.platform()),
-                    'architecture': platform.architecture()[0],
-                    'python_version': platform.python_version(),
-                    'hostname': socket.gethostname(),
-                    'ip_address': socket.gethostbyname(socket.gethostname()),
-                    'mac_address': ':'.join(['{:02x}'.format((uuid.getnode() >> ele) & 0xff) for ele in range(0,8*6,8)][::-1]),
-                    'uptime': int(time.time() - boot_time),
-                    'app_uptime': int(time.time() - node.app_start_time),
-                    'start_time': datetime.fromtimestamp(boot_time).strftime('%Y-%m-%d %H:%M:%S'),
-                    
-                    # Hardware information
-                    'hardware': {
-                        'cpu_model': platform.processor() or 'Unknown',
-                        'cpu_cores': psutil.cpu_count(logical=False),
-                        'cpu_threads': psutil.cpu_count(logical=True),
-                        'cpu_freq': psutil.cpu_freq().current if psutil.cpu_freq() else None,
-                        'memory_total': memory.total,
-                        'memory_available': memory.available,
-                        'memory_used': memory.used,
-                        'disk_total': disk.total,
-                        'disk_used': disk.used,
-                        'disk_free': disk.free,
-                        'gpu_info': node.hardware_detector.get_gpu_details(),
-                        'storage_info': node.hardware_detector.get_storage_details(),
-                        'resource_usage': {
-                            'cpu': psutil.cpu_percent(interval=1),
-                            'memory': memory.percent,
-                            'disk': (disk.used / disk.total) * 100
-                        }
-                    },
-                    
-                    # Configuration
-                    'config': {
-                        'node_name': node.node_name,
-                        'log_level': 'INFO',
-                        'web_port': node.port
-                    },
-                    
-                    # Status
-                    'status': {
-                        'healthy': True,
-                        'load_average': psutil.cpu_percent(interval=0.1),
-                        'inference_count': len(getattr(node, 'active_pipelines', {})),
-                        'error_count': 0
+            return future.result(timeout=PROBE_TIMEOUT)
+        except concurrent.futures.TimeoutError:
+            node.logger.warning("Timed out collecting %s for node info", what)
+            return []
+    
+    @lru_cache(maxsize=1)
+    def get_static_info():
+        """Collect system facts that cannot change while the process runs
+        
+        psutil's CPU and boot-time probes read /proc or query the OS, so they
+        are evaluated once on first use.
+        """
+        import psutil
+        from datetime import datetime
+        
+        host = platform_info()
+        boot_time = psutil.boot_time()
+        return {
+            'platform': host['platform'],
+            'architecture': host['architecture'],
+            'python_version': platform.python_version(),
+            'boot_time': boot_time,
+            'start_time': datetime.fromtimestamp(boot_time).strftime('%Y-%m-%d %H:%M:%S'),
+            'cpu_model': host['processor'] or 'Unknown',
+            'cpu_cores': psutil.cpu_count(logical=False),
+            'cpu_threads': psutil.cpu_count(logical=True),
+            'memory_total': psutil.virtual_memory().total
+        }
+    
+    def build_node_info():
+        """Build the /api/node/info payload"""
+        import psutil
+        
+        # GPU and storage probes are independent, so run them alongside the
+        # cheap readings below instead of one after the other
+        pool = get_io_pool()
+        if pool is not None:
+            gpu_future = pool.submit(gpu_details.get)
+            storage_future = pool.submit(storage_details.get)
+        
+        # Get system info
+        static = get_static_info()
+        memory = psutil.virtual_memory()
+        disk_total, disk_used, disk_free = _disk_usage('/')
+        now = time.time()
+        
+        if pool is not None:
+            gpu_info = _probe_result(gpu_future, 'GPU details')
+            storage_info = _probe_result(storage_future, 'storage details')
+        else:
+            gpu_info = gpu_details.get()
+            storage_info = storage_details.get()
+        
+        detailed_info = {
+            'success': True,
+            'data': {
+                # Basic system information
+                'node_id': node.node_id,
+                'version': __version__,
+                'platform': static['platform'],
+                'architecture': static['architecture'],
+                'python_version': static['python_version'],
+                'hostname': node.hostname,
+                'ip_address': node.primary_ip,
+                'mac_address': mac_address,
+                'uptime': int(now - static['boot_time']),
+                'app_uptime': int(now - node.app_start_time),
+                'start_time': static['start_time'],
+                
+                # Hardware information
+                'hardware': {
+                    'cpu_model': static['cpu_model'],
+                    'cpu_cores': static['cpu_cores'],
+                    'cpu_threads': static['cpu_threads'],
+                    'cpu_freq': psutil.cpu_freq().current if psutil.cpu_freq() else None,
+                    'memory_total': static['memory_total'],
+                    'memory_available': memory.available,
+                    'memory_used': memory.used,
+                    'disk_total': disk_total,
+                    'disk_used': disk_used,
+                    'disk_free': disk_free,
+                    'gpu_info': gpu_info,
+                    'storage_info': storage_info,
+                    'resource_usage': {
+                        'cpu': cpu_sampler.percent,
+                        'memory': memory.percent,
+                        'disk': (disk_used / disk_total) * 100
                     }
+                },
+                
+                # Configuration
+                'config': {
+                    'node_name': node.node_name,
+                    'log_level': 'INFO',
+                    'web_port': node.port
+                },
+                
+                # Status
+                'status': {
+                    'healthy': True,
+                    'load_average': cpu_sampler.percent,
+                    'inference_count': len(getattr(node, 'active_pipelines', {})),
+                    'error_count': 0
                 }
             }
-            
-            return jsonify(detailed_info)
+        }
+        
+        return detailed_info
+    
+    node_info_cache = CachedPayload(build_node_info, ttl=NODE_INFO_TTL)
+    
+    @app.route('/api/node/info', methods=['GET'])
+    def get_detailed_node_info():
+        """Get comprehensive node information for the node info page"""
+        try:
+            return json_response(node_info_cache.get())
             
         except Exception as e:
-            node.logger.error(f"Detailed node info error: {str(e)}")
+            node.logger.error("Detailed node info error: %s", e)
             return jsonify({
                 'success': False,
                 'error': f'Failed to get detailed node info: {str(e)}'
@@ -114,27 +254,27 @@ def register_node_routes(app, node):
             if 'node_name' in data and data['node_name']:
                 old_name = node.node_name
                 node.node_name = data['node_name']
-                node.logger.info(f"Node name updated from '{old_name}' to '{node.node_name}'")
+                node.logger.info("Node name updated from '%s' to '%s'", old_name, node.node_name)
                 
                 # Update node info for discovery
                 node.node_info['node_name'] = node.node_name
-                if node.discovery_manager:
-                    node.discovery_manager.set_node_info(node.node_id, node.node_info)
+                node.publish_node_info()
             
             # Update log level if provided
             if 'log_level' in data and node.log_manager:
                 try:
                     node.log_manager.setup_logging(log_level=data['log_level'], enable_file_logging=True)
-                    node.logger.info(f"Log level updated to {data['log_level']}")
+                    node.logger.info("Log level updated to %s", data['log_level'])
                 except Exception as e:
-                    node.logger.warning(f"Failed to update log level: {e}")
+                    node.logger.warning("Failed to update log level: %s", e)
             
             # Note: Web port changes would require restart
             if 'web_port' in data and data['web_port'] != node.port:
-                node.logger.info(f"Web port change requested to {data['web_port']} (requires restart)")
+                node.logger.info("Web port change requested to %s (requires restart)", data['web_port'])
             
             # Save settings
-            save_settings(node)
+            request_save(node)
+            node_info_cache.invalidate()
             
             return jsonify({
                 'success': True,
@@ -147,7 +287,7 @@ def register_node_routes(app, node):
             })
             
         except Exception as e:
-            node.logger.error(f"Update node config error: {str(e)}")
+            node.logger.error("Update node config error: %s", e)
             return jsonify({'error': f'Failed to update configuration: {str(e)}'}), 500
     
     @app.route('/api/node/restart', methods=['POST'])
@@ -157,8 +297,6 @@ def register_node_routes(app, node):
             node.logger.info("Restart requested via API")
             
             def perform_restart():
-                import time
-                time.sleep(1)
                 node.logger.info("Performing restart...")
                 
                 node.stop()
@@ -167,26 +305,32 @@ def register_node_routes(app, node):
                 script = sys.argv[0]
                 
                 if platform.system() == 'Windows':
-                    batch_content = f'@echo off\ntimeout /t 2 /nobreak > nul\nstart "" "{python}" "{script}" {" ".join(sys.argv[1:])}\n'
-                    batch_file = os.path.join(tempfile.gettempdir(), 'infernode_restart.bat')
-                    with open(batch_file, 'w') as f:
-                        f.write(batch_content)
-                    subprocess.Popen(['cmd.exe', '/c', batch_file], 
-                                   creationflags=subprocess.CREATE_NEW_CONSOLE)
+                    # Windows has no exec that keeps the PID, so launch a detached
+                    # copy of the node directly and exit this one; the copy waits
+                    # for this process to release the port before serving
+                    env = dict(os.environ, **{RESTART_WAIT_ENV: str(RESTART_PORT_WAIT)})
+                    subprocess.Popen([python, script] + sys.argv[1:],
+                                     creationflags=subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP,
+                                     cwd=os.getcwd(), close_fds=True, env=env)
                 else:
                     os.execv(python, [python] + sys.argv)
                 
                 os._exit(0)
             
-            restart_thread = threading.Thread(target=perform_restart)
-            restart_thread.daemon = True
-            restart_thread.start()
+            def schedule_restart():
+                # Runs once the response has been handed to the server; the short
+                # delay lets the socket flush before the process is replaced
+                restart_timer = threading.Timer(RESTART_DELAY, perform_restart)
+                restart_timer.daemon = True
+                restart_timer.start()
             
-            return jsonify({
+            response = jsonify({
                 'success': True,
                 'message': 'Restart initiated'
             })
+            response.call_on_close(schedule_restart)
+            return response
             
         except Exception as e:
-            node.logger.error(f"Restart error: {str(e)}")
+            node.logger.error("Restart error: %s", e)
             return jsonify({'error': f'Failed to restart: {str(e)}'}), 500
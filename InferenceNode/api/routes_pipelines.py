@@ -5,51 +5,432 @@ Handles pipeline CRUD operations, control, streaming, and import/export
 
 from flask import jsonify, request, Response
 import os
+import re
 import time
 import cv2
 import tempfile
 import zipfile
 import json
 import shutil
+import threading
 from datetime import datetime
+from typing import Optional
 
-try:
-    from ..settings_manager import save_settings
-except ImportError:
-    from InferenceNode.settings_manager import save_settings
+from ..settings_manager import save_settings
+from ..jpeg_encoder import get_pipeline_encoder
+
+from .jobs import JobRegistry
+from .responses import (CachedPayload, conditional_json_response, error_response, json_bytes,
+                        json_response, not_modified_if_current, payload_etag, request_json)
+
+# Boundary and headers framing each JPEG in a multipart/x-mixed-replace stream;
+# the header takes the JPEG's length
+MJPEG_PART_HEADER = b'--frame\r\nContent-Type: image/jpeg\r\nContent-Length: %d\r\n\r\n'
+MJPEG_PART_TRAILER = b'\r\n'
+
+# Model weight formats that barely deflate; they are stored uncompressed in exports
+EXPORT_STORED_EXTENSIONS = frozenset({'.onnx', '.engine', '.plan', '.trt', '.pt', '.pth',
+                                      '.bin', '.safetensors', '.tflite', '.zip'})
+
+# Runs of whitespace and characters not allowed in Windows filenames, replaced in export names
+EXPORT_FILENAME_UNSAFE = re.compile(r'[<>:"/\\|?*\s]+')
+
+# Deflate level for the remaining (JSON and text) export entries
+EXPORT_COMPRESS_LEVEL = 1
+
+# Bytes read from a source file per chunk of a streamed export
+EXPORT_CHUNK_SIZE = 1024 * 1024
+
+# Largest total uncompressed size accepted from an uploaded pipeline export
+IMPORT_MAX_UNCOMPRESSED_SIZE = 32 * 1024 ** 3
+
+# Seconds between repeated metrics-error log lines for the same pipeline
+METRICS_ERROR_LOG_INTERVAL = 60.0
+
+# Seconds browsers may reuse a thumbnail; its URL changes whenever it is regenerated
+THUMBNAIL_MAX_AGE = 3600
+
+# Seconds a thumbnail's path and version are reused before the file is checked again
+THUMBNAIL_LOOKUP_TTL = 2.0
+
+# Fields a pipeline configuration must contain to be created
+PIPELINE_REQUIRED_FIELDS = ('name', 'frame_source', 'model', 'destinations')
+
+# Seconds the polled metrics payload is reused between rebuilds
+PIPELINE_METRICS_TTL = 1.0
+
+# Seconds between metrics pushes on the server-sent event stream
+METRICS_STREAM_INTERVAL = 1.0
+
+# Seconds of unchanged metrics after which the event stream sends a keepalive comment
+METRICS_STREAM_KEEPALIVE = 15.0
+
+# Seconds the pipeline list, summary and per-pipeline status payloads are reused
+PIPELINE_LIST_TTL = 5.0
+
+# Seconds between progress events sent for a background export or import
+JOB_PROGRESS_INTERVAL = 0.5
+
+# Longest a new stream waits for a pipeline that has not produced a frame yet
+FIRST_FRAME_TIMEOUT = 5.0
+
+# Longest a stream blocks waiting for a new frame before re-checking the pipeline state
+FRAME_WAIT_TIMEOUT = 1.0
+
+# Floor for the JPEG quality of a stream that is backing off for a slow client
+STREAM_MIN_QUALITY = 40
+
+# Slowest frame interval a backed-off stream drops to (seconds)
+STREAM_MAX_FRAME_INTERVAL = 1.0
+
+
+class _StreamPacer:
+    """Per-client frame interval and JPEG quality that adapt to how fast the client drains
+    
+    A yield blocks while the server's send buffer is full, so a send that takes
+    longer than two frame intervals means the client is falling behind. The
+    pacer then halves the frame rate and lowers quality, and recovers slowly
+    once sends are quick again.
+    """
+    
+    def __init__(self, frame_interval: float, quality: int):
+        self.base_interval = frame_interval
+        self.base_quality = quality
+        self.interval = frame_interval
+        self.quality = quality
+    
+    def record_send(self, seconds: float):
+        """Adjust pacing after a frame took seconds to hand to the server"""
+        if seconds > self.interval * 2:
+            self.interval = min(self.interval * 2, STREAM_MAX_FRAME_INTERVAL)
+            self.quality = max(self.quality - 10, STREAM_MIN_QUALITY)
+        elif seconds < self.interval / 2:
+            self.interval = max(self.interval * 0.9, self.base_interval)
+            self.quality = min(self.quality + 1, self.base_quality)
+
+
+def _missing_field(config, required) -> Optional[str]:
+    """Return the first required key absent from config, or None if all are present"""
+    return next((field for field in required if field not in config), None)
+
+
+def _export_compress_type(filename: str) -> int:
+    """Pick the ZIP compression for an export entry based on its file type"""
+    if os.path.splitext(filename)[1].lower() in EXPORT_STORED_EXTENSIONS:
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+
+class _ZipChunkWriter:
+    """Write-only file object that collects what ZipFile writes so it can be yielded
+    
+    It has no tell() or seek(), so ZipFile treats it as unseekable and records
+    entry sizes in data descriptors instead of seeking back to the local headers.
+    """
+    
+    def __init__(self):
+        self._chunks = []
+    
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+    
+    def flush(self):
+        pass
+    
+    def drain(self) -> bytes:
+        """Return everything written since the last drain"""
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _zip_file_chunks(zipf, writer: _ZipChunkWriter, file_path: str, arc_name: str):
+    """Add a file to a ZipFile writing into writer, yielding archive bytes chunk by chunk"""
+    zinfo = zipfile.ZipInfo.from_file(file_path, arc_name)
+    zinfo.compress_type = _export_compress_type(file_path)
+    # ZipFile.write() applies the archive's level but ZipFile.open() does not
+    zinfo._compresslevel = EXPORT_COMPRESS_LEVEL
+    with open(file_path, 'rb') as src, zipf.open(zinfo, 'w') as dest:
+        while True:
+            chunk = src.read(EXPORT_CHUNK_SIZE)
+            if not chunk:
+                break
+            dest.write(chunk)
+            data = writer.drain()
+            if data:
+                yield data
+    yield writer.drain()
+
+
+def _export_zip_chunks(config_data: dict, model_sources, model_metadata: Optional[dict]):
+    """Yield a pipeline export ZIP as it is compressed
+    
+    Entries are read and sent chunk by chunk, so the archive never exists in
+    full on disk or in memory.
+    """
+    writer = _ZipChunkWriter()
+    with zipfile.ZipFile(writer, 'w', zipfile.ZIP_DEFLATED,
+                         compresslevel=EXPORT_COMPRESS_LEVEL) as zipf:
+        zipf.writestr('pipeline_config.json', json.dumps(config_data, indent=2))
+        yield writer.drain()
+        
+        for file_path, arc_name in model_sources:
+            yield from _zip_file_chunks(zipf, writer, file_path, arc_name)
+        
+        if model_metadata is not None:
+            zipf.writestr('models/model_metadata.json', json.dumps(model_metadata, indent=2))
+    yield writer.drain()
+
+
+def _import_model_members(zipf) -> list:
+    """Check an uploaded export's entries and pick the model files to extract
+    
+    Raises ValueError for entries whose paths would escape the extraction
+    directory, or when the archive would expand beyond IMPORT_MAX_UNCOMPRESSED_SIZE.
+    """
+    members = []
+    total_size = 0
+    for info in zipf.infolist():
+        parts = info.filename.replace('\\', '/').split('/')
+        if (not parts[0] and len(parts) > 1) or parts[0].endswith(':') or '..' in parts:
+            raise ValueError(f'Invalid pipeline export: unsafe path {info.filename}')
+        
+        total_size += info.file_size
+        if total_size > IMPORT_MAX_UNCOMPRESSED_SIZE:
+            raise ValueError('Invalid pipeline export: archive expands beyond the import size limit')
+        
+        # Only top-level files under models/ are used by the import
+        if len(parts) == 2 and parts[0] == 'models' and parts[1] and not info.is_dir():
+            members.append(info)
+    return members
+
+
+def _export_filename(pipeline_name: str) -> str:
+    """Build a filesystem-safe download name for a pipeline export"""
+    return f"{EXPORT_FILENAME_UNSAFE.sub('_', pipeline_name)}_export.zip"
+
+
+def _file_version(path: str) -> str:
+    """Identify a file's current contents by its modification time and size"""
+    st = os.stat(path)
+    return f'{st.st_mtime_ns:x}-{st.st_size:x}'
+
+
+def _format_metrics(metrics: dict) -> dict:
+    """Reduce a pipeline's get_metrics() result to the fields the metrics endpoint reports"""
+    get = metrics.get
+    return {
+        'fps': round(get('fps', 0), 1),
+        'frame_count': get('frame_count', 0),
+        'elapsed_time': round(get('elapsed_time', 0), 1),
+        'latency_ms': round(get('latency_ms', 0), 1),
+        'uptime': get('uptime', '0s')
+    }
+
+
+def _mjpeg_generator(pipeline_id, pipeline_info, pipeline_instance, max_width: int,
+                     jpeg_quality: int, target_fps: int, logger, label: str):
+    """Yield multipart JPEG parts of a running pipeline's latest frames
+    
+    Frames wider than max_width are scaled down, encoded at jpeg_quality and
+    sent at no more than target_fps, backing off for slow clients.
+    """
+    frame_count = 0
+    max_retries = 50
+    retry_count = 0
+    last_frame_time = 0
+    frame_seq = 0
+    source_shape = None
+    target_size = None
+    # Frame and resize buffers are reused from one frame to the next
+    frame_buffer = None
+    resize_buffer = None
+    pacer = _StreamPacer(1.0 / target_fps, jpeg_quality)
+    encoder = get_pipeline_encoder(pipeline_info)
+    
+    try:
+        while retry_count < max_retries:
+            try:
+                # stop_pipeline() stops the instance before dropping it from
+                # active_pipelines, so is_running() also covers removal
+                if not pipeline_instance.is_running():
+                    break
+                
+                # Cap the stream rate with one sleep instead of polling
+                wait_time = pacer.interval - (time.time() - last_frame_time)
+                if wait_time > 0:
+                    time.sleep(wait_time)
+                
+                # Block until the pipeline stores a frame newer than the last one sent
+                frame_seq, frame = pipeline_instance.wait_for_frame(frame_seq, FRAME_WAIT_TIMEOUT,
+                                                                    out=frame_buffer)
+                
+                if frame is not None:
+                    current_time = time.time()
+                    # The output size only changes if the source resolution does
+                    frame_buffer = frame
+                    if frame.shape[:2] != source_shape:
+                        source_shape = frame.shape[:2]
+                        height, width = source_shape
+                        target_size = (max_width, int(height * max_width / width)) if width > max_width else None
+                        resize_buffer = None
+                    if target_size:
+                        resize_buffer = cv2.resize(frame, target_size, dst=resize_buffer,
+                                                   interpolation=cv2.INTER_LINEAR)
+                        frame = resize_buffer
+                    
+                    jpeg = encoder.encode(frame, pacer.quality)
+                    if jpeg is not None:
+                        send_start = time.monotonic()
+                        # One bytes object per part, so the server makes a single write per frame
+                        yield b''.join((MJPEG_PART_HEADER % len(jpeg), jpeg, MJPEG_PART_TRAILER))
+                        pacer.record_send(time.monotonic() - send_start)
+                        frame_count += 1
+                        retry_count = 0
+                        last_frame_time = current_time
+                
+            except Exception as e:
+                logger.error("Error in %s for pipeline %s: %s", label, pipeline_id, e)
+                retry_count += 1
+                time.sleep(0.1)
+    finally:
+        pipeline_instance.stop_streaming()
+        logger.info("Ended %s for pipeline %s, streamed %d frames", label, pipeline_id, frame_count)
 
 
 def register_pipeline_routes(app, node):
     """Register all pipeline-related routes with the Flask app"""
     
+    # Each MJPEG client occupies a server thread for as long as it stays
+    # connected, so streams are capped to keep threads free for API requests
+    stream_slots = threading.BoundedSemaphore(node.max_preview_streams)
+    
+    # Exports and imports of multi-GB models run here instead of on request threads
+    jobs = JobRegistry(node.logger)
+    
+    metrics_error_logged = {}  # pipeline_id -> monotonic time of the last logged metrics error
+    
+    def build_pipeline_metrics():
+        """Build the /api/pipelines/metrics payload"""
+        # Get only the metrics without full pipeline data
+        stats = node.pipeline_manager.get_pipeline_stats()
+        
+        # Get metrics for running pipelines only; iterate a snapshot since
+        # pipeline threads add and remove entries concurrently
+        running_metrics = {}
+        for pipeline_id, pipeline_info in list(node.pipeline_manager.active_pipelines.items()):
+            pipeline_instance = pipeline_info.get('pipeline_instance')
+            if pipeline_instance is None:
+                continue
+            try:
+                running_metrics[pipeline_id] = _format_metrics(pipeline_instance.get_metrics())
+            except Exception as e:
+                # A failing pipeline would otherwise log on every poll
+                now = time.monotonic()
+                if now - metrics_error_logged.get(pipeline_id, float('-inf')) >= METRICS_ERROR_LOG_INTERVAL:
+                    metrics_error_logged[pipeline_id] = now
+                    node.logger.warning("Error getting metrics for pipeline %s: %s", pipeline_id, e)
+        
+        return {
+            'stats': stats,
+            'running_pipelines': running_metrics
+        }
+    
+    def build_pipeline_list():
+        """Build the /api/pipelines payload"""
+        pipelines = node.pipeline_manager.list_pipelines()
+        stats = node.pipeline_manager.get_pipeline_stats()
+        
+        return {
+            'pipelines': list(pipelines.values()),
+            'stats': stats
+        }
+    
+    # The UI polls these on a timer; payloads are reused for a short TTL and
+    # dropped whenever a pipeline is created, changed, started or stopped
+    metrics_cache = CachedPayload(build_pipeline_metrics, ttl=PIPELINE_METRICS_TTL)
+    list_cache = CachedPayload(build_pipeline_list, ttl=PIPELINE_LIST_TTL)
+    summary_cache = CachedPayload(lambda: node.pipeline_manager.get_pipeline_summary(), ttl=PIPELINE_LIST_TTL)
+    full_status_caches = {}  # pipeline_id -> CachedPayload
+    
+    def format_model_device(model):
+        """Rewrite model['device'] in the form its inference engine expects
+        
+        Returns an error message if the device or engine type is not a string.
+        """
+        if not isinstance(model, dict) or 'device' not in model or 'engine_type' not in model:
+            return None
+        original_device = model['device']
+        engine_type = model['engine_type']
+        if not isinstance(original_device, str) or not isinstance(engine_type, str):
+            return 'model device and engine_type must be strings'
+        
+        # Use hardware detector to format device for the specific engine
+        model['device'] = node.hardware_detector.format_for(engine_type, original_device)
+        node.logger.info("Device '%s' formatted to '%s' for engine '%s'",
+                         original_device, model['device'], engine_type)
+    
+    def pipeline_config_etag(pipeline_id):
+        """ETag for payloads derived only from a pipeline's config and run state"""
+        return payload_etag(f'{pipeline_id}|{node.pipeline_manager.metadata_rev}'.encode('utf-8'))
+    
+    thumbnail_lookups = {}  # pipeline_id -> (path or None, version or None, expires_at)
+    
+    def get_thumbnail(pipeline_id):
+        """Get (path, version) of a pipeline's thumbnail, or (None, None) if it has none
+        
+        The dashboard checks every card's thumbnail on each refresh, so lookups
+        are reused for THUMBNAIL_LOOKUP_TTL seconds instead of hitting the disk.
+        """
+        now = time.monotonic()
+        cached = thumbnail_lookups.get(pipeline_id)
+        if cached is not None and cached[2] > now:
+            return cached[0], cached[1]
+        
+        path = node.pipeline_manager.get_pipeline_thumbnail_path(pipeline_id)
+        version = None
+        if path:
+            try:
+                version = _file_version(path)
+            except OSError:
+                path = None
+        thumbnail_lookups[pipeline_id] = (path, version, now + THUMBNAIL_LOOKUP_TTL)
+        return path, version
+    
+    def invalidate_pipeline_caches():
+        """Drop cached pipeline payloads after any pipeline change"""
+        metrics_cache.invalidate()
+        list_cache.invalidate()
+        summary_cache.invalidate()
+        full_status_caches.clear()
+        # Pipelines capture a thumbnail when they start producing frames and when they stop
+        thumbnail_lookups.clear()
+    
     @app.route('/api/pipeline/create', methods=['POST'])
     def create_pipeline():
         """Create a new inference pipeline"""
         try:
             if not node.pipeline_manager:
-                return jsonify({'error': 'Pipeline manager not available'}), 503
+                return error_response('Pipeline manager not available', 503)
                 
-            config = request.get_json()
+            config = request_json()
+            if not isinstance(config, dict):
+                return error_response('No data provided', 400)
             
             # Validate required fields
-            required_fields = ['name', 'frame_source', 'model', 'destinations']
-            for field in required_fields:
-                if field not in config:
-                    return jsonify({'error': f'Missing required field: {field}'}), 400
+            missing = _missing_field(config, PIPELINE_REQUIRED_FIELDS)
+            if missing:
+                return error_response(f'Missing required field: {missing}', 400)
             
             # Format device string for the specific inference engine
-            if 'model' in config and 'device' in config['model'] and 'engine_type' in config['model']:
-                original_device = config['model']['device']
-                engine_type = config['model']['engine_type']
-                
-                # Use hardware detector to format device for the specific engine
-                formatted_device = node.hardware_detector.format_for(engine_type, original_device)
-                config['model']['device'] = formatted_device
-                
-                node.logger.info(f"Device '{original_device}' formatted to '{formatted_device}' for engine '{engine_type}'")
+            device_error = format_model_device(config['model'])
+            if device_error:
+                return error_response(device_error, 400)
             
             # Create pipeline
             pipeline_id = node.pipeline_manager.create_pipeline(config)
+            invalidate_pipeline_caches()
             
             # Update node info with new pipeline information
             node._update_node_info_with_pipelines()
@@ -64,122 +445,136 @@ def register_pipeline_routes(app, node):
             
         except Exception as e:
             node.logger.error(f"Create pipeline error: {str(e)}")
-            return jsonify({'error': str(e)}), 500
+            return error_response(str(e), 500)
     
     @app.route('/api/pipelines/metrics', methods=['GET'])
     def get_pipeline_metrics():
         """Get only pipeline metrics (lighter endpoint for frequent polling)"""
         try:
             if not node.pipeline_manager:
-                return jsonify({'error': 'Pipeline manager not available'}), 503
-            
-            # Get only the metrics without full pipeline data
-            stats = node.pipeline_manager.get_pipeline_stats()
-            
-            # Get metrics for running pipelines only
-            running_metrics = {}
-            for pipeline_id, pipeline_info in node.pipeline_manager.active_pipelines.items():
-                if 'pipeline_instance' in pipeline_info:
-                    pipeline_instance = pipeline_info['pipeline_instance']
-                    if hasattr(pipeline_instance, 'get_metrics'):
-                        try:
-                            metrics = pipeline_instance.get_metrics()
-                            running_metrics[pipeline_id] = {
-                                'fps': round(metrics.get('fps', 0), 1),
-                                'frame_count': metrics.get('frame_count', 0),
-                                'elapsed_time': round(metrics.get('elapsed_time', 0), 1),
-                                'latency_ms': round(metrics.get('latency_ms', 0), 1),
-                                'uptime': metrics.get('uptime', '0s')
-                            }
-                        except Exception as e:
-                            print(f"Error getting metrics for pipeline {pipeline_id}: {e}")
+                return error_response('Pipeline manager not available', 503)
             
-            return jsonify({
-                'stats': stats,
-                'running_pipelines': running_metrics
-            })
+            return metrics_cache.response()
             
         except Exception as e:
             node.logger.error(f"Get pipeline metrics error: {str(e)}")
-            return jsonify({'error': str(e)}), 500
+            return error_response(str(e), 500)
+    
+    @app.route('/api/pipelines/metrics/stream', methods=['GET'])
+    def stream_pipeline_metrics():
+        """Push pipeline metrics to the client as server-sent events"""
+        if not node.pipeline_manager:
+            return error_response('Pipeline manager not available', 503)
+        
+        # An event stream holds a server thread like a preview stream does
+        if not stream_slots.acquire(blocking=False):
+            return error_response('Too many active streams. Poll /api/pipelines/metrics instead.', 503)
+        
+        def generate_events():
+            # Every client reads the same cached body, so the payload is built
+            # at most once per PIPELINE_METRICS_TTL however many are connected
+            last_body = None
+            last_sent = time.monotonic()
+            while True:
+                body = metrics_cache.get()
+                now = time.monotonic()
+                if body != last_body:
+                    yield b''.join((b'data: ', body, b'\n\n'))
+                    last_body = body
+                    last_sent = now
+                elif now - last_sent >= METRICS_STREAM_KEEPALIVE:
+                    # Comment line; keeps proxies from closing an idle stream
+                    yield b': keepalive\n\n'
+                    last_sent = now
+                time.sleep(METRICS_STREAM_INTERVAL)
+        
+        response = Response(generate_events(), mimetype='text/event-stream',
+                            headers={'Cache-Control': 'no-cache',
+                                     'X-Accel-Buffering': 'no'})
+        response.call_on_close(stream_slots.release)
+        return response
     
     @app.route('/api/pipelines', methods=['GET'])
     def list_pipelines():
         """List all pipelines"""
         try:
             if not node.pipeline_manager:
-                return jsonify({'error': 'Pipeline manager not available'}), 503
+                return error_response('Pipeline manager not available', 503)
                 
-            pipelines = node.pipeline_manager.list_pipelines()
-            stats = node.pipeline_manager.get_pipeline_stats()
-            
-            return jsonify({
-                'pipelines': list(pipelines.values()),
-                'stats': stats
-            })
+            return list_cache.response()
             
         except Exception as e:
             node.logger.error(f"List pipelines error: {str(e)}")
-            return jsonify({'error': str(e)}), 500
+            return error_response(str(e), 500)
     
     @app.route('/api/pipelines/summary', methods=['GET'])
     def get_pipeline_summary():
         """Get pipeline summary for discovery service"""
         try:
             if not node.pipeline_manager:
-                return jsonify({'error': 'Pipeline manager not available'}), 503
+                return error_response('Pipeline manager not available', 503)
                 
-            summary = node.pipeline_manager.get_pipeline_summary()
-            return jsonify(summary)
+            return summary_cache.response()
             
         except Exception as e:
             node.logger.error(f"Get pipeline summary error: {str(e)}")
-            return jsonify({'error': str(e)}), 500
+            return error_response(str(e), 500)
     
     @app.route('/api/pipeline/<pipeline_id>', methods=['GET'])
     def get_pipeline(pipeline_id):
         """Get pipeline configuration"""
         try:
             if not node.pipeline_manager:
-                return jsonify({'error': 'Pipeline manager not available'}), 503
+                return error_response('Pipeline manager not available', 503)
                 
+            # Config only changes through the manager, which bumps metadata_rev
+            etag = pipeline_config_etag(pipeline_id)
+            not_modified = not_modified_if_current(etag)
+            if not_modified is not None:
+                return not_modified
+            
             pipeline = node.pipeline_manager.get_pipeline(pipeline_id)
             if not pipeline:
-                return jsonify({'error': 'Pipeline not found'}), 404
+                return error_response('Pipeline not found', 404)
             
-            return jsonify(pipeline)
+            return conditional_json_response(json_bytes(pipeline), etag)
             
         except Exception as e:
             node.logger.error(f"Get pipeline error: {str(e)}")
-            return jsonify({'error': str(e)}), 500
+            return error_response(str(e), 500)
         
     @app.route('/api/pipeline/<pipeline_id>/fullstatus', methods=['GET'])
     def get_pipeline_full_status(pipeline_id):
         """Get the full status of the pipeline"""
         try:
             if not node.pipeline_manager:
-                return jsonify({'error': 'Pipeline manager not available'}), 503
+                return error_response('Pipeline manager not available', 503)
 
-            status = node.pipeline_manager.get_pipeline_status(pipeline_id)
-            if not status:
-                return jsonify({'error': 'Pipeline not found'}), 404
+            if not node.pipeline_manager.get_pipeline(pipeline_id):
+                return error_response('Pipeline not found', 404)
 
-            return jsonify(status)
+            status_cache = full_status_caches.get(pipeline_id)
+            if status_cache is None:
+                status_cache = CachedPayload(lambda: node.pipeline_manager.get_pipeline_status(pipeline_id),
+                                             ttl=PIPELINE_LIST_TTL)
+                full_status_caches[pipeline_id] = status_cache
+            return status_cache.response()
 
         except Exception as e:
             node.logger.error(f"Get pipeline status error: {str(e)}")
-            return jsonify({'error': str(e)}), 500
+            return error_response(str(e), 500)
         
     @app.route('/api/pipeline/<pipeline_id>', methods=['DELETE'])
     def delete_pipeline(pipeline_id):
         """Delete a pipeline"""
         try:
             if not node.pipeline_manager:
-                return jsonify({'error': 'Pipeline manager not available'}), 503
+                return error_response('Pipeline manager not available', 503)
                 
             success = node.pipeline_manager.delete_pipeline(pipeline_id)
+            invalidate_pipeline_caches()
             if not success:
-                return jsonify({'error': 'Pipeline not found'}), 404
+                return error_response('Pipeline not found', 404)
             
             # Update node info after pipeline deletion
             node._update_node_info_with_pipelines()
@@ -192,43 +587,38 @@ def register_pipeline_routes(app, node):
             
         except Exception as e:
             node.logger.error(f"Delete pipeline error: {str(e)}")
-            return jsonify({'error': str(e)}), 500
+            return error_response(str(e), 500)
     
     @app.route('/api/pipeline/<pipeline_id>', methods=['PUT'])
     def update_pipeline(pipeline_id):
         """Update an existing pipeline"""
         try:
             if not node.pipeline_manager:
-                return jsonify({'error': 'Pipeline manager not available'}), 503
+                return error_response('Pipeline manager not available', 503)
                 
-            data = request.get_json()
-            if not data:
-                return jsonify({'error': 'No data provided'}), 400
+            data = request_json()
+            if not data or not isinstance(data, dict):
+                return error_response('No data provided', 400)
             
             # Check if pipeline exists
             pipeline = node.pipeline_manager.get_pipeline(pipeline_id)
             if not pipeline:
-                return jsonify({'error': 'Pipeline not found'}), 404
+                return error_response('Pipeline not found', 404)
             
             # Check if pipeline is running
             if pipeline.get('status') == 'running':
-                return jsonify({'error': 'Cannot update a running pipeline. Please stop it first.'}), 400
+                return error_response('Cannot update a running pipeline. Please stop it first.', 400)
             
             # Format device string for the specific inference engine if present
-            if 'model' in data and 'device' in data['model'] and 'engine_type' in data['model']:
-                original_device = data['model']['device']
-                engine_type = data['model']['engine_type']
-                
-                # Use hardware detector to format device for the specific engine
-                formatted_device = node.hardware_detector.format_for(engine_type, original_device)
-                data['model']['device'] = formatted_device
-                
-                node.logger.info(f"Device '{original_device}' formatted to '{formatted_device}' for engine '{engine_type}' (update)")
+            device_error = format_model_device(data.get('model'))
+            if device_error:
+                return error_response(device_error, 400)
             
             # Update the pipeline
             success = node.pipeline_manager.update_pipeline(pipeline_id, data)
+            invalidate_pipeline_caches()
             if not success:
-                return jsonify({'error': 'Failed to update pipeline'}), 500
+                return error_response('Failed to update pipeline', 500)
             
             node.logger.info(f"Pipeline updated: {data.get('name', 'Unknown')} ({pipeline_id})")
             
@@ -240,14 +630,14 @@ def register_pipeline_routes(app, node):
             
         except Exception as e:
             node.logger.error(f"Update pipeline error: {str(e)}")
-            return jsonify({'error': str(e)}), 500
+            return error_response(str(e), 500)
     
     @app.route('/api/pipeline/<pipeline_id>/start', methods=['POST'])
     def start_pipeline(pipeline_id):
         """Start a pipeline"""
         try:
             if not node.pipeline_manager:
-                return jsonify({'error': 'Pipeline manager not available'}), 503
+                return error_response('Pipeline manager not available', 503)
                 
             # Log the start attempt
             node.logger.info(f"Attempting to start pipeline: {pipeline_id}")
@@ -257,11 +647,12 @@ def register_pipeline_routes(app, node):
                 node.model_repo, 
                 node.result_publisher
             )
+            invalidate_pipeline_caches()
             
             if not success:
                 error_msg = f'Failed to start pipeline {pipeline_id} - pipeline may be already running, not found, or failed to initialize'
                 node.logger.error(error_msg)
-                return jsonify({'error': error_msg}), 400
+                return error_response(error_msg, 400)
             
             # Update node info with pipeline status change
             node._update_node_info_with_pipelines()
@@ -276,18 +667,19 @@ def register_pipeline_routes(app, node):
             
         except Exception as e:
             node.logger.error(f"Start pipeline error for {pipeline_id}: {str(e)}", exc_info=True)
-            return jsonify({'error': str(e)}), 500
+            return error_response(str(e), 500)
     
     @app.route('/api/pipeline/<pipeline_id>/stop', methods=['POST'])
     def stop_pipeline(pipeline_id):
         """Stop a pipeline"""
         try:
             if not node.pipeline_manager:
-                return jsonify({'error': 'Pipeline manager not available'}), 503
+                return error_response('Pipeline manager not available', 503)
                 
             success = node.pipeline_manager.stop_pipeline(pipeline_id)
+            invalidate_pipeline_caches()
             if not success:
-                return jsonify({'error': 'Pipeline not found or not running'}), 400
+                return error_response('Pipeline not found or not running', 400)
             
             # Update node info with pipeline status change
             node._update_node_info_with_pipelines()
@@ -302,18 +694,19 @@ def register_pipeline_routes(app, node):
             
         except Exception as e:
             node.logger.error(f"Stop pipeline error: {str(e)}")
-            return jsonify({'error': str(e)}), 500
+            return error_response(str(e), 500)
     
     @app.route('/api/pipeline/<pipeline_id>/inference/enable', methods=['POST'])
     def enable_pipeline_inference(pipeline_id):
         """Enable inference for a pipeline"""
         try:
             if not node.pipeline_manager:
-                return jsonify({'error': 'Pipeline manager not available'}), 503
+                return error_response('Pipeline manager not available', 503)
                 
             success = node.pipeline_manager.enable_pipeline_inference(pipeline_id)
+            invalidate_pipeline_caches()
             if not success:
-                return jsonify({'error': 'Pipeline not found'}), 404
+                return error_response('Pipeline not found', 404)
             
             node.logger.info(f"Pipeline inference enabled: {pipeline_id}")
             
@@ -325,18 +718,19 @@ def register_pipeline_routes(app, node):
             
         except Exception as e:
             node.logger.error(f"Enable pipeline inference error: {str(e)}")
-            return jsonify({'error': str(e)}), 500
+            return error_response(str(e), 500)
     
     @app.route('/api/pipeline/<pipeline_id>/inference/disable', methods=['POST'])
     def disable_pipeline_inference(pipeline_id):
         """Disable inference for a pipeline"""
         try:
             if not node.pipeline_manager:
-                return jsonify({'error': 'Pipeline manager not available'}), 503
+                return error_response('Pipeline manager not available', 503)
                 
             success = node.pipeline_manager.disable_pipeline_inference(pipeline_id)
+            invalidate_pipeline_caches()
             if not success:
-                return jsonify({'error': 'Pipeline not found'}), 404
+                return error_response('Pipeline not found', 404)
             
             node.logger.info(f"Pipeline inference disabled: {pipeline_id}")
             
@@ -348,18 +742,19 @@ def register_pipeline_routes(app, node):
             
         except Exception as e:
             node.logger.error(f"Disable pipeline inference error: {str(e)}")
-            return jsonify({'error': str(e)}), 500
+            return error_response(str(e), 500)
     
     @app.route('/api/pipeline/<pipeline_id>/publisher/<publisher_id>/enable', methods=['POST'])
     def enable_pipeline_publisher(pipeline_id, publisher_id):
         """Enable a specific publisher for a pipeline"""
         try:
             if not node.pipeline_manager:
-                return jsonify({'error': 'Pipeline manager not available'}), 503
+                return error_response('Pipeline manager not available', 503)
                 
             success = node.pipeline_manager.enable_pipeline_publisher(pipeline_id, publisher_id)
+            invalidate_pipeline_caches()
             if not success:
-                return jsonify({'error': 'Pipeline or publisher not found'}), 404
+                return error_response('Pipeline or publisher not found', 404)
             
             node.logger.info(f"Pipeline publisher enabled: {pipeline_id}/{publisher_id}")
             
@@ -372,18 +767,19 @@ def register_pipeline_routes(app, node):
             
         except Exception as e:
             node.logger.error(f"Enable pipeline publisher error: {str(e)}")
-            return jsonify({'error': str(e)}), 500
+            return error_response(str(e), 500)
     
     @app.route('/api/pipeline/<pipeline_id>/publisher/<publisher_id>/disable', methods=['POST'])
     def disable_pipeline_publisher(pipeline_id, publisher_id):
         """Disable a specific publisher for a pipeline"""
         try:
             if not node.pipeline_manager:
-                return jsonify({'error': 'Pipeline manager not available'}), 503
+                return error_response('Pipeline manager not available', 503)
                 
             success = node.pipeline_manager.disable_pipeline_publisher(pipeline_id, publisher_id)
+            invalidate_pipeline_caches()
             if not success:
-                return jsonify({'error': 'Pipeline or publisher not found'}), 404
+                return error_response('Pipeline or publisher not found', 404)
             
             node.logger.info(f"Pipeline publisher disabled: {pipeline_id}/{publisher_id}")
             
@@ -396,285 +792,127 @@ def register_pipeline_routes(app, node):
             
         except Exception as e:
             node.logger.error(f"Disable pipeline publisher error: {str(e)}")
-            return jsonify({'error': str(e)}), 500
+            return error_response(str(e), 500)
     
     @app.route('/api/pipeline/<pipeline_id>/publishers/status', methods=['GET'])
     def get_pipeline_publishers_status(pipeline_id):
         """Get the status of all publishers for a pipeline"""
         try:
             if not node.pipeline_manager:
-                return jsonify({'error': 'Pipeline manager not available'}), 503
+                return error_response('Pipeline manager not available', 503)
                 
             publisher_states = node.pipeline_manager.get_pipeline_publisher_states(pipeline_id)
             if publisher_states is None:
-                return jsonify({'error': 'Pipeline not found'}), 404
+                return error_response('Pipeline not found', 404)
 
-            return jsonify({
+            return json_response(json_bytes({
                 'pipeline_id': pipeline_id,
                 'publishers': publisher_states
-            })
+            }))
             
         except Exception as e:
             node.logger.error(f"Get pipeline publishers status error: {str(e)}")
-            return jsonify({'error': str(e)}), 500
+            return error_response(str(e), 500)
     
     @app.route('/api/pipeline/<pipeline_id>/status', methods=['GET'])
     def get_pipeline_status(pipeline_id):
         """Get pipeline status"""
         try:
             if not node.pipeline_manager:
-                return jsonify({'error': 'Pipeline manager not available'}), 503
+                return error_response('Pipeline manager not available', 503)
                 
+            # Config and the runtime entry only change through the manager,
+            # which bumps metadata_rev
+            etag = pipeline_config_etag(pipeline_id)
+            not_modified = not_modified_if_current(etag)
+            if not_modified is not None:
+                return not_modified
+            
             pipeline = node.pipeline_manager.get_pipeline(pipeline_id)
             if not pipeline:
-                return jsonify({'error': 'Pipeline not found'}), 404
+                return error_response('Pipeline not found', 404)
             
-            # Add runtime stats if available
+            # Add runtime stats if available, leaving out the live pipeline
+            # object and other private entries that are not JSON data
             runtime_stats = {}
             if pipeline_id in node.pipeline_manager.active_pipelines:
-                runtime_stats = node.pipeline_manager.active_pipelines[pipeline_id]
+                runtime_stats = {
+                    key: value for key, value in node.pipeline_manager.active_pipelines[pipeline_id].items()
+                    if key != 'pipeline_instance' and not key.startswith('_')
+                }
             
-            return jsonify({
+            return conditional_json_response(json_bytes({
                 'pipeline_id': pipeline_id,
                 'status': pipeline['status'],
                 'config': pipeline,
                 'runtime_stats': runtime_stats
-            })
+            }), etag)
             
         except Exception as e:
             node.logger.error(f"Get pipeline status error: {str(e)}")
-            return jsonify({'error': str(e)}), 500
+            return error_response(str(e), 500)
 
-    @app.route('/api/pipeline/<pipeline_id>/stream')
-    def stream_pipeline(pipeline_id):
-        """Stream processed frames from a running pipeline"""
-        def generate_frames():
-            if not node.pipeline_manager:
-                return
-                
-            frame_count = 0
-            max_retries = 50
-            retry_count = 0
-            last_frame_time = 0
-            frame_skip_threshold = 1.0 / 30
-            
-            pipeline_info = node.pipeline_manager.active_pipelines.get(pipeline_id)
-            pipeline_instance = pipeline_info.get('pipeline_instance') if pipeline_info else None
-            
-            try:
-                while retry_count < max_retries:
-                    try:
-                        if pipeline_id not in node.pipeline_manager.active_pipelines:
-                            node.logger.warning(f"Pipeline {pipeline_id} not in active pipelines")
-                            break
-                        
-                        pipeline_info = node.pipeline_manager.active_pipelines[pipeline_id]
-                        pipeline_instance = pipeline_info.get('pipeline_instance')
-                        
-                        if not pipeline_instance:
-                            retry_count += 1
-                            time.sleep(0.1)
-                            continue
-                        
-                        if hasattr(pipeline_instance, 'is_running') and not pipeline_instance.is_running():
-                            break
-                        
-                        current_time = time.time()
-                        if current_time - last_frame_time < frame_skip_threshold:
-                            time.sleep(0.01)
-                            continue
-                        
-                        frame = pipeline_instance.get_latest_frame()
-                        
-                        if frame is not None:
-                            height, width = frame.shape[:2]
-                            if width > 640:
-                                scale = 640 / width
-                                new_width = 640
-                                new_height = int(height * scale)
-                                frame = cv2.resize(frame, (new_width, new_height), interpolation=cv2.INTER_AREA)
-                            
-                            ret, buffer = cv2.imencode('.jpg', frame, [
-                                cv2.IMWRITE_JPEG_QUALITY, 70,
-                                cv2.IMWRITE_JPEG_OPTIMIZE, 1
-                            ])
-                            if ret:
-                                frame_bytes = buffer.tobytes()
-                                yield (b'--frame\r\n'
-                                       b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
-                                frame_count += 1
-                                retry_count = 0
-                                last_frame_time = current_time
-                        else:
-                            retry_count += 1
-                            time.sleep(0.01)
-                        
-                    except Exception as e:
-                        node.logger.error(f"Stream error for pipeline {pipeline_id}: {e}")
-                        retry_count += 1
-                        time.sleep(0.1)
-            finally:
-                if pipeline_instance and hasattr(pipeline_instance, 'stop_streaming'):
-                    pipeline_instance.stop_streaming()
-                node.logger.info(f"Stream ended for pipeline {pipeline_id}, streamed {frame_count} frames")
-        
+    def open_stream(pipeline_id, max_width, jpeg_quality, target_fps, label):
+        """Validate a pipeline and start an MJPEG stream response for it"""
         try:
             if not node.pipeline_manager or pipeline_id not in node.pipeline_manager.active_pipelines:
-                return jsonify({'error': 'Pipeline not found or not running'}), 404
+                return error_response('Pipeline not found or not running', 404)
             
             pipeline_info = node.pipeline_manager.active_pipelines.get(pipeline_id)
             if not pipeline_info or 'pipeline_instance' not in pipeline_info:
-                return jsonify({'error': 'Pipeline instance not available'}), 404
+                return error_response('Pipeline instance not available', 404)
             
             pipeline_instance = pipeline_info['pipeline_instance']
             
-            if hasattr(pipeline_instance, 'is_running') and not pipeline_instance.is_running():
-                return jsonify({'error': 'Pipeline is not running'}), 400
-            
-            if hasattr(pipeline_instance, 'is_initialized') and not pipeline_instance.is_initialized():
-                return jsonify({'error': 'Pipeline is not initialized'}), 400
-            
-            if hasattr(pipeline_instance, 'start_streaming'):
-                pipeline_instance.start_streaming()
+            if not pipeline_instance.is_running():
+                return error_response('Pipeline is not running', 400)
             
-            max_wait_time = 5.0
-            wait_start = time.time()
-            frame_available = False
+            if not pipeline_instance.is_initialized():
+                return error_response('Pipeline is not initialized', 400)
             
-            while time.time() - wait_start < max_wait_time:
-                if pipeline_instance.get_latest_frame() is not None:
-                    frame_available = True
-                    break
-                time.sleep(0.1)
+            if not stream_slots.acquire(blocking=False):
+                return error_response('Too many active preview streams. Close another preview and try again.', 503)
             
-            if not frame_available:
-                if hasattr(pipeline_instance, 'stop_streaming'):
+            try:
+                pipeline_instance.start_streaming()
+                
+                if not pipeline_instance.first_frame_ready.wait(FIRST_FRAME_TIMEOUT):
+                    stream_slots.release()
                     pipeline_instance.stop_streaming()
-                return jsonify({'error': 'Pipeline is starting - no frames available yet. Please try again in a moment.'}), 503
-            
-            return Response(generate_frames(),
-                          mimetype='multipart/x-mixed-replace; boundary=frame',
-                          headers={'Cache-Control': 'no-cache, no-store, must-revalidate',
-                                 'Pragma': 'no-cache',
-                                 'Expires': '0'})
+                    return error_response('Pipeline is starting - no frames available yet. Please try again in a moment.', 503)
+                
+                frames = _mjpeg_generator(pipeline_id, pipeline_info, pipeline_instance, max_width,
+                                          jpeg_quality, target_fps, node.logger, label)
+                # Parts are already bytes; direct_passthrough hands the generator to
+                # the server without Werkzeug's per-chunk encoding wrapper
+                response = Response(frames,
+                                    mimetype='multipart/x-mixed-replace; boundary=frame',
+                                    direct_passthrough=True,
+                                    headers={'Cache-Control': 'no-cache, no-store, must-revalidate',
+                                             'Pragma': 'no-cache',
+                                             'Expires': '0'})
+            except Exception:
+                stream_slots.release()
+                raise
+            
+            # The server closes the response when the client disconnects or the stream ends
+            response.call_on_close(stream_slots.release)
+            return response
         except Exception as e:
-            node.logger.error(f"Failed to start stream for pipeline {pipeline_id}: {e}")
-            return jsonify({'error': 'Failed to start video stream'}), 500
+            node.logger.error("Failed to start %s for pipeline %s: %s", label, pipeline_id, e)
+            return error_response(f'Failed to start {label}', 500)
+    
+    @app.route('/api/pipeline/<pipeline_id>/stream')
+    def stream_pipeline(pipeline_id):
+        """Stream processed frames from a running pipeline"""
+        return open_stream(pipeline_id, max_width=640, jpeg_quality=70, target_fps=30,
+                           label='video stream')
     
     @app.route('/api/pipeline/<pipeline_id>/stream/hq')
     def stream_pipeline_hq(pipeline_id):
         """High-quality stream for full preview modal"""
-        def generate_frames():
-            if not node.pipeline_manager:
-                return
-                
-            frame_count = 0
-            max_retries = 50
-            retry_count = 0
-            last_frame_time = 0
-            frame_skip_threshold = 1.0 / 60
-            
-            pipeline_info = node.pipeline_manager.active_pipelines.get(pipeline_id)
-            pipeline_instance = pipeline_info.get('pipeline_instance') if pipeline_info else None
-            
-            try:
-                while retry_count < max_retries:
-                    try:
-                        if pipeline_id not in node.pipeline_manager.active_pipelines:
-                            break
-                        
-                        pipeline_info = node.pipeline_manager.active_pipelines[pipeline_id]
-                        pipeline_instance = pipeline_info.get('pipeline_instance')
-                        
-                        if not pipeline_instance:
-                            retry_count += 1
-                            time.sleep(0.05)
-                            continue
-                        
-                        if hasattr(pipeline_instance, 'is_running') and not pipeline_instance.is_running():
-                            break
-                        
-                        current_time = time.time()
-                        if current_time - last_frame_time < frame_skip_threshold:
-                            time.sleep(0.005)
-                            continue
-                        
-                        frame = pipeline_instance.get_latest_frame()
-                        
-                        if frame is not None:
-                            height, width = frame.shape[:2]
-                            if width > 1280:
-                                scale = 1280 / width
-                                new_width = 1280
-                                new_height = int(height * scale)
-                                frame = cv2.resize(frame, (new_width, new_height), interpolation=cv2.INTER_AREA)
-                            
-                            ret, buffer = cv2.imencode('.jpg', frame, [
-                                cv2.IMWRITE_JPEG_QUALITY, 85,
-                                cv2.IMWRITE_JPEG_OPTIMIZE, 1
-                            ])
-                            if ret:
-                                frame_bytes = buffer.tobytes()
-                                yield (b'--frame\r\n'
-                                       b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
-                                frame_count += 1
-                                retry_count = 0
-                                last_frame_time = current_time
-                        else:
-                            retry_count += 1
-                            time.sleep(0.005)
-                        
-                    except Exception as e:
-                        node.logger.error(f"HQ Stream error for pipeline {pipeline_id}: {e}")
-                        retry_count += 1
-                        time.sleep(0.05)
-            finally:
-                if pipeline_instance and hasattr(pipeline_instance, 'stop_streaming'):
-                    pipeline_instance.stop_streaming()
-                node.logger.info(f"HQ Stream ended for pipeline {pipeline_id}, streamed {frame_count} frames")
-        
-        try:
-            if not node.pipeline_manager or pipeline_id not in node.pipeline_manager.active_pipelines:
-                return jsonify({'error': 'Pipeline not found or not running'}), 404
-            
-            pipeline_info = node.pipeline_manager.active_pipelines.get(pipeline_id)
-            if not pipeline_info or 'pipeline_instance' not in pipeline_info:
-                return jsonify({'error': 'Pipeline instance not available'}), 404
-            
-            pipeline_instance = pipeline_info['pipeline_instance']
-            
-            if hasattr(pipeline_instance, 'is_running') and not pipeline_instance.is_running():
-                return jsonify({'error': 'Pipeline is not running'}), 400
-            
-            if hasattr(pipeline_instance, 'is_initialized') and not pipeline_instance.is_initialized():
-                return jsonify({'error': 'Pipeline is not initialized'}), 400
-            
-            if hasattr(pipeline_instance, 'start_streaming'):
-                pipeline_instance.start_streaming()
-            
-            max_wait_time = 5.0
-            wait_start = time.time()
-            frame_available = False
-            
-            while time.time() - wait_start < max_wait_time:
-                if pipeline_instance.get_latest_frame() is not None:
-                    frame_available = True
-                    break
-                time.sleep(0.1)
-            
-            if not frame_available:
-                if hasattr(pipeline_instance, 'stop_streaming'):
-                    pipeline_instance.stop_streaming()
-                return jsonify({'error': 'Pipeline is starting - no frames available yet. Please try again in a moment.'}), 503
-            
-            return Response(generate_frames(),
-                          mimetype='multipart/x-mixed-replace; boundary=frame',
-                          headers={'Cache-Control': 'no-cache, no-store, must-revalidate',
-                                 'Pragma': 'no-cache',
-                                 'Expires': '0'})
-        except Exception as e:
-            node.logger.error(f"Failed to start HQ stream for pipeline {pipeline_id}: {e}")
-            return jsonify({'error': 'Failed to start HQ video stream'}), 500
+        return open_stream(pipeline_id, max_width=1280, jpeg_quality=85, target_fps=60,
+                           label='HQ video stream')
     
     @app.route('/api/pipeline/<pipeline_id>/thumbnail')
     def get_pipeline_thumbnail(pipeline_id):
@@ -682,49 +920,59 @@ def register_pipeline_routes(app, node):
         try:
             from flask import send_file
             if not node.pipeline_manager:
-                return jsonify({'error': 'Pipeline manager not available'}), 503
+                return error_response('Pipeline manager not available', 503)
             
-            thumbnail_path = node.pipeline_manager.get_pipeline_thumbnail_path(pipeline_id)
+            thumbnail_path, version = get_thumbnail(pipeline_id)
             
             if not thumbnail_path:
-                return jsonify({'error': 'Thumbnail not found'}), 404
+                return error_response('Thumbnail not found', 404)
             
-            return send_file(thumbnail_path, mimetype='image/jpeg')
+            # Clients fetch thumbnails with ?v=<version> from the exists check, so a
+            # regenerated thumbnail gets a new URL and the cached copy can be reused
+            response = send_file(thumbnail_path, mimetype='image/jpeg',
+                                 etag=version, max_age=THUMBNAIL_MAX_AGE)
+            response.cache_control.public = True
+            return response
             
         except Exception as e:
             node.logger.error(f"Error serving thumbnail for pipeline {pipeline_id}: {e}")
-            return jsonify({'error': 'Failed to serve thumbnail'}), 500
+            return error_response('Failed to serve thumbnail', 500)
     
     @app.route('/api/pipeline/<pipeline_id>/thumbnail/exists')
     def check_pipeline_thumbnail(pipeline_id):
         """Check if pipeline has a thumbnail"""
         try:
             if not node.pipeline_manager:
-                return jsonify({'error': 'Pipeline manager not available'}), 503
+                return error_response('Pipeline manager not available', 503)
             
-            has_thumbnail = node.pipeline_manager.has_pipeline_thumbnail(pipeline_id)
-            return jsonify({'has_thumbnail': has_thumbnail})
+            thumbnail_path, version = get_thumbnail(pipeline_id)
+            body = json_bytes({
+                'has_thumbnail': thumbnail_path is not None,
+                'version': version
+            })
+            return conditional_json_response(body, payload_etag(body))
             
         except Exception as e:
             node.logger.error(f"Error checking thumbnail for pipeline {pipeline_id}: {e}")
-            return jsonify({'error': 'Failed to check thumbnail'}), 500
+            return error_response('Failed to check thumbnail', 500)
     
     @app.route('/api/pipeline/<pipeline_id>/thumbnail/generate', methods=['POST'])
     def generate_pipeline_thumbnail(pipeline_id):
         """Generate a fresh thumbnail for a pipeline from current frame"""
         try:
             if not node.pipeline_manager:
-                return jsonify({'error': 'Pipeline manager not available'}), 503
+                return error_response('Pipeline manager not available', 503)
             
             pipeline = node.pipeline_manager.get_pipeline(pipeline_id)
             if not pipeline:
-                return jsonify({'error': 'Pipeline not found'}), 404
+                return error_response('Pipeline not found', 404)
             
             success = node.pipeline_manager.generate_pipeline_thumbnail(pipeline_id)
+            thumbnail_lookups.pop(pipeline_id, None)
             
             if success:
-                has_thumbnail = node.pipeline_manager.has_pipeline_thumbnail(pipeline_id)
-                thumbnail_path = node.pipeline_manager.get_pipeline_thumbnail_path(pipeline_id)
+                thumbnail_path, _ = get_thumbnail(pipeline_id)
+                has_thumbnail = thumbnail_path is not None
                 
                 return jsonify({
                     'success': True,
@@ -742,237 +990,316 @@ def register_pipeline_routes(app, node):
             
         except Exception as e:
             node.logger.error(f"Generate thumbnail error for pipeline {pipeline_id}: {str(e)}")
-            return jsonify({'error': str(e)}), 500
+            return error_response(str(e), 500)
+    
+    def build_export(pipeline):
+        """Collect what goes into a pipeline export
+        
+        Returns (config_data, model_sources, model_metadata), where model_sources
+        are (source path, archive name) pairs zipped straight from the model
+        repository and model_metadata is None when no model files are included.
+        """
+        pipeline_id = pipeline['id']
+        config_data = {
+            'name': pipeline['name'],
+            'description': pipeline.get('description', ''),
+            'frame_source': pipeline['frame_source'],
+            'model': pipeline['model'],
+            'destinations': pipeline.get('destinations', []),
+            'export_metadata': {
+                'exported_by': node.node_name,
+                'export_date': datetime.now().isoformat(),
+                'pipeline_id': pipeline_id,
+                'version': '1.0'
+            }
+        }
+        
+        model_sources = []
+        exported_metadata = None
+        model_files_included = []
+        if 'model' in pipeline and 'id' in pipeline['model']:
+            model_id = pipeline['model']['id']
+            model_metadata = node.model_repo.get_model_metadata(model_id)
+            
+            if model_metadata:
+                model_path = node.model_repo.get_model_path(model_id)
+                if model_path and os.path.exists(model_path):
+                    model_filename = model_metadata['stored_filename']
+                    model_sources.append((model_path, f'models/{model_filename}'))
+                    model_files_included.append(model_filename)
+                    
+                    model_dir = os.path.dirname(model_path)
+                    model_base_name = os.path.splitext(model_filename)[0]
+                    
+                    # DirEntry.is_file() uses the type from the directory listing,
+                    # so sibling files are found without a stat per entry
+                    with os.scandir(model_dir) as entries:
+                        for entry in entries:
+                            name = entry.name
+                            if name.startswith(model_base_name) and name != model_filename and entry.is_file():
+                                model_sources.append((entry.path, f'models/{name}'))
+                                model_files_included.append(name)
+                    
+                    exported_metadata = model_metadata
+                    model_files_included.append('model_metadata.json')
+        
+        config_data['export_metadata']['model_files'] = model_files_included
+        return config_data, model_sources, exported_metadata
+    
+    def run_export(job, pipeline, zip_filename):
+        """Write a pipeline export to a temporary ZIP file, reporting bytes written"""
+        config_data, model_sources, model_metadata = build_export(pipeline)
+        total = sum(os.path.getsize(path) for path, _ in model_sources)
+        job.update(stage='writing', bytes_written=0, total_bytes=total)
+        
+        with tempfile.NamedTemporaryFile(suffix='.zip', delete=False) as f:
+            job.output_path = f.name
+            written = 0
+            for chunk in _export_zip_chunks(config_data, model_sources, model_metadata):
+                f.write(chunk)
+                written += len(chunk)
+                job.update(bytes_written=written)
+        
+        node.logger.info(f"Pipeline exported: {pipeline['name']} ({pipeline['id']})")
+        return {'filename': zip_filename, 'size': written}
+    
+    def job_progress_response(job_id, kind):
+        """Stream a job's state as server-sent events until it finishes"""
+        job = jobs.get(job_id)
+        if job is None or job.kind != kind:
+            return error_response('Job not found', 404)
+        
+        def generate_events():
+            seq = -1
+            while True:
+                seq, changed = job.wait(seq, METRICS_STREAM_KEEPALIVE)
+                if not changed:
+                    yield b': keepalive\n\n'
+                    continue
+                snapshot = job.snapshot()
+                yield b''.join((b'data: ', json_bytes(snapshot), b'\n\n'))
+                if snapshot['state'] != 'running':
+                    return
+                # Coalesce bursts of updates (one per export chunk) into one event
+                time.sleep(JOB_PROGRESS_INTERVAL)
+        
+        return Response(generate_events(), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache',
+                                 'X-Accel-Buffering': 'no'})
     
     @app.route('/api/pipeline/<pipeline_id>/export', methods=['GET'])
     def export_pipeline(pipeline_id):
         """Export a pipeline as a ZIP file containing configuration and model files"""
         try:
             if not node.pipeline_manager:
-                return jsonify({'error': 'Pipeline manager not available'}), 503
+                return error_response('Pipeline manager not available', 503)
             
             pipeline = node.pipeline_manager.get_pipeline(pipeline_id)
             if not pipeline:
-                return jsonify({'error': 'Pipeline not found'}), 404
+                return error_response('Pipeline not found', 404)
             
-            zip_fd, zip_path = tempfile.mkstemp(suffix='.zip')
+            config_data, model_sources, model_metadata = build_export(pipeline)
             
-            try:
-                with tempfile.TemporaryDirectory() as temp_dir:
-                    config_data = {
-                        'name': pipeline['name'],
-                        'description': pipeline.get('description', ''),
-                        'frame_source': pipeline['frame_source'],
-                        'model': pipeline['model'],
-                        'destinations': pipeline.get('destinations', []),
-                        'export_metadata': {
-                            'exported_by': node.node_name,
-                            'export_date': datetime.now().isoformat(),
-                            'pipeline_id': pipeline_id,
-                            'version': '1.0'
-                        }
-                    }
-                    
-                    config_file = os.path.join(temp_dir, 'pipeline_config.json')
-                    with open(config_file, 'w') as f:
-                        json.dump(config_data, f, indent=2)
-                    
-                    models_dir = os.path.join(temp_dir, 'models')
-                    os.makedirs(models_dir, exist_ok=True)
-                    
-                    model_files_included = []
-                    if 'model' in pipeline and 'id' in pipeline['model']:
-                        model_id = pipeline['model']['id']
-                        model_metadata = node.model_repo.get_model_metadata(model_id)
-                        
-                        if model_metadata:
-                            model_path = node.model_repo.get_model_path(model_id)
-                            if model_path and os.path.exists(model_path):
-                                model_filename = model_metadata['stored_filename']
-                                dest_path = os.path.join(models_dir, model_filename)
-                                shutil.copy2(model_path, dest_path)
-                                model_files_included.append(model_filename)
-                                
-                                model_dir = os.path.dirname(model_path)
-                                model_base_name = os.path.splitext(model_metadata['stored_filename'])[0]
-                                
-                                for file in os.listdir(model_dir):
-                                    if file.startswith(model_base_name) and file != model_metadata['stored_filename']:
-                                        src_file = os.path.join(model_dir, file)
-                                        dest_file = os.path.join(models_dir, file)
-                                        if os.path.isfile(src_file):
-                                            shutil.copy2(src_file, dest_file)
-                                            model_files_included.append(file)
-                                
-                                model_metadata_file = os.path.join(models_dir, 'model_metadata.json')
-                                with open(model_metadata_file, 'w') as f:
-                                    json.dump(model_metadata, f, indent=2)
-                                model_files_included.append('model_metadata.json')
-                    
-                    config_data['export_metadata']['model_files'] = model_files_included
-                    
-                    with open(config_file, 'w') as f:
-                        json.dump(config_data, f, indent=2)
-                    
-                    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                        zipf.write(config_file, 'pipeline_config.json')
-                        
-                        for root, dirs, files in os.walk(models_dir):
-                            for file in files:
-                                file_path = os.path.join(root, file)
-                                arc_name = os.path.join('models', os.path.relpath(file_path, models_dir))
-                                zipf.write(file_path, arc_name)
-                
-                os.close(zip_fd)
-                
-                import re
-                zip_filename = f"{pipeline['name'].replace(' ', '_').replace('/', '_')}_export.zip"
-                zip_filename = re.sub(r'[<>:"/\\|?*]', '_', zip_filename)
-                
-                node.logger.info(f"Pipeline exported: {pipeline['name']} ({pipeline_id})")
+            def generate_zip():
+                try:
+                    yield from _export_zip_chunks(config_data, model_sources, model_metadata)
+                    node.logger.info(f"Pipeline exported: {pipeline['name']} ({pipeline_id})")
+                except Exception as e:
+                    # Headers are already sent, so the client just sees a truncated download
+                    node.logger.error(f"Export pipeline error while streaming: {str(e)}")
+            
+            zip_filename = _export_filename(pipeline['name'])
+            
+            response = Response(
+                generate_zip(),
+                mimetype='application/zip',
+                headers={'Content-Disposition': f'attachment; filename="{zip_filename}"'}
+            )
+            return response
                 
-                with open(zip_path, 'rb') as f:
-                    zip_contents = f.read()
+        except Exception as e:
+            node.logger.error(f"Export pipeline error: {str(e)}")
+            return error_response(str(e), 500)
+    
+    @app.route('/api/pipeline/<pipeline_id>/export', methods=['POST'])
+    def start_pipeline_export(pipeline_id):
+        """Build a pipeline export in the background, returning a job id to follow"""
+        try:
+            if not node.pipeline_manager:
+                return error_response('Pipeline manager not available', 503)
+            
+            pipeline = node.pipeline_manager.get_pipeline(pipeline_id)
+            if not pipeline:
+                return error_response('Pipeline not found', 404)
+            
+            job = jobs.start('export', run_export, pipeline, _export_filename(pipeline['name']))
+            return json_response(json_bytes({'job_id': job.id, 'status': 'exporting'}), 202)
+            
+        except Exception as e:
+            node.logger.error(f"Export pipeline error: {str(e)}")
+            return error_response(str(e), 500)
+    
+    @app.route('/api/pipeline/export/<job_id>/progress', methods=['GET'])
+    def get_export_progress(job_id):
+        """Follow a background export as server-sent events"""
+        return job_progress_response(job_id, 'export')
+    
+    @app.route('/api/pipeline/export/<job_id>/download', methods=['GET'])
+    def download_pipeline_export(job_id):
+        """Download the ZIP produced by a finished background export"""
+        from flask import send_file
+        job = jobs.get(job_id)
+        if job is None or job.kind != 'export':
+            return error_response('Job not found', 404)
+        if job.state != 'done':
+            return error_response(f'Export is not ready (state: {job.state})', 409)
+        
+        response = send_file(job.output_path, mimetype='application/zip', as_attachment=True,
+                             download_name=job.result['filename'])
+        # The archive is only needed for this one download
+        response.call_on_close(lambda: jobs.discard(job_id))
+        return response
+    
+    def run_import(job, temp_dir, zip_path):
+        """Import a pipeline from a saved upload, cleaning up temp_dir when done"""
+        try:
+            job.update(stage='extracting')
+            extract_dir = os.path.join(temp_dir, 'extracted')
+            with zipfile.ZipFile(zip_path, 'r') as zipf:
+                # Everything is checked before a single byte is written to disk
+                model_members = _import_model_members(zipf)
                 
                 try:
-                    os.unlink(zip_path)
-                except:
-                    pass
+                    config_data = json.loads(zipf.read('pipeline_config.json'))
+                except KeyError:
+                    raise ValueError('Invalid pipeline export: missing pipeline_config.json')
                 
-                response = Response(
-                    zip_contents,
-                    mimetype='application/zip',
-                    headers={
-                        'Content-Disposition': f'attachment; filename="{zip_filename}"',
-                        'Content-Length': str(len(zip_contents))
-                    }
-                )
-                return response
+                missing = _missing_field(config_data, ('name', 'frame_source', 'model'))
+                if missing:
+                    raise ValueError(f'Invalid pipeline configuration: missing {missing}')
                 
-            except Exception as e:
-                try:
-                    os.close(zip_fd)
-                    os.unlink(zip_path)
-                except:
-                    pass
-                raise e
+                for info in model_members:
+                    zipf.extract(info, extract_dir)
+            
+            models_dir = os.path.join(extract_dir, 'models')
+            new_model_id = None
+            
+            if os.path.exists(models_dir):
+                job.update(stage='storing model')
+                model_metadata_file = os.path.join(models_dir, 'model_metadata.json')
+                model_metadata = None
+                if os.path.exists(model_metadata_file):
+                    with open(model_metadata_file, 'r') as f:
+                        model_metadata = json.load(f)
                 
-        except Exception as e:
-            node.logger.error(f"Export pipeline error: {str(e)}")
-            return jsonify({'error': str(e)}), 500
+                model_files = [f for f in os.listdir(models_dir) if f != 'model_metadata.json']
+                if model_files:
+                    main_model_file = model_files[0]
+                    if model_metadata and 'stored_filename' in model_metadata:
+                        main_model_file = model_metadata['stored_filename']
+                        if main_model_file not in model_files:
+                            main_model_file = model_files[0]
+                    
+                    model_file_path = os.path.join(models_dir, main_model_file)
+                    original_filename = model_metadata.get('original_filename', main_model_file) if model_metadata else main_model_file
+                    engine_type = config_data['model'].get('engine_type', 'unknown')
+                    description = f"Imported with pipeline: {config_data['name']}"
+                    imported_name = model_metadata.get('name', os.path.splitext(original_filename)[0]) if model_metadata else os.path.splitext(original_filename)[0]
+                    
+                    new_model_id = node.model_repo.store_model(
+                        model_file_path, 
+                        original_filename, 
+                        engine_type, 
+                        description,
+                        imported_name,
+                        move=True
+                    )
+                    
+                    new_model_metadata = node.model_repo.get_model_metadata(new_model_id)
+                    if new_model_metadata:
+                        new_model_dir = os.path.dirname(new_model_metadata['stored_path'])
+                        new_model_base = os.path.splitext(new_model_metadata['stored_filename'])[0]
+                        
+                        for model_file in model_files:
+                            if model_file != main_model_file and model_file != 'model_metadata.json':
+                                src_path = os.path.join(models_dir, model_file)
+                                file_ext = os.path.splitext(model_file)[1]
+                                dest_filename = f"{new_model_base}{file_ext}"
+                                dest_path = os.path.join(new_model_dir, dest_filename)
+                                # The extracted copy is discarded afterwards, so a rename
+                                # (or copy-and-delete across filesystems) is enough
+                                shutil.move(src_path, dest_path)
+            
+            if new_model_id:
+                config_data['model']['id'] = new_model_id
+            
+            job.update(stage='creating pipeline')
+            original_name = config_data['name']
+            pipeline_name = original_name
+            existing_names = node.pipeline_manager.get_pipeline_names()
+            
+            counter = 1
+            while pipeline_name in existing_names:
+                pipeline_name = f"{original_name} (imported {counter})"
+                counter += 1
+            
+            config_data['name'] = pipeline_name
+            
+            if 'export_metadata' in config_data:
+                del config_data['export_metadata']
+            
+            pipeline_id = node.pipeline_manager.create_pipeline(config_data)
+            invalidate_pipeline_caches()
+            
+            node.logger.info(f"Pipeline imported: {pipeline_name} ({pipeline_id})")
+            
+            return {
+                'status': 'imported',
+                'pipeline_id': pipeline_id,
+                'pipeline_name': pipeline_name,
+                'model_id': new_model_id,
+                'message': f'Pipeline "{pipeline_name}" imported successfully'
+            }
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
     
     @app.route('/api/pipeline/import', methods=['POST'])
     def import_pipeline():
-        """Import a pipeline from an uploaded ZIP file"""
+        """Import a pipeline from an uploaded ZIP file in the background
+        
+        The upload is saved before responding; extraction, model storage and
+        pipeline creation run as a job followed at /api/pipeline/import/<job_id>/progress.
+        """
         try:
             if not node.pipeline_manager:
-                return jsonify({'error': 'Pipeline manager not available'}), 503
+                return error_response('Pipeline manager not available', 503)
             
             if 'file' not in request.files:
-                return jsonify({'error': 'No file uploaded'}), 400
+                return error_response('No file uploaded', 400)
             
             file = request.files['file']
             if file.filename == '' or file.filename is None:
-                return jsonify({'error': 'No file selected'}), 400
+                return error_response('No file selected', 400)
             
             if not file.filename.endswith('.zip'):
-                return jsonify({'error': 'File must be a ZIP archive'}), 400
+                return error_response('File must be a ZIP archive', 400)
             
-            with tempfile.TemporaryDirectory() as temp_dir:
-                zip_path = os.path.join(temp_dir, file.filename)
+            temp_dir = tempfile.mkdtemp(prefix='pipeline_import_')
+            try:
+                zip_path = os.path.join(temp_dir, 'upload.zip')
                 file.save(zip_path)
-                
-                extract_dir = os.path.join(temp_dir, 'extracted')
-                with zipfile.ZipFile(zip_path, 'r') as zipf:
-                    zipf.extractall(extract_dir)
-                
-                config_file = os.path.join(extract_dir, 'pipeline_config.json')
-                if not os.path.exists(config_file):
-                    return jsonify({'error': 'Invalid pipeline export: missing pipeline_config.json'}), 400
-                
-                with open(config_file, 'r') as f:
-                    config_data = json.load(f)
-                
-                required_fields = ['name', 'frame_source', 'model']
-                for field in required_fields:
-                    if field not in config_data:
-                        return jsonify({'error': f'Invalid pipeline configuration: missing {field}'}), 400
-                
-                models_dir = os.path.join(extract_dir, 'models')
-                new_model_id = None
-                
-                if os.path.exists(models_dir):
-                    model_metadata_file = os.path.join(models_dir, 'model_metadata.json')
-                    model_metadata = None
-                    if os.path.exists(model_metadata_file):
-                        with open(model_metadata_file, 'r') as f:
-                            model_metadata = json.load(f)
-                    
-                    model_files = [f for f in os.listdir(models_dir) if f != 'model_metadata.json']
-                    if model_files:
-                        main_model_file = model_files[0]
-                        if model_metadata and 'stored_filename' in model_metadata:
-                            main_model_file = model_metadata['stored_filename']
-                            if main_model_file not in model_files:
-                                main_model_file = model_files[0]
-                        
-                        model_file_path = os.path.join(models_dir, main_model_file)
-                        original_filename = model_metadata.get('original_filename', main_model_file) if model_metadata else main_model_file
-                        engine_type = config_data['model'].get('engine_type', 'unknown')
-                        description = f"Imported with pipeline: {config_data['name']}"
-                        imported_name = model_metadata.get('name', os.path.splitext(original_filename)[0]) if model_metadata else os.path.splitext(original_filename)[0]
-                        
-                        new_model_id = node.model_repo.store_model(
-                            model_file_path, 
-                            original_filename, 
-                            engine_type, 
-                            description,
-                            imported_name
-                        )
-                        
-                        new_model_metadata = node.model_repo.get_model_metadata(new_model_id)
-                        if new_model_metadata:
-                            new_model_dir = os.path.dirname(new_model_metadata['stored_path'])
-                            new_model_base = os.path.splitext(new_model_metadata['stored_filename'])[0]
-                            
-                            for model_file in model_files:
-                                if model_file != main_model_file and model_file != 'model_metadata.json':
-                                    src_path = os.path.join(models_dir, model_file)
-                                    file_ext = os.path.splitext(model_file)[1]
-                                    dest_filename = f"{new_model_base}{file_ext}"
-                                    dest_path = os.path.join(new_model_dir, dest_filename)
-                                    shutil.copy2(src_path, dest_path)
-                
-                if new_model_id:
-                    config_data['model']['id'] = new_model_id
-                
-                original_name = config_data['name']
-                pipeline_name = original_name
-                existing_pipelines = node.pipeline_manager.list_pipelines()
-                existing_names = [p['name'] for p in existing_pipelines.values()]
-                
-                counter = 1
-                while pipeline_name in existing_names:
-                    pipeline_name = f"{original_name} (imported {counter})"
-                    counter += 1
-                
-                config_data['name'] = pipeline_name
-                
-                if 'export_metadata' in config_data:
-                    del config_data['export_metadata']
-                
-                pipeline_id = node.pipeline_manager.create_pipeline(config_data)
-                
-                node.logger.info(f"Pipeline imported: {pipeline_name} ({pipeline_id})")
-                
-                return jsonify({
-                    'status': 'imported',
-                    'pipeline_id': pipeline_id,
-                    'pipeline_name': pipeline_name,
-                    'model_id': new_model_id,
-                    'message': f'Pipeline "{pipeline_name}" imported successfully'
-                })
+                job = jobs.start('import', run_import, temp_dir, zip_path)
+            except Exception:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+                raise
+            
+            return json_response(json_bytes({'job_id': job.id, 'status': 'importing'}), 202)
                 
         except Exception as e:
             node.logger.error(f"Import pipeline error: {str(e)}")
-            return jsonify({'error': str(e)}), 500
+            return error_response(str(e), 500)
+    
+    @app.route('/api/pipeline/import/<job_id>/progress', methods=['GET'])
+    def get_import_progress(job_id):
+        """Follow a background import as server-sent events"""
+        return job_progress_response(job_id, 'import')
@@ -2,31 +2,224 @@
 Publisher API Routes
 Handles result publisher configuration and management
 """
-import uuid
-from datetime import datetime
-from flask import request, jsonify
-from ResultPublisher import ResultDestination, get_available_destination_types
+import atexit
+import concurrent.futures
+import copy
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from flask import jsonify
+from ResultPublisher import DESTINATION_CLASSES, ResultDestination, get_available_destination_types
 
-try:
-    from ..settings_manager import save_settings
-except ImportError:
-    from InferenceNode.settings_manager import save_settings
+from ..settings_manager import request_save
+from ..utils import iso_now
+
+from .io_pool import get_io_pool
+from .responses import CachedPayload, json_bytes, json_response, request_json
+
+# Longest a favorites test waits for all destinations to finish publishing
+TEST_PUBLISH_TIMEOUT = 10.0
+
+# Destinations built for favorite tests are kept warm for reuse; at most
+# FAVORITE_DESTINATION_CACHE_SIZE are kept, each closed after sitting idle
+# for FAVORITE_DESTINATION_IDLE_TTL seconds
+FAVORITE_DESTINATION_CACHE_SIZE = 16
+FAVORITE_DESTINATION_IDLE_TTL = 300.0
+
+# Reply to a test publish when no destinations are configured
+NO_DESTINATIONS_BODY = json_bytes({
+    'status': 'warning',
+    'message': 'No destinations configured - cannot publish test message',
+    'results': {},
+    'destinations_count': 0
+})
+
+# Seconds clients may reuse the destination type listing before revalidating
+DESTINATION_TYPES_MAX_AGE = 300
+
+
+class _FavoriteEntry:
+    """A cached favorite destination and the number of requests using it"""
+    
+    __slots__ = ('destination', 'type', 'config', 'last_used', 'users', 'retired')
+    
+    def __init__(self, destination, destination_type: str, config: dict, now: float):
+        self.destination = destination
+        self.type = destination_type
+        self.config = config
+        self.last_used = now
+        self.users = 0
+        self.retired = False  # dropped from the cache; closed once no request uses it
+
+
+class _FavoriteDestinationCache:
+    """Configured destinations for favorite tests, keyed by favorite id (LRU with idle expiry)
+    
+    Building and closing a destination may connect to a broker or open a port,
+    so both happen outside the lock. Entries in use are never evicted or
+    closed; acquire() hands out a lease that release() gives back.
+    """
+    
+    def __init__(self, max_size: int, idle_ttl: float):
+        self.max_size = max_size
+        self.idle_ttl = idle_ttl
+        self._entries = OrderedDict()  # favorite id -> _FavoriteEntry
+        self._lock = threading.Lock()
+    
+    def acquire(self, favorite_id: str, favorite: dict, build) -> _FavoriteEntry:
+        """Lease the destination for a favorite, building it if missing or its config changed"""
+        stale = []
+        try:
+            with self._lock:
+                entry = self._lookup(favorite_id, favorite, stale)
+                if entry is not None:
+                    entry.users += 1
+                    return entry
+            
+            destination = build(favorite)
+            with self._lock:
+                entry = self._lookup(favorite_id, favorite, stale)
+                if entry is None:
+                    entry = _FavoriteEntry(destination, favorite['type'],
+                                           copy.deepcopy(favorite['config']), time.monotonic())
+                    self._entries[favorite_id] = entry
+                else:
+                    # Another request built the same destination first; use theirs
+                    stale.append(destination)
+                entry.users += 1
+                self._evict(stale)
+                return entry
+        finally:
+            self._close(stale)
+    
+    def release(self, entry: _FavoriteEntry) -> None:
+        """Give back a lease from acquire(), closing the destination if it was dropped meanwhile"""
+        with self._lock:
+            entry.users -= 1
+            entry.last_used = time.monotonic()
+            close = entry.retired and entry.users == 0
+        if close:
+            self._close([entry.destination])
+    
+    def invalidate(self, favorite_id: str) -> None:
+        """Drop the cached destination of a favorite, closing it once it is not in use"""
+        stale = []
+        with self._lock:
+            entry = self._entries.pop(favorite_id, None)
+            if entry is not None:
+                self._retire(entry, stale)
+        self._close(stale)
+    
+    def clear(self) -> None:
+        """Drop every cached destination, closing each once it is not in use"""
+        stale = []
+        with self._lock:
+            for entry in self._entries.values():
+                self._retire(entry, stale)
+            self._entries.clear()
+        self._close(stale)
+    
+    def _lookup(self, favorite_id: str, favorite: dict, stale: list):
+        """Expire idle entries and return the usable entry for a favorite, if any (lock held)"""
+        now = time.monotonic()
+        for key in [key for key, entry in self._entries.items()
+                    if entry.users == 0 and now - entry.last_used >= self.idle_ttl]:
+            self._retire(self._entries.pop(key), stale)
+        
+        entry = self._entries.get(favorite_id)
+        if entry is None:
+            return None
+        if entry.type != favorite['type'] or entry.config != favorite['config']:
+            self._retire(self._entries.pop(favorite_id), stale)
+            return None
+        self._entries.move_to_end(favorite_id)
+        entry.last_used = now
+        return entry
+    
+    def _evict(self, stale: list) -> None:
+        """Drop least recently used idle entries while over max_size (lock held)"""
+        while len(self._entries) > self.max_size:
+            key = next((key for key, entry in self._entries.items() if entry.users == 0), None)
+            if key is None:
+                # Everything is in use; the cache shrinks again as leases are released
+                break
+            self._retire(self._entries.pop(key), stale)
+    
+    @staticmethod
+    def _retire(entry: _FavoriteEntry, stale: list) -> None:
+        entry.retired = True
+        if entry.users == 0:
+            stale.append(entry.destination)
+    
+    @staticmethod
+    def _close(destinations) -> None:
+        for destination in destinations:
+            try:
+                destination.close()
+            except Exception:
+                pass
 
 
 def register_publisher_routes(app, node):
     """Register all publisher-related routes"""
     
+    # Destination plugins are fixed once the process starts, but listing them
+    # instantiates every destination class, so the payload is built only once
+    destination_types_cache = CachedPayload(lambda: {
+        'status': 'success',
+        'destination_types': get_available_destination_types()
+    })
+    
+    # Favorites only change through the routes below (which invalidate it) or
+    # when settings are reloaded, which replaces node.favorite_configs
+    favorites_cache = CachedPayload(lambda: {
+        'status': 'success',
+        'favorites': list(node.favorite_configs.values())
+    })
+    favorites_cache_source = [None]
+    
+    favorite_destinations = _FavoriteDestinationCache(FAVORITE_DESTINATION_CACHE_SIZE,
+                                                      FAVORITE_DESTINATION_IDLE_TTL)
+    atexit.register(favorite_destinations.clear)
+    
+    def build_favorite_destination(favorite):
+        """Create and configure a destination from a favorite configuration"""
+        destination = ResultDestination(favorite['type'])
+        destination.set_context_variables(
+            node_id=node.node_id,
+            node_name=node.node_name
+        )
+        destination.configure(**favorite['config'])
+        return destination
+    
     @app.route('/api/publisher/configure', methods=['POST'])
     def configure_publisher():
         """Configure result publisher destinations"""
         try:
-            data = request.get_json()
+            data = request_json({})
             destination_type = data.get('type')
             config = data.get('config', {})
             
             # Extract rate_limit from config if present
             rate_limit = config.pop('rate_limit', None)
             
+            # Reject bad input up front rather than letting configure() raise on it
+            destination_class = DESTINATION_CLASSES.get(destination_type)
+            if destination_class is None:
+                return jsonify({
+                    'error': f'Unsupported destination type: {destination_type}',
+                    'type': destination_type
+                }), 400
+            
+            config_errors = destination_class.validate_config(config)
+            if config_errors:
+                node.logger.error(f"Invalid {destination_type} destination config: {'; '.join(config_errors)}")
+                return jsonify({
+                    'error': f"Configuration failed: {'; '.join(config_errors)}",
+                    'type': destination_type
+                }), 400
+            
             destination = ResultDestination(destination_type)
             
             # Set context variables for variable substitution
@@ -35,15 +228,7 @@ def register_publisher_routes(app, node):
                 node_name=node.node_name
             )
             
-            # Configure destination with error handling
-            try:
-                destination.configure(**config)
-            except Exception as config_error:
-                node.logger.error(f"Failed to configure {destination_type} destination: {str(config_error)}")
-                return jsonify({
-                    'error': f'Configuration failed: {str(config_error)}',
-                    'type': destination_type
-                }), 400
+            destination.configure(**config)
             
             # Only proceed if configuration succeeded
             if not destination.is_configured:
@@ -59,7 +244,7 @@ def register_publisher_routes(app, node):
             publisher_id = node.result_publisher.add(destination)
             
             # Save settings after adding publisher
-            save_settings(node)
+            request_save(node)
             
             return jsonify({
                 'status': 'configured', 
@@ -75,21 +260,16 @@ def register_publisher_routes(app, node):
     def test_publish():
         """Test publishing a message to all configured destinations"""
         try:
-            data = request.get_json()
+            # Nothing can be published without destinations, so the body isn't read
+            if not node.result_publisher.destinations:
+                return json_response(NO_DESTINATIONS_BODY)
+            
+            data = request_json({})
             message = data.get('message', {})
             
             if not message:
                 return jsonify({'error': 'No message provided'}), 400
             
-            # Check if any destinations are configured
-            if not node.result_publisher.destinations:
-                return jsonify({
-                    'status': 'warning',
-                    'message': 'No destinations configured - cannot publish test message',
-                    'results': {},
-                    'destinations_count': 0
-                })
-            
             # Add metadata to the test message
             test_message = {
                 'test': True,
@@ -117,7 +297,7 @@ def register_publisher_routes(app, node):
     def test_publish_favorites():
         """Test publishing a message to selected favorite destinations"""
         try:
-            data = request.get_json()
+            data = request_json({})
             message = data.get('message', {})
             favorite_ids = data.get('favorite_ids', [])
             
@@ -128,10 +308,10 @@ def register_publisher_routes(app, node):
                 return jsonify({'error': 'No favorite destinations selected'}), 400
             
             # Get selected favorites
-            selected_favorites = []
-            for fav_id in favorite_ids:
-                if fav_id in node.favorite_configs:
-                    selected_favorites.append(node.favorite_configs[fav_id])
+            # In request order, each favorite once even if its id is repeated
+            favorite_configs = node.favorite_configs
+            selected_favorites = [(fav_id, favorite_configs[fav_id])
+                                  for fav_id in dict.fromkeys(favorite_ids) if fav_id in favorite_configs]
             
             if not selected_favorites:
                 return jsonify({
@@ -149,28 +329,61 @@ def register_publisher_routes(app, node):
                 'data': message
             }
             
-            # Create temporary destinations from favorites and publish
-            temp_destinations = []
-            for favorite in selected_favorites:
+            # Reuse destinations from earlier tests of the same favorites; each test
+            # starts from a clean slate so rate and frame limits don't skip it
+            leases = []
+            for fav_id, favorite in selected_favorites:
+                lease = None
                 try:
-                    destination = ResultDestination(favorite['type'])
+                    lease = favorite_destinations.acquire(fav_id, favorite, build_favorite_destination)
+                    destination = lease.destination
                     destination.set_context_variables(
                         node_id=node.node_id,
                         node_name=node.node_name
                     )
-                    destination.configure(**favorite['config'])
-                    temp_destinations.append(destination)
+                    with destination._lock:
+                        destination.last_publish_time = 0
+                        destination.frame_count = 0
+                        destination.frame_limit_reached = False
+                    destination.reset_failure_count()
+                    leases.append(lease)
                 except Exception as e:
+                    if lease is not None:
+                        favorite_destinations.release(lease)
                     node.logger.error(f"Failed to create destination for favorite {favorite.get('name', 'unknown')}: {str(e)}")
+            temp_destinations = [lease.destination for lease in leases]
             
-            # Publish using temporary destinations
+            # Publish using temporary destinations; each publish is a network round
+            # trip, so they run side by side and the request waits for the slowest.
+            # A lease is given back only when its publish finishes, even one that
+            # outlives the timeout, so the destination is never closed mid-publish
             results = {}
-            for dest in temp_destinations:
-                try:
-                    result = dest.publish(test_message)
-                    results[dest.__class__.__name__] = result
-                except Exception as e:
-                    results[dest.__class__.__name__] = {'error': str(e)}
+            pool = get_io_pool()
+            if pool is not None:
+                futures = []
+                for lease in leases:
+                    future = pool.submit(lease.destination.publish, test_message)
+                    future.add_done_callback(lambda _future, lease=lease: favorite_destinations.release(lease))
+                    futures.append((lease.destination, future))
+                deadline = time.monotonic() + TEST_PUBLISH_TIMEOUT
+                for dest, future in futures:
+                    try:
+                        results[dest.__class__.__name__] = future.result(
+                            timeout=max(0.0, deadline - time.monotonic()))
+                    except concurrent.futures.TimeoutError:
+                        results[dest.__class__.__name__] = {'error': 'Timed out waiting for publish'}
+                    except Exception as e:
+                        results[dest.__class__.__name__] = {'error': str(e)}
+            else:
+                for lease in leases:
+                    dest = lease.destination
+                    try:
+                        result = dest.publish(test_message)
+                        results[dest.__class__.__name__] = result
+                    except Exception as e:
+                        results[dest.__class__.__name__] = {'error': str(e)}
+                    finally:
+                        favorite_destinations.release(lease)
             
             return jsonify({
                 'status': 'success',
@@ -187,7 +400,7 @@ def register_publisher_routes(app, node):
     def edit_publisher(publisher_id):
         """Edit a specific publisher by ID"""
         try:
-            data = request.get_json()
+            data = request_json({})
             config = data.get('config', {})
             
             # Find the publisher by ID
@@ -199,10 +412,11 @@ def register_publisher_routes(app, node):
             rate_limit = config.pop('rate_limit', None)
             
             # Clean up config - remove null values and empty strings
-            cleaned_config = {}
-            for key, value in config.items():
-                if value is not None and value != '':
-                    cleaned_config[key] = value
+            cleaned_config = {key: value for key, value in config.items() if value not in (None, '')}
+            
+            config_errors = destination.validate_config(cleaned_config)
+            if config_errors:
+                return jsonify({'error': f"Configuration failed: {'; '.join(config_errors)}"}), 400
             
             # Set context variables for variable substitution
             destination.set_context_variables(
@@ -218,7 +432,7 @@ def register_publisher_routes(app, node):
                 destination.set_rate_limit(rate_limit)
             
             # Save settings after editing publisher
-            save_settings(node)
+            request_save(node)
             
             return jsonify({
                 'status': 'updated',
@@ -239,7 +453,7 @@ def register_publisher_routes(app, node):
                 return jsonify({'error': 'Publisher not found'}), 404
             
             # Save settings after deleting publisher
-            save_settings(node)
+            request_save(node)
             
             return jsonify({
                 'status': 'deleted',
@@ -255,10 +469,10 @@ def register_publisher_routes(app, node):
     def get_favorite_configs():
         """Get all saved favorite publisher configurations"""
         try:
-            return jsonify({
-                'status': 'success',
-                'favorites': list(node.favorite_configs.values())
-            })
+            if favorites_cache_source[0] is not node.favorite_configs:
+                favorites_cache_source[0] = node.favorite_configs
+                favorites_cache.invalidate()
+            return favorites_cache.response()
             
         except Exception as e:
             node.logger.error(f"Get favorites error: {str(e)}")
@@ -268,7 +482,7 @@ def register_publisher_routes(app, node):
     def save_favorite_config():
         """Save a publisher configuration as a favorite"""
         try:
-            data = request.get_json()
+            data = request_json({})
             name = data.get('name', '').strip()
             description = data.get('description', '').strip()
             destination_type = data.get('type')
@@ -281,7 +495,7 @@ def register_publisher_routes(app, node):
                 return jsonify({'error': 'Destination type is required'}), 400
             
             # Generate unique ID for the favorite
-            favorite_id = str(uuid.uuid4())
+            favorite_id = secrets.token_hex(16)
             
             # Create favorite configuration
             favorite = {
@@ -290,19 +504,21 @@ def register_publisher_routes(app, node):
                 'description': description,
                 'type': destination_type,
                 'config': config,
-                'created_at': datetime.now().isoformat()
+                'created_at': iso_now()
             }
             
             # Check if a favorite with this name already exists
-            for existing_fav in node.favorite_configs.values():
-                if existing_fav['name'].lower() == name.lower():
-                    return jsonify({'error': f'A favorite named "{name}" already exists'}), 400
+            name_key = name.lower()
+            if name_key in node.favorite_names:
+                return jsonify({'error': f'A favorite named "{name}" already exists'}), 400
             
             # Save the favorite
             node.favorite_configs[favorite_id] = favorite
+            node.favorite_names[name_key] = favorite_id
+            favorites_cache.invalidate()
             
             # Save to file
-            save_settings(node)
+            request_save(node)
             
             return jsonify({
                 'status': 'saved',
@@ -323,9 +539,12 @@ def register_publisher_routes(app, node):
             
             favorite_name = node.favorite_configs[favorite_id]['name']
             del node.favorite_configs[favorite_id]
+            node.favorite_names.pop(favorite_name.lower(), None)
+            favorite_destinations.invalidate(favorite_id)
+            favorites_cache.invalidate()
             
             # Save to file
-            save_settings(node)
+            request_save(node)
             
             return jsonify({
                 'status': 'deleted',
@@ -344,7 +563,7 @@ def register_publisher_routes(app, node):
             if favorite_id not in node.favorite_configs:
                 return jsonify({'error': 'Favorite not found'}), 404
             
-            data = request.get_json()
+            data = request_json({})
             favorite = node.favorite_configs[favorite_id]
             
             # Update fields if provided
@@ -354,10 +573,12 @@ def register_publisher_routes(app, node):
                     return jsonify({'error': 'Name cannot be empty'}), 400
                 
                 # Check if another favorite has this name
-                for fav_id, existing_fav in node.favorite_configs.items():
-                    if fav_id != favorite_id and existing_fav['name'].lower() == new_name.lower():
-                        return jsonify({'error': f'A favorite named "{new_name}" already exists'}), 400
+                new_key = new_name.lower()
+                if node.favorite_names.get(new_key, favorite_id) != favorite_id:
+                    return jsonify({'error': f'A favorite named "{new_name}" already exists'}), 400
                 
+                node.favorite_names.pop(favorite['name'].lower(), None)
+                node.favorite_names[new_key] = favorite_id
                 favorite['name'] = new_name
             
             if 'description' in data:
@@ -365,11 +586,13 @@ def register_publisher_routes(app, node):
             
             if 'config' in data:
                 favorite['config'] = data['config']
+                favorite_destinations.invalidate(favorite_id)
             
-            favorite['updated_at'] = datetime.now().isoformat()
+            favorite['updated_at'] = iso_now()
+            favorites_cache.invalidate()
             
             # Save to file
-            save_settings(node)
+            request_save(node)
             
             return jsonify({
                 'status': 'updated',
@@ -385,12 +608,7 @@ def register_publisher_routes(app, node):
     def get_publisher_types():
         """Get available publisher/destination types"""
         try:
-            destination_types = get_available_destination_types()
-            
-            return jsonify({
-                'status': 'success',
-                'destination_types': destination_types
-            })
+            return destination_types_cache.response(max_age=DESTINATION_TYPES_MAX_AGE)
             
         except Exception as e:
             node.logger.error(f"Get publisher types error: {str(e)}")
@@ -400,12 +618,7 @@ def register_publisher_routes(app, node):
     def get_destination_types_with_schemas():
         """Get available destination types with their configuration schemas"""
         try:
-            destination_types = get_available_destination_types()
-            
-            return jsonify({
-                'status': 'success',
-                'destination_types': destination_types
-            })
+            return destination_types_cache.response(max_age=DESTINATION_TYPES_MAX_AGE)
             
         except Exception as e:
             node.logger.error(f"Get destination types with schemas error: {str(e)}")
@@ -3,25 +3,50 @@ Telemetry API routes for InferenceNode
 Handles telemetry configuration and data retrieval
 """
 
-from flask import jsonify, request
-import platform
+from flask import jsonify
 
-try:
-    from ..settings_manager import save_settings
-    from ..utils import parse_windows_platform
-except ImportError:
-    from InferenceNode.settings_manager import save_settings
-    from InferenceNode.utils import parse_windows_platform
+from ..settings_manager import request_save
+from ..utils import platform_info
+
+from .responses import (CachedPayload, conditional_json_response, json_bytes, json_response, negotiated_response,
+                        payload_etag, request_json)
 
 
 def register_telemetry_routes(app, node):
     """Register all telemetry-related routes with the Flask app"""
     
+    # Reported when the telemetry service is unavailable; nothing in it changes
+    # while the process runs, so it is serialized only once
+    fallback_telemetry = CachedPayload(lambda: {
+        'metrics': {
+            'cpu': 0,
+            'memory': 0,
+            'disk': 0,
+            'temperature': None
+        },
+        'system': {
+            'uptime': 0,
+            'node_id': node.node_id,
+            'platform': platform_info()['platform'],
+            'cpu_cores': node.node_info.get('cpu_count', 0),
+            'total_memory': node.node_info.get('memory_gb', 0) * 1024**3,
+            'disk_space': 0,
+            'gpu_info': 'Not available'
+        },
+        'network': {
+            'ip_address': 'Unknown',
+            'hostname': platform_info()['hostname'],
+            'usage_percent': 0,
+            'bytes_recv': 0,
+            'bytes_sent': 0
+        }
+    })
+    
     @app.route('/api/telemetry/configure', methods=['POST'])
     def configure_telemetry():
         """Configure telemetry settings"""
         try:
-            data = request.get_json()
+            data = request_json({})
             
             if not node.telemetry:
                 return jsonify({'error': 'Telemetry service not available'}), 400
@@ -34,13 +59,17 @@ def register_telemetry_routes(app, node):
             
             if mqtt_server:
                 try:
-                    node.telemetry.configure_mqtt(
-                        mqtt_server=mqtt_server,
-                        mqtt_port=int(mqtt_port),
-                        mqtt_topic=mqtt_topic
-                    )
-                except Exception as e:
-                    return jsonify({'error': f'Failed to configure MQTT: {str(e)}'}), 400
+                    mqtt_port = int(mqtt_port)
+                except (TypeError, ValueError):
+                    return jsonify({'error': f'Invalid MQTT port: {mqtt_port}'}), 400
+                
+                # Connecting can take seconds when the broker is slow or down, so it
+                # runs in the background; its outcome is reported by /api/telemetry/config
+                node.telemetry.configure_mqtt_async(
+                    mqtt_server=mqtt_server,
+                    mqtt_port=mqtt_port,
+                    mqtt_topic=mqtt_topic
+                )
             
             if hasattr(node.telemetry, 'update_interval'):
                 node.telemetry.update_interval = float(publish_interval)
@@ -50,10 +79,10 @@ def register_telemetry_routes(app, node):
             else:
                 node.telemetry.stop_telemetry()
             
-            save_settings(node)
+            request_save(node)
             
             return jsonify({
-                'status': 'configured',
+                'status': 'pending' if mqtt_server else 'configured',
                 'enabled': enabled,
                 'publish_interval': publish_interval,
                 'mqtt_server': mqtt_server,
@@ -72,15 +101,12 @@ def register_telemetry_routes(app, node):
             if not node.telemetry:
                 return jsonify({'error': 'Telemetry service not available'}), 400
             
-            config = {
-                'enabled': getattr(node.telemetry, 'running', False),
-                'publish_interval': getattr(node.telemetry, 'update_interval', 30),
-                'mqtt_server': getattr(node.telemetry, 'mqtt_server', ''),
-                'mqtt_port': getattr(node.telemetry, 'mqtt_port', 1883),
-                'mqtt_topic': getattr(node.telemetry, 'mqtt_topic', 'infernode/telemetry')
-            }
+            config = node.telemetry.snapshot_settings()
+            config['mqtt_status'] = node.telemetry.mqtt_status
+            config['mqtt_error'] = node.telemetry.mqtt_error
             
-            return jsonify(config)
+            body = json_bytes(config)
+            return conditional_json_response(body, payload_etag(body))
             
         except Exception as e:
             node.logger.error(f"Get telemetry config error: {str(e)}")
@@ -91,59 +117,42 @@ def register_telemetry_routes(app, node):
         """Get current telemetry data"""
         try:
             if not node.telemetry:
-                return jsonify({
-                    'metrics': {
-                        'cpu': 0,
-                        'memory': 0,
-                        'disk': 0,
-                        'temperature': None
-                    },
-                    'system': {
-                        'uptime': 0,
-                        'node_id': node.node_id,
-                        'platform': parse_windows_platform(platform.platform()),
-                        'cpu_cores': node.node_info.get('cpu_count', 0),
-                        'total_memory': node.node_info.get('memory_gb', 0) * 1024**3,
-                        'disk_space': 0,
-                        'gpu_info': 'Not available'
-                    },
-                    'network': {
-                        'ip_address': 'Unknown',
-                        'hostname': platform.node(),
-                        'usage_percent': 0,
-                        'bytes_recv': 0,
-                        'bytes_sent': 0
-                    }
-                })
+                return json_response(fallback_telemetry.get())
             
             system_info = node.telemetry.get_system_info()
+            cpu = system_info.get('cpu', {})
+            memory = system_info.get('memory', {})
+            disk = system_info.get('disk', {})
+            network = system_info.get('network', {})
             
             telemetry_data = {
                 'metrics': {
-                    'cpu': system_info.get('cpu', {}).get('usage_percent', 0),
-                    'memory': system_info.get('memory', {}).get('usage_percent', 0),
-                    'disk': system_info.get('disk', {}).get('usage_percent', 0),
-                    'temperature': system_info.get('cpu', {}).get('temperature_c', None)
+                    'cpu': cpu.get('usage_percent', 0),
+                    'memory': memory.get('usage_percent', 0),
+                    'disk': disk.get('usage_percent', 0),
+                    'temperature': cpu.get('temperature_c', None)
                 },
                 'system': {
                     'uptime': 0,
                     'node_id': node.node_id,
-                    'platform': system_info.get('system', {}).get('platform', parse_windows_platform(platform.platform())),
-                    'cpu_cores': system_info.get('cpu', {}).get('count', 0),
-                    'total_memory': system_info.get('memory', {}).get('total_gb', 0) * 1024**3,
-                    'disk_space': system_info.get('disk', {}).get('total_gb', 0) * 1024**3,
+                    'platform': system_info.get('system', {}).get('platform') or platform_info()['platform'],
+                    'cpu_cores': cpu.get('count', 0),
+                    'total_memory': memory.get('total_gb', 0) * 1024**3,
+                    'disk_space': disk.get('total_gb', 0) * 1024**3,
                     'gpu_info': str(system_info.get('gpu', {}).get('devices', 'Not available'))
                 },
                 'network': {
                     'ip_address': 'Unknown',
-                    'hostname': platform.node(),
+                    'hostname': platform_info()['hostname'],
                     'usage_percent': 0,
-                    'bytes_recv': system_info.get('network', {}).get('bytes_recv', 0),
-                    'bytes_sent': system_info.get('network', {}).get('bytes_sent', 0)
+                    'bytes_recv': network.get('bytes_recv', 0),
+                    'bytes_sent': network.get('bytes_sent', 0)
                 }
             }
             
-            return jsonify(telemetry_data)
+            # Serialized straight to bytes; the dashboard polls this every second, and
+            # clients sending Accept: application/msgpack get the smaller binary form
+            return negotiated_response(telemetry_data)
             
         except Exception as e:
             node.logger.error(f"Get telemetry data error: {str(e)}")
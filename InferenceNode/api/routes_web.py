@@ -1,58 +1,58 @@
 """
 Web page routes for InferenceNode dashboard and UI pages
 """
-from flask import render_template
+import threading
+from functools import partial
+
+from flask import Response, render_template, request
+
+from .responses import payload_etag
+
+# (URL rule, endpoint, template) for each UI page
+WEB_PAGES = [
+    ('/', 'dashboard', 'dashboard.html'),
+    ('/models', 'models_page', 'models.html'),
+    ('/pipeline-builder', 'pipeline_page', 'pipeline_builder.html'),
+    ('/pipeline-management', 'pipeline_management_page', 'pipeline_management.html'),
+    ('/publisher', 'publisher_page', 'publisher.html'),
+    ('/telemetry', 'telemetry_page', 'telemetry.html'),
+    ('/api-docs', 'api_docs', 'api_docs.html'),
+    ('/node-info', 'node_info_page', 'node_info.html'),
+    ('/logs', 'logs_page', 'logs.html'),
+    ('/node-discovery', 'node_discovery_page', 'node_discovery.html'),
+]
 
 
 def register_web_routes(app, node):
     """Register all web UI page routes"""
     
-    @app.route('/')
-    def dashboard():
-        """Main dashboard page"""
-        return render_template('dashboard.html', node_info=node.node_info)
-    
-    @app.route('/models')
-    def models_page():
-        """Model management page"""
-        return render_template('models.html', node_info=node.node_info)
-    
-    @app.route('/pipeline-builder')
-    def pipeline_page():
-        """Pipeline builder page"""
-        return render_template('pipeline_builder.html', node_info=node.node_info)
-    
-    @app.route('/pipeline-management')
-    def pipeline_management_page():
-        """Pipeline management page"""
-        return render_template('pipeline_management.html', node_info=node.node_info)
-    
-    @app.route('/publisher')
-    def publisher_page():
-        """Result publisher configuration page"""
-        return render_template('publisher.html', node_info=node.node_info)
-    
-    @app.route('/telemetry')
-    def telemetry_page():
-        """Telemetry monitoring page"""
-        return render_template('telemetry.html', node_info=node.node_info)
-    
-    @app.route('/api-docs')
-    def api_docs():
-        """API documentation page"""
-        return render_template('api_docs.html', node_info=node.node_info)
-    
-    @app.route('/node-info')
-    def node_info_page():
-        """Detailed node information page"""
-        return render_template('node_info.html', node_info=node.node_info)
-    
-    @app.route('/logs')
-    def logs_page():
-        """System logs page"""
-        return render_template('logs.html', node_info=node.node_info)
-    
-    @app.route('/node-discovery')
-    def node_discovery_page():
-        """Node discovery page"""
-        return render_template('node_discovery.html', node_info=node.node_info)
+    # (template, script root, node name, hardware pending) -> (html, etag). Pages
+    # only read node facts that are fixed at startup apart from the node name and
+    # the hardware detected in the background, so each page is rendered once and
+    # replayed until one of those changes.
+    rendered_pages = {}
+    render_lock = threading.Lock()
+    
+    def render_page(template_name):
+        """Render a page template, reusing the HTML while its inputs are unchanged"""
+        key = (template_name, request.script_root, node.node_name, 'hardware_pending' in node.node_info)
+        page = rendered_pages.get(key)
+        if page is None:
+            with render_lock:
+                page = rendered_pages.get(key)
+                if page is None:
+                    html = render_template(template_name, node_info=node.node_info).encode('utf-8')
+                    page = (html, payload_etag(html))
+                    # Stale entries for a previous name or hardware state are simply dropped
+                    for stale in [k for k in rendered_pages if k[0] == template_name]:
+                        del rendered_pages[stale]
+                    rendered_pages[key] = page
+        
+        response = Response(page[0], mimetype='text/html')
+        response.set_etag(page[1])
+        return response.make_conditional(request)
+    
+    # Every page is the same cached render of its template, so the views are
+    # registered from the table instead of one wrapper function per page
+    for rule, endpoint, template_name in WEB_PAGES:
+        app.add_url_rule(rule, endpoint, partial(render_page, template_name))
@@ -23,6 +23,10 @@ except ImportError:
     from mdns_manager import MDNSBroadcaster, MDNSServiceListener, MDNS_AVAILABLE
 
 
+# Most control operations accepted in one control_nodes_batch call
+MAX_BATCH_OPERATIONS = 64
+
+
 class DiscoveredNode:
     """Information about a discovered inference node"""
     
@@ -103,6 +107,9 @@ class DiscoveryManager:
         self.discovery_thread = None
         self.broadcast_thread = None
         self.broadcast_interval = 10.0  # seconds
+        self.max_probe_workers = 16  # concurrent peer probes during refresh
+        self._announcement_prefix = None  # serialized announcement up to the timestamp
+        self._broadcast_sock = None
         
         # mDNS components
         self.mdns_broadcaster = None
@@ -119,16 +126,36 @@ class DiscoveryManager:
         else:
             self.logger.info(f"Discovery Manager initialized on port {self.discovery_port} (UDP only - install zeroconf for mDNS)")
     
-    def set_node_info(self, node_id: str, node_info: Dict[str, Any]):
-        """Set the node information for broadcasting"""
+    def set_node_info(self, node_id: str, node_info: Dict[str, Any], node_info_json: Optional[bytes] = None):
+        """Set the node information for broadcasting
+        
+        Args:
+            node_id: ID of this node
+            node_info: Node information to announce
+            node_info_json: node_info already serialized as JSON, if the caller has it
+        """
         self.node_id = node_id
         self.node_info = node_info
+        self._announcement_prefix = self._build_announcement_prefix(node_id, node_info, node_info_json)
         self.logger.debug(f"Node info updated for discovery: {node_info.get('node_name', 'Unknown')} ({node_id})")
         
         # Update mDNS broadcaster if it exists
         if self.mdns_broadcaster:
             self.mdns_broadcaster.update_info(node_info)
     
+    @staticmethod
+    def _build_announcement_prefix(node_id: str, node_info: Dict[str, Any],
+                                   node_info_json: Optional[bytes] = None) -> bytes:
+        """Serialize a node announcement up to its timestamp value
+        
+        Node info changes rarely, so each broadcast only appends the current
+        time instead of encoding the whole announcement again.
+        """
+        if node_info_json is None:
+            node_info_json = json.dumps(node_info).encode('utf-8')
+        return (b'{"type": "node_announcement", "node_id": ' + json.dumps(node_id).encode('utf-8') +
+                b', "node_info": ' + node_info_json + b', "timestamp": ')
+    
     def set_broadcast_interval(self, interval: float):
         """Set the broadcast interval in seconds"""
         self.broadcast_interval = interval
@@ -170,6 +197,9 @@ class DiscoveryManager:
             self.discovery_thread.join(timeout=2)
         if self.broadcast_thread:
             self.broadcast_thread.join(timeout=2)
+        if self._broadcast_sock:
+            self._broadcast_sock.close()
+            self._broadcast_sock = None
         self.logger.info("Stopped node discovery")
     
     def _start_mdns(self):
@@ -281,19 +311,19 @@ class DiscoveryManager:
         """Send broadcast announcement"""
         if not self.node_id or not self.node_info:
             return
-            
+        
         try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+            # One socket serves every broadcast until discovery stops
+            sock = self._broadcast_sock
+            if sock is None:
+                sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+                self._broadcast_sock = sock
             
-            announcement = {
-                'type': 'node_announcement',
-                'node_id': self.node_id,
-                'node_info': self.node_info,
-                'timestamp': time.time()
-            }
-            
-            data = json.dumps(announcement).encode('utf-8')
+            prefix = self._announcement_prefix
+            if prefix is None:
+                prefix = self._announcement_prefix = self._build_announcement_prefix(self.node_id, self.node_info)
+            data = prefix + repr(time.time()).encode('ascii') + b'}'
             
             # Send to broadcast address only (more efficient and reduces duplicates)
             try:
@@ -310,11 +340,9 @@ class DiscoveryManager:
             
         except Exception as e:
             self.logger.error(f"Broadcast send error: {str(e)}")
-        finally:
-            try:
-                sock.close()
-            except:
-                pass
+            if self._broadcast_sock:
+                self._broadcast_sock.close()
+                self._broadcast_sock = None
     
     def _handle_discovery_message(self, data: bytes, addr: tuple):
         """Handle incoming discovery message"""
@@ -461,11 +489,25 @@ class DiscoveryManager:
             self.logger.warning(f"Failed to probe node {node_id}: {str(e)}")
             node.mark_offline()
     
-    def refresh_all_nodes(self):
-        """Refresh information for all online nodes"""
-        for node_id, node in list(self.discovered_nodes.items()):
-            if node.status == 'online':
-                self._probe_node(node_id)
+    def _map_concurrently(self, func, items: List[Any],
+                          executor: Optional[concurrent.futures.Executor] = None) -> List[Any]:
+        """Apply func to items on the given executor, or on a short-lived pool if none"""
+        if not items:
+            return []
+        if executor is not None:
+            return list(executor.map(func, items))
+        max_workers = min(len(items), self.max_probe_workers)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return list(pool.map(func, items))
+    
+    def refresh_all_nodes(self, executor: Optional[concurrent.futures.Executor] = None):
+        """Refresh information for all online nodes, probing them concurrently"""
+        online_node_ids = [node_id for node_id, node in list(self.discovered_nodes.items())
+                           if node.status == 'online']
+        
+        # Probes are network-bound, so overlap them: total time is the slowest
+        # peer's response rather than the sum over all peers
+        self._map_concurrently(self._probe_node, online_node_ids, executor)
     
     def _cleanup_stale_nodes(self):
         """Remove nodes that haven't been seen for too long"""
@@ -575,4 +617,38 @@ class DiscoveryManager:
                 
         except Exception as e:
             self.logger.error(f"Control action failed for {node_id}: {str(e)}")
-            return {'error': str(e)}
\ No newline at end of file
+            return {'error': str(e)}
+    
+    def control_nodes_batch(self, operations: List[Dict[str, Any]],
+                            executor: Optional[concurrent.futures.Executor] = None) -> List[Dict[str, Any]]:
+        """
+        Run several control operations concurrently.
+        
+        Args:
+            operations: List of {'node_id': ..., 'action': ...} dicts
+            executor: Optional shared executor to run the operations on
+            
+        Returns:
+            One result per operation, in the same order, each tagged with
+            its node_id and action
+            
+        Raises:
+            ValueError: If there are more than MAX_BATCH_OPERATIONS operations
+        """
+        if len(operations) > MAX_BATCH_OPERATIONS:
+            raise ValueError(f"At most {MAX_BATCH_OPERATIONS} operations are allowed per batch")
+        
+        def run(operation: Dict[str, Any]) -> Dict[str, Any]:
+            if not isinstance(operation, dict):
+                operation = {}
+            node_id = operation.get('node_id')
+            action = operation.get('action')
+            if not node_id or not action:
+                result = {'error': 'node_id and action required'}
+            elif not isinstance(node_id, str) or not isinstance(action, str):
+                result = {'error': 'node_id and action must be strings'}
+            else:
+                result = self.control_node(node_id, action)
+            return {'node_id': node_id, 'action': action, **result}
+        
+        return self._map_concurrently(run, operations, executor)
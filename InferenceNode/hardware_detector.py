@@ -1,7 +1,11 @@
+import functools
+import glob
 import logging
+import os
 import platform
 import subprocess
-from typing import Dict, List, Any, Optional
+import threading
+from typing import Callable, Dict, List, Any, Optional
 
 # Try to import additional libraries for hardware detection
 try:
@@ -17,16 +21,243 @@ except ImportError:
     HAS_PSUTIL = False
 
 
+# Default longest wait_ready() blocks for background detection to finish
+DETECTION_TIMEOUT = 10.0
+
+# Distinct (engine, device) pairs whose formatted device string is cached
+DEVICE_FORMAT_CACHE_SIZE = 64
+
+
+# PCI vendor IDs of display adapters, mapped to the vendor names detection matches on
+PCI_DISPLAY_VENDORS = {'0x8086': 'Intel', '0x10de': 'NVIDIA', '0x1002': 'AMD'}
+
+
+def _read_cpu_name() -> str:
+    """
+    Read the CPU model name from the OS without spawning a shell where possible.
+    
+    Windows reads the registry, Linux /proc/cpuinfo and macOS sysctl; Windows
+    falls back to a WMI query only if the registry value is missing.
+    """
+    system = platform.system()
+    if system == "Windows":
+        try:
+            import winreg
+            with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE,
+                                r"HARDWARE\DESCRIPTION\System\CentralProcessor\0") as key:
+                name = winreg.QueryValueEx(key, "ProcessorNameString")[0]
+            return f"{name}\n{os.environ.get('PROCESSOR_IDENTIFIER', '')}"
+        except Exception:
+            pass
+        try:
+            return subprocess.check_output(
+                'powershell "Get-CimInstance -ClassName Win32_Processor | Select-Object -ExpandProperty Name"',
+                shell=True, text=True, timeout=10, stderr=subprocess.DEVNULL
+            )
+        except Exception:
+            return os.environ.get('PROCESSOR_IDENTIFIER', '')
+    
+    if system == "Darwin":
+        try:
+            return subprocess.check_output(["sysctl", "-n", "machdep.cpu.brand_string"],
+                                           text=True, timeout=5, stderr=subprocess.DEVNULL)
+        except Exception:
+            return platform.processor()
+    
+    try:
+        with open('/proc/cpuinfo', 'r') as f:
+            return f.read()
+    except Exception:
+        return platform.processor()
+
+
+def _read_windows_gpu_names() -> List[str]:
+    """Describe the hardware display adapters through DXGI, which answers in milliseconds"""
+    import ctypes
+    from ctypes import wintypes
+    
+    class GUID(ctypes.Structure):
+        _fields_ = [('Data1', wintypes.DWORD), ('Data2', wintypes.WORD),
+                    ('Data3', wintypes.WORD), ('Data4', ctypes.c_ubyte * 8)]
+    
+    class DXGI_ADAPTER_DESC1(ctypes.Structure):
+        _fields_ = [('Description', ctypes.c_wchar * 128),
+                    ('VendorId', wintypes.UINT), ('DeviceId', wintypes.UINT),
+                    ('SubSysId', wintypes.UINT), ('Revision', wintypes.UINT),
+                    ('DedicatedVideoMemory', ctypes.c_size_t),
+                    ('DedicatedSystemMemory', ctypes.c_size_t),
+                    ('SharedSystemMemory', ctypes.c_size_t),
+                    ('AdapterLuidLow', wintypes.DWORD), ('AdapterLuidHigh', wintypes.LONG),
+                    ('Flags', wintypes.UINT)]
+    
+    DXGI_ADAPTER_FLAG_SOFTWARE = 2
+    HRESULT = ctypes.c_long
+    
+    def method(obj, index, *argtypes):
+        """Bind a COM method by its vtable slot"""
+        vtable = ctypes.cast(obj, ctypes.POINTER(ctypes.POINTER(ctypes.c_void_p))).contents
+        return ctypes.WINFUNCTYPE(HRESULT, ctypes.c_void_p, *argtypes)(vtable[index])
+    
+    # IID_IDXGIFactory1 {770aae78-f26f-4dba-a829-253c83d1b387}
+    iid = GUID(0x770aae78, 0xf26f, 0x4dba, (ctypes.c_ubyte * 8)(0xa8, 0x29, 0x25, 0x3c, 0x83, 0xd1, 0xb3, 0x87))
+    factory = ctypes.c_void_p()
+    if ctypes.windll.dxgi.CreateDXGIFactory1(ctypes.byref(iid), ctypes.byref(factory)) != 0:
+        raise OSError("CreateDXGIFactory1 failed")
+    
+    names = []
+    try:
+        index = 0
+        while True:
+            adapter = ctypes.c_void_p()
+            # IDXGIFactory1::EnumAdapters1 is vtable slot 12; fails past the last adapter
+            if method(factory, 12, wintypes.UINT, ctypes.POINTER(ctypes.c_void_p))(
+                    factory, index, ctypes.byref(adapter)) != 0:
+                break
+            try:
+                desc = DXGI_ADAPTER_DESC1()
+                # IDXGIAdapter1::GetDesc1 is vtable slot 10
+                if (method(adapter, 10, ctypes.POINTER(DXGI_ADAPTER_DESC1))(adapter, ctypes.byref(desc)) == 0
+                        and not desc.Flags & DXGI_ADAPTER_FLAG_SOFTWARE):
+                    names.append(desc.Description)
+            finally:
+                method(adapter, 2)(adapter)  # IUnknown::Release
+            index += 1
+    finally:
+        method(factory, 2)(factory)
+    return names
+
+
+def _read_gpu_names() -> List[str]:
+    """
+    List the display adapters by name, one entry per adapter.
+    
+    Windows asks DXGI (falling back to a WMI query), Linux reads the PCI
+    display-class devices from /sys (falling back to lspci); other systems
+    report none.
+    """
+    system = platform.system()
+    if system == "Windows":
+        try:
+            return _read_windows_gpu_names()
+        except Exception as e:
+            logging.getLogger(__name__).debug(f"DXGI adapter enumeration failed: {e}")
+        try:
+            output = subprocess.check_output(
+                'powershell "Get-CimInstance -ClassName Win32_VideoController | Select-Object -ExpandProperty Name"',
+                shell=True, text=True, timeout=10, stderr=subprocess.DEVNULL
+            )
+            return [line.strip() for line in output.splitlines() if line.strip()]
+        except Exception:
+            return []
+    
+    if system == "Linux":
+        devices = glob.glob('/sys/bus/pci/devices/*')
+        if devices:
+            names = []
+            for device in sorted(devices):
+                try:
+                    with open(os.path.join(device, 'class')) as f:
+                        if not f.read().startswith('0x03'):  # display controller
+                            continue
+                    with open(os.path.join(device, 'vendor')) as f:
+                        vendor = f.read().strip()
+                except OSError:
+                    continue
+                names.append(PCI_DISPLAY_VENDORS.get(vendor, vendor))
+            return names
+        try:
+            output = subprocess.check_output("lspci | grep -iE 'vga|3d|display'", shell=True,
+                                             text=True, timeout=5, stderr=subprocess.DEVNULL)
+            return [line for line in output.splitlines() if line]
+        except Exception:
+            return []
+    
+    return []
+
+
+def _undetected_hardware_info() -> Dict[str, Any]:
+    """Hardware info reporting only a generic CPU, used until detection finishes"""
+    return {
+        'intel': {'cpu': False, 'gpu': False, 'npu': False},
+        'nvidia': {'gpu': False, 'gpu_count': 0},
+        'amd': {'cpu': False, 'gpu': False},
+        'apple': {'cpu': False, 'gpu': False, 'neural_engine': False},
+        'raspberry_pi': {'cpu': False, 'gpu': False},
+        'available_devices': ['CPU'],
+    }
+
+
 class HardwareDetector():
     """Generic hardware detection for inference engines"""
 
-    def __init__(self):
-        """Initialize and detect all available hardware once"""
-        self.hardware_info = self._detect_all_hardware()
+    def __init__(self, background: bool = False):
+        """
+        Initialize and detect all available hardware once.
+        
+        Args:
+            background: Detect on a daemon thread instead of blocking here.
+                Until detection finishes hardware_info reports CPU only, so
+                request handlers never wait on it; code that needs the real
+                result calls wait_ready(). Change listeners are notified once
+                detection completes.
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._change_callbacks: List[Callable[[], None]] = []
+        # Bounded, because engine and device strings come straight from API clients
+        self._cached_format_for = functools.lru_cache(maxsize=DEVICE_FORMAT_CACHE_SIZE)(self._format_for)
+        self._hardware_info: Optional[Dict[str, Any]] = None
+        self._probe_cache: Dict[str, Any] = {}  # OS probe results shared within one detection run
+        self._ready = threading.Event()
+        if background:
+            threading.Thread(target=self._detect_initial, name='hardware-detect', daemon=True).start()
+        else:
+            self._detect_initial()
 
     def __str__(self) -> str:
         return str(self.hardware_info)
     
+    def _detect_initial(self):
+        try:
+            self._hardware_info = self._detect_all_hardware()
+        except Exception as e:
+            self.logger.error(f"Hardware detection failed: {e}")
+            self._hardware_info = _undetected_hardware_info()
+        # Formats computed while waiting on detection assumed no accelerators
+        self._cached_format_for.cache_clear()
+        self._ready.set()
+        for callback in self._change_callbacks:
+            callback()
+    
+    @property
+    def is_ready(self) -> bool:
+        """Whether the initial hardware detection has finished"""
+        return self._ready.is_set()
+    
+    def wait_ready(self, timeout: float = DETECTION_TIMEOUT) -> bool:
+        """Block until the initial hardware detection finishes; False if it timed out"""
+        if self._ready.wait(timeout):
+            return True
+        self.logger.warning(f"Hardware detection still running after {timeout}s")
+        return False
+    
+    @property
+    def hardware_info(self) -> Dict[str, Any]:
+        """Detected hardware, or CPU only while background detection is still running"""
+        if not self._ready.is_set():
+            return _undetected_hardware_info()
+        return self._hardware_info
+    
+    def on_change(self, callback: Callable[[], None]):
+        """Register a callback invoked when hardware_info is detected or re-detected"""
+        self._change_callbacks.append(callback)
+    
+    def refresh(self):
+        """Re-run hardware detection and notify change listeners"""
+        self._hardware_info = self._detect_all_hardware()
+        self._cached_format_for.cache_clear()
+        for callback in self._change_callbacks:
+            callback()
+    
     @property
     def available_devices(self) -> List[str]:
         """Get list of available devices"""
@@ -111,14 +342,9 @@ class HardwareDetector():
         Returns:
             Friendly name like "NVIDIA GeForce RTX 3090"
         """
-        gpu_details = self.get_nvidia_gpu_details()
-        
-        if device_id in gpu_details:
-            details = gpu_details[device_id]
-            name = details['name']
-            
-            # Name is already in a good format from nvidia-smi
-            return name
+        details = self.get_nvidia_gpu_details().get(device_id)
+        if details:
+            return self._nvidia_friendly_name(details)
         
         # Fallback for unknown devices
         return f"NVIDIA GPU {device_id}"
@@ -133,27 +359,9 @@ class HardwareDetector():
         Returns:
             Description with GPU info
         """
-        gpu_details = self.get_nvidia_gpu_details()
-        
-        if device_id in gpu_details:
-            details = gpu_details[device_id]
-            name = details['name']
-            
-            # Extract series info (RTX, GTX, Tesla, etc.)
-            if 'RTX' in name:
-                return "NVIDIA RTX Series GPU"
-            elif 'GTX' in name:
-                return "NVIDIA GTX Series GPU"
-            elif 'Tesla' in name:
-                return "NVIDIA Tesla Data Center GPU"
-            elif 'Quadro' in name:
-                return "NVIDIA Quadro Professional GPU"
-            elif 'A100' in name or 'A40' in name or 'A30' in name or 'A10' in name:
-                return "NVIDIA Ampere Data Center GPU"
-            elif 'H100' in name or 'H200' in name:
-                return "NVIDIA Hopper Data Center GPU"
-            else:
-                return "NVIDIA GPU"
+        details = self.get_nvidia_gpu_details().get(device_id)
+        if details:
+            return self._nvidia_description(details)
         
         # Fallback
         return "NVIDIA Graphics Processor"
@@ -200,21 +408,9 @@ class HardwareDetector():
         Returns:
             Friendly name like "Intel UHD Graphics (iGPU)" or "Intel Arc B580 (dGPU)"
         """
-        gpu_details = self.get_intel_gpu_details()
-        
-        if device_id in gpu_details:
-            details = gpu_details[device_id]
-            name = details['name']
-            gpu_type = details['type']
-            
-            # Simplify the name by removing common prefixes
-            name = name.replace('Intel(R) ', '').replace('(R)', '').replace('(TM)', '')
-            name = name.replace('Graphics', '').strip()
-            
-            # Remove any existing (iGPU) or (dGPU) markers to avoid duplication
-            name = name.replace('(iGPU)', '').replace('(dGPU)', '').strip()
-            
-            return f"Intel {name} ({gpu_type})"
+        details = self.get_intel_gpu_details().get(device_id)
+        if details:
+            return self._intel_friendly_name(details)
         
         # Fallback for unknown devices
         return f"Intel GPU {device_id}"
@@ -229,24 +425,116 @@ class HardwareDetector():
         Returns:
             Description like "Integrated Graphics" or "Discrete Graphics Card"
         """
-        gpu_details = self.get_intel_gpu_details()
-        
-        if device_id in gpu_details:
-            details = gpu_details[device_id]
-            is_igpu = details['is_igpu']
-            
-            if is_igpu:
-                return "On-chip integrated graphics"
-            else:
-                return "Dedicated graphics card"
+        details = self.get_intel_gpu_details().get(device_id)
+        if details:
+            return self._intel_description(details)
         
         # Fallback
         return "Intel GPU Processing"
     
+    def get_nvidia_gpu_summary(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get display information for every NVIDIA GPU in one pass.
+        
+        Returns:
+            Dict mapping device IDs to name, uuid, friendly_name and description
+        """
+        return {
+            device_id: {
+                'name': details['name'],
+                'uuid': details['uuid'],
+                'friendly_name': self._nvidia_friendly_name(details),
+                'description': self._nvidia_description(details)
+            }
+            for device_id, details in self.get_nvidia_gpu_details().items()
+        }
+    
+    def get_intel_gpu_summary(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get display information for every Intel GPU in one pass.
+        
+        Returns:
+            Dict mapping device IDs to name, type, is_igpu, friendly_name and description
+        """
+        return {
+            device_id: {
+                'name': details['name'],
+                'type': details['type'],
+                'is_igpu': details['is_igpu'],
+                'friendly_name': self._intel_friendly_name(details),
+                'description': self._intel_description(details)
+            }
+            for device_id, details in self.get_intel_gpu_details().items()
+        }
+    
+    @staticmethod
+    def _nvidia_friendly_name(details: Dict[str, Any]) -> str:
+        """Friendly name for an NVIDIA GPU details entry"""
+        # Name is already in a good format from nvidia-smi
+        return details['name']
+    
+    @staticmethod
+    def _nvidia_description(details: Dict[str, Any]) -> str:
+        """Series description for an NVIDIA GPU details entry"""
+        name = details['name']
+        
+        # Extract series info (RTX, GTX, Tesla, etc.)
+        if 'RTX' in name:
+            return "NVIDIA RTX Series GPU"
+        elif 'GTX' in name:
+            return "NVIDIA GTX Series GPU"
+        elif 'Tesla' in name:
+            return "NVIDIA Tesla Data Center GPU"
+        elif 'Quadro' in name:
+            return "NVIDIA Quadro Professional GPU"
+        elif 'A100' in name or 'A40' in name or 'A30' in name or 'A10' in name:
+            return "NVIDIA Ampere Data Center GPU"
+        elif 'H100' in name or 'H200' in name:
+            return "NVIDIA Hopper Data Center GPU"
+        else:
+            return "NVIDIA GPU"
+    
+    @staticmethod
+    def _intel_friendly_name(details: Dict[str, Any]) -> str:
+        """Friendly name like "Intel Arc B580 (dGPU)" for an Intel GPU details entry"""
+        name = details['name']
+        gpu_type = details['type']
+        
+        # Simplify the name by removing common prefixes
+        name = name.replace('Intel(R) ', '').replace('(R)', '').replace('(TM)', '')
+        name = name.replace('Graphics', '').strip()
+        
+        # Remove any existing (iGPU) or (dGPU) markers to avoid duplication
+        name = name.replace('(iGPU)', '').replace('(dGPU)', '').strip()
+        
+        return f"Intel {name} ({gpu_type})"
+    
+    @staticmethod
+    def _intel_description(details: Dict[str, Any]) -> str:
+        """Integrated vs discrete description for an Intel GPU details entry"""
+        if details['is_igpu']:
+            return "On-chip integrated graphics"
+        else:
+            return "Dedicated graphics card"
+    
     def get_intel_npu_devices(self) -> List[str]:
         """Get list of Intel NPU/VPU device IDs"""
         return self.hardware_info.get('intel', {}).get('npu_devices', [])
 
+    def _cpu_name(self) -> str:
+        """CPU model name, read once per detection run"""
+        cache = self._probe_cache
+        if 'cpu' not in cache:
+            cache['cpu'] = _read_cpu_name()
+        return cache['cpu']
+    
+    def _gpu_names(self) -> List[str]:
+        """Display adapter names, read once per detection run"""
+        cache = self._probe_cache
+        if 'gpu' not in cache:
+            cache['gpu'] = _read_gpu_names()
+        return cache['gpu']
+    
     def _run_command(self, command: str, timeout: int = 10) -> Optional[str]:
         """
         Helper method to run a subprocess command safely.
@@ -306,6 +594,8 @@ class HardwareDetector():
             Dict containing hardware information organized by vendor and type,
             plus a list of available devices under 'available_devices'.
         """
+        # CPU and GPU names are read once and shared by the vendor checks below
+        self._probe_cache = {}
         hardware_info = {
             'intel': self._detect_intel_hardware(),
             'nvidia': self._detect_nvidia_hardware(),
@@ -533,73 +823,14 @@ class HardwareDetector():
             except Exception:
                 pass
 
-        # Fallback to system-specific methods if cpuinfo not available or failed
+        # Fallback to the OS-reported CPU name if cpuinfo not available or failed
         if not intel_devices['cpu']:
-            try:
-                # Check CPU vendor using platform module first
-                processor_info = platform.processor()
-                if 'Intel' in processor_info:
-                    intel_devices['cpu'] = True
-                else:
-                    # Platform-specific detection
-                    if platform.system() == "Windows":
-                        try:
-                            # Try PowerShell method first
-                            cpu_info = subprocess.check_output(
-                                'powershell "Get-WmiObject -Class Win32_Processor | Select-Object Name"',
-                                shell=True, text=True, timeout=10
-                            )
-                            if "Intel" in cpu_info:
-                                intel_devices['cpu'] = True
-                        except Exception:
-                            try:
-                                # Fallback to environment variables
-                                cpu_info = subprocess.check_output("echo %PROCESSOR_IDENTIFIER%", shell=True, text=True, timeout=5)
-                                if "Intel" in cpu_info:
-                                    intel_devices['cpu'] = True
-                            except Exception:
-                                pass
-                    else:
-                        # Linux/Mac - check /proc/cpuinfo or similar
-                        try:
-                            with open('/proc/cpuinfo', 'r') as f:
-                                cpu_info = f.read()
-                                if "Intel" in cpu_info:
-                                    intel_devices['cpu'] = True
-                        except Exception:
-                            # Fallback for Mac or other systems
-                            try:
-                                cpu_info = subprocess.check_output("sysctl -n machdep.cpu.brand_string", shell=True, text=True, timeout=5)
-                                if "Intel" in cpu_info:
-                                    intel_devices['cpu'] = True
-                            except Exception:
-                                pass
-            except Exception:
-                pass
+            if 'Intel' in platform.processor() or 'Intel' in self._cpu_name():
+                intel_devices['cpu'] = True
 
         # Check for Intel GPU (basic detection)
-        try:
-            if platform.system() == "Windows":
-                try:
-                    # Try PowerShell method first
-                    gpu_info = subprocess.check_output(
-                        'powershell "Get-WmiObject -Class Win32_VideoController | Select-Object Name"',
-                        shell=True, text=True, timeout=10
-                    )
-                    if "Intel" in gpu_info:
-                        intel_devices['gpu'] = True
-                except Exception:
-                    pass
-            else:
-                # Linux - check lspci for Intel graphics
-                try:
-                    gpu_info = subprocess.check_output("lspci | grep -i vga", shell=True, text=True, timeout=5)
-                    if "Intel" in gpu_info:
-                        intel_devices['gpu'] = True
-                except Exception:
-                    pass
-        except Exception:
-            pass
+        if any('Intel' in name for name in self._gpu_names()):
+            intel_devices['gpu'] = True
 
         # NPU detection - assume available for newer Intel generations
         try:
@@ -616,17 +847,10 @@ class HardwareDetector():
                 else:
                     # Fallback detection for newer Intel generations
                     if platform.system() == "Windows":
-                        try:
-                            # Try PowerShell first
-                            cpu_info = subprocess.check_output(
-                                'powershell "Get-WmiObject -Class Win32_Processor | Select-Object Name"',
-                                shell=True, text=True, timeout=10
-                            )
-                            # Look for generation indicators or Intel Core Ultra processors
-                            if any(gen in cpu_info for gen in ['12th', '13th', '14th', '15th', 'i3-12', 'i5-12', 'i7-12', 'i9-12', 'i3-13', 'i5-13', 'i7-13', 'i9-13']) or 'Intel(R) Core(TM) Ultra' in cpu_info:
-                                intel_devices['npu'] = True
-                        except Exception:
-                            pass
+                        cpu_info = self._cpu_name()
+                        # Look for generation indicators or Intel Core Ultra processors
+                        if any(gen in cpu_info for gen in ['12th', '13th', '14th', '15th', 'i3-12', 'i5-12', 'i7-12', 'i9-12', 'i3-13', 'i5-13', 'i7-13', 'i9-13']) or 'Intel(R) Core(TM) Ultra' in cpu_info:
+                            intel_devices['npu'] = True
         except Exception:
             pass
 
@@ -667,25 +891,12 @@ class HardwareDetector():
                     }
         
         if platform.system() == "Windows":
-            # Try PowerShell WMI method first
-            gpu_info = self._run_command('powershell "Get-WmiObject -Class Win32_VideoController | Select-Object Name"')
-            if gpu_info:
-                nvidia_count = gpu_info.count("NVIDIA")
-                if nvidia_count > 0:
-                    nvidia_devices['gpu'] = True
-                    nvidia_devices['gpu_count'] = nvidia_count
-                    populate_gpu_details(nvidia_count)
-                    return nvidia_devices
-            
-            # Fallback to alternative PowerShell command
-            gpu_info = self._run_command('powershell "Get-CimInstance -ClassName Win32_VideoController | Select-Object -ExpandProperty Name"')
-            if gpu_info:
-                nvidia_count = gpu_info.count("NVIDIA")
-                if nvidia_count > 0:
-                    nvidia_devices['gpu'] = True
-                    nvidia_devices['gpu_count'] = nvidia_count
-                    populate_gpu_details(nvidia_count)
-                    return nvidia_devices
+            nvidia_count = sum('NVIDIA' in name for name in self._gpu_names())
+            if nvidia_count > 0:
+                nvidia_devices['gpu'] = True
+                nvidia_devices['gpu_count'] = nvidia_count
+                populate_gpu_details(nvidia_count)
+                return nvidia_devices
         else:
             # Linux - try nvidia-smi first
             nvidia_smi_output = self._run_command("nvidia-smi -L")
@@ -708,11 +919,10 @@ class HardwareDetector():
                             }
                     return nvidia_devices
             
-            # Fallback to lspci
-            gpu_info = self._run_command("lspci | grep -i nvidia")
-            if gpu_info and "NVIDIA" in gpu_info:
+            # Fallback to the PCI display adapters
+            gpu_count = sum('NVIDIA' in name for name in self._gpu_names())
+            if gpu_count > 0:
                 nvidia_devices['gpu'] = True
-                gpu_count = len([line for line in gpu_info.strip().split('\n') if line])
                 nvidia_devices['gpu_count'] = gpu_count
                 
                 # Create basic device entries without detailed info
@@ -735,62 +945,11 @@ class HardwareDetector():
             'gpu': False
         }
         
-        try:
-            # Check CPU vendor
-            if platform.system() == "Windows":
-                try:
-                    # Try PowerShell method first
-                    cpu_info = subprocess.check_output(
-                        'powershell "Get-WmiObject -Class Win32_Processor | Select-Object Name"', 
-                        shell=True, text=True
-                    )
-                    if "AMD" in cpu_info:
-                        amd_devices['cpu'] = True
-                    
-                    # Check for AMD GPU
-                    gpu_info = subprocess.check_output(
-                        'powershell "Get-WmiObject -Class Win32_VideoController | Select-Object Name"', 
-                        shell=True, text=True
-                    )
-                    if "AMD" in gpu_info or "Radeon" in gpu_info:
-                        amd_devices['gpu'] = True
-                except Exception:
-                    try:
-                        # Fallback to alternative PowerShell commands
-                        cpu_info = subprocess.check_output(
-                            'powershell "Get-CimInstance -ClassName Win32_Processor | Select-Object -ExpandProperty Name"', 
-                            shell=True, text=True
-                        )
-                        if "AMD" in cpu_info:
-                            amd_devices['cpu'] = True
-                        
-                        gpu_info = subprocess.check_output(
-                            'powershell "Get-CimInstance -ClassName Win32_VideoController | Select-Object -ExpandProperty Name"', 
-                            shell=True, text=True
-                        )
-                        if "AMD" in gpu_info or "Radeon" in gpu_info:
-                            amd_devices['gpu'] = True
-                    except Exception:
-                        pass
-            else:
-                # Linux/Mac
-                try:
-                    with open('/proc/cpuinfo', 'r') as f:
-                        cpu_info = f.read()
-                        if "AMD" in cpu_info:
-                            amd_devices['cpu'] = True
-                except Exception:
-                    pass
-                
-                # Check for AMD GPU
-                try:
-                    gpu_info = subprocess.check_output("lspci | grep -i amd", shell=True, text=True)
-                    if "AMD" in gpu_info:
-                        amd_devices['gpu'] = True
-                except Exception:
-                    pass
-        except Exception:
-            pass
+        if 'AMD' in self._cpu_name():
+            amd_devices['cpu'] = True
+        
+        if any('AMD' in name or 'Radeon' in name for name in self._gpu_names()):
+            amd_devices['gpu'] = True
         
         return amd_devices
     
@@ -805,7 +964,7 @@ class HardwareDetector():
         try:
             if platform.system() == "Darwin":  # macOS
                 # Check for Apple Silicon
-                cpu_info = subprocess.check_output("sysctl -n machdep.cpu.brand_string", shell=True, text=True)
+                cpu_info = self._cpu_name()
                 if "Apple" in cpu_info:
                     apple_devices['cpu'] = True
                     # Apple Silicon chips have integrated Neural Engine and GPU
@@ -838,44 +997,8 @@ class HardwareDetector():
         except Exception:
             pass
 
-        # Platform-specific detection
-        try:
-            if platform.system() == "Windows":
-                try:
-                    # Try PowerShell method first
-                    cpu_info = subprocess.check_output(
-                        'powershell "Get-WmiObject -Class Win32_Processor | Select-Object Name"',
-                        shell=True, text=True, timeout=10
-                    )
-                    if "Intel" in cpu_info:
-                        return True
-                except Exception:
-                    try:
-                        # Fallback to environment variables
-                        cpu_info = subprocess.check_output("echo %PROCESSOR_IDENTIFIER%", shell=True, text=True, timeout=5)
-                        if "Intel" in cpu_info:
-                            return True
-                    except Exception:
-                        pass
-            else:
-                # Linux/Mac - check /proc/cpuinfo or similar
-                try:
-                    with open('/proc/cpuinfo', 'r') as f:
-                        cpu_info = f.read()
-                        if "Intel" in cpu_info:
-                            return True
-                except Exception:
-                    # Fallback for Mac or other systems
-                    try:
-                        cpu_info = subprocess.check_output("sysctl -n machdep.cpu.brand_string", shell=True, text=True, timeout=5)
-                        if "Intel" in cpu_info:
-                            return True
-                    except Exception:
-                        pass
-        except Exception:
-            pass
-
-        return False
+        # OS-reported CPU name
+        return 'Intel' in self._cpu_name()
     
     def _detect_raspberry_pi_hardware(self) -> Dict[str, bool]:
         """Detect if running on Raspberry Pi hardware"""
@@ -994,7 +1117,20 @@ class HardwareDetector():
     def format_for(self, engine, device: str) -> str:
         """
         Format the device string for a specific inference engine.
+        
+        Results depend only on the arguments and the detected hardware, so the
+        most recent DEVICE_FORMAT_CACHE_SIZE are cached until refresh()
+        re-detects it.
+        
+        Raises:
+            TypeError: If engine or device is not a string.
         """
+        if not isinstance(engine, str) or not isinstance(device, str):
+            raise TypeError("engine and device must be strings")
+        return self._cached_format_for(engine, device)
+    
+    def _format_for(self, engine, device: str) -> str:
+        """Format the device string for a specific inference engine (uncached)"""
         optimized_device = self.optimize_device_string(device)
 
         # if engine type is ultralytics intel optimisations are preceeded with intel e.g. intel:cpu, or intel:gpu
@@ -1,11 +1,17 @@
 import os
 import sys
+import json
 import uuid
+import hashlib
+import socket
+import secrets
 import logging
-import platform
-import json
+import importlib
+import threading
+import time
+import concurrent.futures
+from functools import lru_cache
 from typing import Dict, Any, Optional
-from flask import Flask
 
 # Import version
 try:
@@ -14,177 +20,255 @@ except ImportError:
     # Fallback if version file is not available
     __version__ = "0.1.0"
 
-# Add InferenceEngine imports
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from InferenceEngine import InferenceEngineFactory
-
+# Directory of this package, and the project root that holds InferenceEngine,
+# ResultPublisher and the other top-level packages
+_HERE = os.path.dirname(os.path.abspath(__file__))
+_PARENT_DIR = os.path.dirname(_HERE)
 
-# Add parent directory to path for imports when running standalone
+# Put the project root on the path for imports; ahead of everything else when running standalone
 if __name__ == "__main__":
-    parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    sys.path.insert(0, parent_dir)
-else:
-    # When imported as a module, also ensure parent directory is in path
-    parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    if parent_dir not in sys.path:
-        sys.path.insert(0, parent_dir)
-
-from ResultPublisher import ResultPublisher, ResultDestination
-
-# Import ModelRepository
-try:
-    from .model_repo import ModelRepository
-except ImportError:
-    from InferenceNode.model_repo import ModelRepository
-
-# Import HardwareDetector
-try:
-    from .hardware_detector import HardwareDetector
-except ImportError:
-    from InferenceNode.hardware_detector import HardwareDetector
+    sys.path.insert(0, _PARENT_DIR)
+elif _PARENT_DIR not in sys.path:
+    sys.path.append(_PARENT_DIR)
 
 # Import settings_manager
 try:
-    from .settings_manager import load_settings, save_settings
+    from .settings_manager import (load_settings, save_settings, flush_settings, read_settings_file,
+                                   write_settings_file, _serialize_publishers)
 except ImportError:
-    from InferenceNode.settings_manager import load_settings, save_settings
+    from InferenceNode.settings_manager import (load_settings, save_settings, flush_settings, read_settings_file,
+                                                write_settings_file, _serialize_publishers)
 
 # Import utility functions
 try:
-    from .utils import parse_windows_platform
+    from .utils import RESTART_WAIT_ENV, detect_primary_ip, platform_info, wait_for_port_free
 except ImportError:
-    from InferenceNode.utils import parse_windows_platform
+    from InferenceNode.utils import RESTART_WAIT_ENV, detect_primary_ip, platform_info, wait_for_port_free
 
-# Import log manager
-try:
-    from .log_manager import LogManager
-except ImportError:
-    try:
-        from InferenceNode.log_manager import LogManager
-    except ImportError:
-        LogManager = None
-        print("Warning: LogManager not available")
 
-# Import PipelineManager from pipeline module
-try:
-    from .pipeline_manager import PipelineManager
-except ImportError:
-    try:
-        from InferenceNode.pipeline_manager import PipelineManager
-    except ImportError:
-        PipelineManager = None
-        print("Warning: PipelineManager not available")
+# Components imported on first use rather than with this module, so argument
+# parsing and code that only needs the module skip loading Flask, the inference
+# engines, OpenCV and friends. name -> (module, attribute, optional); optional
+# components resolve to None when their module cannot be imported.
+_LAZY_COMPONENTS = {
+    'Flask': ('flask', 'Flask', False),
+    'InferenceEngineFactory': ('InferenceEngine', 'InferenceEngineFactory', False),
+    'ResultPublisher': ('ResultPublisher', 'ResultPublisher', False),
+    'ResultDestination': ('ResultPublisher', 'ResultDestination', False),
+    'ModelRepository': ('InferenceNode.model_repo', 'ModelRepository', False),
+    'HardwareDetector': ('InferenceNode.hardware_detector', 'HardwareDetector', False),
+    'LogManager': ('InferenceNode.log_manager', 'LogManager', True),
+    'PipelineManager': ('InferenceNode.pipeline_manager', 'PipelineManager', True),
+    'DiscoveryManager': ('InferenceNode.discovery_manager', 'DiscoveryManager', True),
+    'NodeTelemetry': ('InferenceNode.telemetry', 'NodeTelemetry', True),
+}
 
-# Import DiscoveryManager from discovery_manager module
-try:
-    from .discovery_manager import DiscoveryManager
-except ImportError:
+
+# Startup progress goes to the console when someone is watching it; under a
+# service manager stdout is a pipe, so it goes through logging instead
+_STATUS_TO_CONSOLE = sys.stdout is not None and sys.stdout.isatty()
+_status_logger = logging.getLogger('InferenceNode')
+
+
+def _status(message: str):
+    """Report a startup step to the console or the log"""
+    if _STATUS_TO_CONSOLE:
+        print(message)
+    else:
+        _status_logger.info(message)
+
+
+def _component(name: str):
+    """Import a lazily loaded component, caching it as a module global"""
+    if name in globals():
+        return globals()[name]
+    module_name, attribute, optional = _LAZY_COMPONENTS[name]
     try:
-        from InferenceNode.discovery_manager import DiscoveryManager
+        value = getattr(importlib.import_module(module_name), attribute)
     except ImportError:
-        DiscoveryManager = None
-        print("Warning: DiscoveryManager not available")
+        if not optional:
+            raise
+        value = None
+        _status(f"Warning: {name} not available")
+    globals()[name] = value
+    return value
 
-# Try to import optional components (graceful degradation)
-try:
-    from .telemetry import NodeTelemetry
-except ImportError:
+
+def __getattr__(name: str):
+    """Resolve lazily loaded components accessed as module attributes"""
+    if name in _LAZY_COMPONENTS:
+        return _component(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+@lru_cache(maxsize=1)
+def _system_capabilities() -> Dict[str, Any]:
+    """Collect the host facts advertised in node info
+    
+    None of these change while the process runs, and the psutil probes are
+    not free, so they are gathered once.
+    """
+    host = platform_info()
+    capabilities = {
+        "platform": host['platform'],
+        "processor": host['processor'],
+        "architecture": host['architecture'],
+    }
     try:
-        # Try absolute import if relative import fails
-        from InferenceNode.telemetry import NodeTelemetry
+        import psutil
+        capabilities["cpu_count"] = psutil.cpu_count()
+        capabilities["memory_gb"] = round(psutil.virtual_memory().total / (1024**3), 2)
     except ImportError:
-        NodeTelemetry = None
-        print("Warning: NodeTelemetry not available")
+        logging.getLogger(__name__).warning("psutil not available for capability detection")
+        # Fallbacks when psutil is unavailable
+        capabilities["cpu_count"] = os.cpu_count() or 0
+        capabilities["memory_gb"] = None
+    return capabilities
+
+
+# Destination type names written by older settings files -> factory type names
+SAVED_DESTINATION_TYPES = {
+    'MQTTDestination': 'mqtt',
+    'WebhookDestination': 'webhook',
+    'SerialDestination': 'serial',
+    'FileDestination': 'file',
+}
+
+# Waitress threads reserved for regular API requests; preview streams get their own on top
+API_WORKER_THREADS = 6
+
+# Seconds start() waits for discovery, telemetry and pipeline info before serving anyway
+STARTUP_STEP_TIMEOUT = 5.0
+
+# Concurrent MJPEG preview streams; each one holds a server thread while open
+MAX_PREVIEW_STREAMS = 4
 
 
 class InferenceNode:
     """Main inference node class that coordinates all components"""
     
+    # Every attribute a node carries, including _settings_writer which
+    # settings_manager attaches on the first save request
+    __slots__ = (
+        'app_start_time', 'node_id', 'node_name', 'port', 'max_preview_streams',
+        'hostname', 'primary_ip', 'settings_file', 'log_manager', 'logger',
+        'hardware_detector', 'inference_engine', 'result_publisher', 'current_engine_info',
+        'favorite_configs', 'favorite_names', 'model_repo', 'pipeline_manager',
+        'discovery_manager', 'node_info', 'telemetry', 'app',
+        '_routes_registered', '_node_info_lock', '_published_node_info', '_available_engines',
+        '_settings_writer',
+    )
+    
     def __init__(self, node_name: Optional[str] = None, port: int = 5000, node_id: Optional[str] = None):
         # Track app start time
-        import time
         self.app_start_time = time.time()
         
         self.node_id = node_id or str(uuid.uuid4())
-        self.node_name = node_name or f"InferNode-{platform.node()}"
+        self.node_name = node_name or f"InferNode-{platform_info()['hostname']}"
         self.port = port
+        self.max_preview_streams = MAX_PREVIEW_STREAMS
+        
+        # Import Flask and the API route modules in the background while the
+        # components below initialize; routes are registered in start()
+        self._routes_registered = False
+        threading.Thread(target=self._preload_routes, name='route-preload', daemon=True).start()
+        
+        # Engine discovery imports every engine backend (torch, onnxruntime, ...),
+        # so it runs in the background and node_info picks it up when it finishes
+        self._node_info_lock = threading.Lock()
+        self.node_info = None
+        self._available_engines = None
+        threading.Thread(target=self._discover_engines, name='engine-discovery', daemon=True).start()
+        
+        # Network identity, resolved once so API handlers never block on DNS
+        self.hostname = socket.gethostname()
+        self.primary_ip = detect_primary_ip()
         
         # Settings file path
-        self.settings_file = os.path.join(os.path.dirname(__file__), 'node_settings.json')
+        self.settings_file = os.path.join(_HERE, 'node_settings.json')
         
         # Setup logging first
         self.log_manager = None
+        LogManager = _component('LogManager')
         if LogManager:
             self.log_manager = LogManager()
             self.log_manager.setup_logging(log_level='INFO', enable_file_logging=True)
-            print("[OK] Log manager initialized")
+            _status("[OK] Log manager initialized")
         else:
             # Fallback to basic logging
             logging.basicConfig(
                 level=logging.INFO,
                 format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
             )
-            print("[ERROR] Log manager not available, using basic logging")
+            _status("[ERROR] Log manager not available, using basic logging")
         
         self.logger = logging.getLogger(self.__class__.__name__)
         
-        # Hardware detection (initialize early so node capabilities can use it)
-        self.hardware_detector = HardwareDetector()
-        print(f"[TOOL] Hardware detection completed:")
-        print(f"   Available devices: {', '.join(self.hardware_detector.available_devices)}")
+        # Hardware detection can take several seconds (vendor tools, driver queries),
+        # so it runs in the background and node_info picks it up when it finishes
+        self.hardware_detector = _component('HardwareDetector')(background=True)
+        _status(f"[TOOL] Hardware detection started")
         
         # Core components
         self.inference_engine = None
-        self.result_publisher = ResultPublisher()
+        self.result_publisher = _component('ResultPublisher')()
         self.current_engine_info = None
         
         # Favorite publisher configurations
         self.favorite_configs = {}
+        self.favorite_names = {}  # lowercase favorite name -> favorite id
         
         # Model repository
-        repo_path = os.path.join(os.path.dirname(__file__), 'model_repository')
-        self.model_repo = ModelRepository(repo_path)
+        repo_path = os.path.join(_HERE, 'model_repository')
+        self.model_repo = _component('ModelRepository')(repo_path)
         
         # Pipeline manager
+        PipelineManager = _component('PipelineManager')
         if PipelineManager:
             self.pipeline_manager = PipelineManager(repo_path, node_id=self.node_id, node_name=self.node_name)
         else:
             self.pipeline_manager = None
-            print("[ERROR] Pipeline manager not available")
+            _status("[ERROR] Pipeline manager not available")
         
         # Discovery manager
+        DiscoveryManager = _component('DiscoveryManager')
         if DiscoveryManager:
             self.discovery_manager = DiscoveryManager()
-            print(f"[OK] Discovery Manager initialized")
-            print(f"   Discovery port: {self.discovery_manager.discovery_port}")
+            _status(f"[OK] Discovery Manager initialized")
+            _status(f"   Discovery port: {self.discovery_manager.discovery_port}")
         else:
             self.discovery_manager = None
-            print("[ERROR] DiscoveryManager not available")
+            _status("[ERROR] DiscoveryManager not available")
         
-        # Node capabilities and info (hardware detector is now available)
-        self.node_info = self._get_node_capabilities()
+        # Node capabilities and info; hardware and engine fields are added once
+        # their background detection finishes
+        self._published_node_info = None  # digest of the node_info last given to discovery
+        with self._node_info_lock:
+            self.node_info = self._get_node_capabilities()
+        self.hardware_detector.on_change(self._update_node_info_with_hardware)
+        if self.hardware_detector.is_ready:
+            self._update_node_info_with_hardware()
         
         # Set node info in discovery manager for broadcasting
-        if self.discovery_manager:
-            self.discovery_manager.set_node_info(self.node_id, self.node_info)
+        self.publish_node_info()
         
         # Services (optional)
         self.telemetry = None
         
+        NodeTelemetry = _component('NodeTelemetry')
         if NodeTelemetry:
             self.telemetry = NodeTelemetry(self.node_id)
-            print(f"[OK] Telemetry service initialized")
+            _status(f"[OK] Telemetry service initialized")
         else:
-            print("[ERROR] Telemetry service not available")
+            _status("[ERROR] Telemetry service not available")
         
         # Load saved settings
         load_settings(self)
         
         # Flask web API - use local templates and static files
-        self.app = Flask(__name__, template_folder='templates', static_folder='static')
+        self.app = _component('Flask')(__name__, template_folder='templates', static_folder='static')
         # Use environment variable or generate a secure random key
-        self.app.secret_key = os.environ.get('FLASK_SECRET_KEY') or os.urandom(24).hex()
-        self._setup_routes()
+        self.app.secret_key = os.environ.get('FLASK_SECRET_KEY') or secrets.token_hex(24)
         
         self.logger.info(f"Inference node initialized: {self.node_name} ({self.node_id})")
     
@@ -197,66 +281,103 @@ class InferenceNode:
             self.node_info['pipeline_stats'] = stats
             
             # Update discovery manager with new info if it's running
-            if self.discovery_manager and self.node_id:
-                self.discovery_manager.set_node_info(self.node_id, self.node_info)
+            self.publish_node_info()
+    
+    def _update_node_info_with_hardware(self):
+        """Update node_info with the detected hardware"""
+        detector = self.hardware_detector
+        self.node_info["hardware"] = detector.hardware_info
+        self.node_info["available_devices"] = detector.available_devices
+        self.node_info["optimal_device"] = detector.get_optimal_device_for_hardware()
+        self.node_info.pop("hardware_pending", None)
+        _status(f"[TOOL] Hardware detection completed:")
+        _status(f"   Available devices: {', '.join(detector.available_devices)}")
+        
+        # Update discovery manager with new info if it's running
+        self.publish_node_info()
+    
+    def _discover_engines(self):
+        """Discover the available inference engines and add them to node_info"""
+        try:
+            engines = _component('InferenceEngineFactory').get_available_types()
+        except Exception as e:
+            logging.getLogger(self.__class__.__name__).warning(f"Engine discovery failed: {e}")
+            engines = []
+        with self._node_info_lock:
+            self._available_engines = engines
+            if self.node_info is None:
+                # Still initializing; _get_node_capabilities picks the list up
+                return
+            self.node_info["available_engines"] = engines
+            self.node_info.pop("engines_pending", None)
+        _status(f"[OK] Inference engines available: {', '.join(engines) or 'none'}")
+        
+        # Update discovery manager with new info if it's running
+        self.publish_node_info()
+    
+    def publish_node_info(self):
+        """Hand node_info to the discovery manager if it changed since the last call
+        
+        The discovery manager re-registers the mDNS service on every update, so
+        updates that leave the advertised info unchanged are skipped.
+        """
+        if not self.discovery_manager or not self.node_id:
+            return
+        with self._node_info_lock:
+            body = json.dumps(self.node_info, sort_keys=True, default=str).encode('utf-8')
+            digest = hashlib.blake2b(body, digest_size=16).digest()
+            if digest == self._published_node_info:
+                return
+            self._published_node_info = digest
+            # The same bytes become the body of every UDP announcement
+            self.discovery_manager.set_node_info(self.node_id, self.node_info, node_info_json=body)
     
     def _get_node_capabilities(self) -> Dict[str, Any]:
         """Get node hardware capabilities"""
+        capabilities = {
+            "node_id": self.node_id,
+            "node_name": self.node_name,
+            "version": __version__,
+            **_system_capabilities(),
+            "api_port": self.port
+        }
+        
+        # Filled in by _update_node_info_with_hardware once detection finishes
+        capabilities["hardware"] = {}
+        capabilities["available_devices"] = []
+        capabilities["hardware_pending"] = True
+        
+        # Filled in by _discover_engines unless it has already finished
+        if self._available_engines is None:
+            capabilities["available_engines"] = []
+            capabilities["engines_pending"] = True
+        else:
+            capabilities["available_engines"] = self._available_engines
+        
+        return capabilities
+    
+    def _preload_routes(self):
+        """Import the API route modules ahead of _setup_routes"""
         try:
-            import psutil
-            
-            # Basic system info
-            capabilities = {
-                "node_id": self.node_id,
-                "node_name": self.node_name,
-                "version": __version__,
-                "platform": parse_windows_platform(platform.platform()),
-                "processor": platform.processor(),
-                "architecture": platform.architecture()[0],
-                "cpu_count": psutil.cpu_count(),
-                "memory_gb": round(psutil.virtual_memory().total / (1024**3), 2),
-                "available_engines": InferenceEngineFactory.get_available_types(),
-                "api_port": self.port
-            }
-            
-            # Hardware detection using HardwareDetector
-            capabilities["hardware"] = self.hardware_detector.hardware_info
-            capabilities["available_devices"] = self.hardware_detector.available_devices
-            capabilities["optimal_device"] = self.hardware_detector.get_optimal_device_for_hardware()
-            
-            return capabilities
-            
-        except ImportError:
-            self.logger.warning("psutil not available for capability detection")
-            # Fallback capabilities
-            capabilities = {
-                "node_id": self.node_id,
-                "node_name": self.node_name,
-                "version": __version__,
-                "platform": parse_windows_platform(platform.platform()),
-                "architecture": platform.architecture()[0],
-                "processor": platform.processor(),
-                # Fallbacks when psutil is unavailable
-                "cpu_count": os.cpu_count() or 0,
-                "memory_gb": None,
-                "available_engines": InferenceEngineFactory.get_available_types(),
-                "api_port": self.port
-            }
-            
-            # Hardware detection using HardwareDetector (even without psutil)
-            capabilities["hardware"] = self.hardware_detector.hardware_info
-            capabilities["available_devices"] = self.hardware_detector.available_devices
-            capabilities["optimal_device"] = self.hardware_detector.get_optimal_device_for_hardware()
-            
-            return capabilities
+            try:
+                from .api import preload_route_modules
+            except ImportError:
+                from InferenceNode.api import preload_route_modules
+            preload_route_modules()
+        except Exception as e:
+            # _setup_routes imports the modules again and reports real failures
+            logging.getLogger(self.__class__.__name__).debug(f"Route preload failed: {e}")
     
     def _setup_routes(self):
         """Setup Flask API routes using modular route registration"""
+        if self._routes_registered:
+            return
         try:
             from .api import register_routes
         except ImportError:
             from InferenceNode.api import register_routes
         register_routes(self.app, self)
+        self._routes_registered = True
         
         # NOTE: Routes now registered via api/__init__.py
         # Keeping this comment as a marker for the old route location
@@ -266,8 +387,7 @@ class InferenceNode:
         """Load settings from file"""
         try:
             if os.path.exists(self.settings_file):
-                with open(self.settings_file, 'r') as f:
-                    settings = json.load(f)
+                settings = read_settings_file(self.settings_file)
                 
                 # Restore node configuration
                 if 'node_name' in settings and settings['node_name']:
@@ -280,14 +400,7 @@ class InferenceNode:
                         try:
                             # Map saved type names to actual destination types
                             destination_type = pub_config['type']
-                            if destination_type in ['MQTTDestination', 'mqtt']:
-                                destination_type = 'mqtt'
-                            elif destination_type in ['WebhookDestination', 'webhook']:
-                                destination_type = 'webhook'
-                            elif destination_type in ['SerialDestination', 'serial']:
-                                destination_type = 'serial'
-                            elif destination_type in ['FileDestination', 'file']:
-                                destination_type = 'file'
+                            destination_type = SAVED_DESTINATION_TYPES.get(destination_type, destination_type)
                             
                             # Clean up config - remove null values and empty strings
                             config = pub_config.get('config', {})
@@ -298,7 +411,7 @@ class InferenceNode:
                             
                             self.logger.info(f"Attempting to restore {destination_type} publisher with config: {cleaned_config}")
                             
-                            destination = ResultDestination(destination_type)
+                            destination = _component('ResultDestination')(destination_type)
                             
                             # Set context variables for variable substitution
                             destination.set_context_variables(
@@ -391,12 +504,12 @@ class InferenceNode:
                 # Restore favorite publisher configurations
                 if 'favorite_configs' in settings:
                     try:
-                        self.favorite_configs = settings['favorite_configs']
+                        self.set_favorite_configs(settings['favorite_configs'])
                         favorite_count = len(self.favorite_configs)
                         self.logger.info(f"[PIN] Restored {favorite_count} favorite configuration(s)")
                     except Exception as e:
                         self.logger.error(f"Failed to restore favorite configs: {str(e)}")
-                        self.favorite_configs = {}
+                        self.set_favorite_configs({})
                 
                 self.logger.info(f"Settings loaded from {self.settings_file}")
                 
@@ -410,6 +523,12 @@ class InferenceNode:
         except Exception as e:
             self.logger.error(f"Failed to load settings: {str(e)}")
     
+    def set_favorite_configs(self, favorites: dict):
+        """Replace the favorite publisher configurations and rebuild the name index"""
+        self.favorite_configs = favorites
+        self.favorite_names = {favorite['name'].lower(): favorite_id
+                               for favorite_id, favorite in favorites.items()}
+    
     def _save_settings(self):
         """Save current settings to file"""
         
@@ -423,95 +542,16 @@ class InferenceNode:
             }
             
             # Save publisher configurations
-            for dest in self.result_publisher.destinations:
-                # Determine destination type from class name or attributes
-                dest_type = 'unknown'
-                if hasattr(dest, 'server') and hasattr(dest, 'port') and hasattr(dest, 'topic'):
-                    dest_type = 'mqtt'
-                elif hasattr(dest, 'url'):
-                    dest_type = 'webhook'
-                elif hasattr(dest, 'com_port'):
-                    dest_type = 'serial'
-                elif hasattr(dest, 'file_path'):
-                    dest_type = 'file'
-                
-                pub_config = {
-                    'type': dest_type,
-                    'config': {}
-                }
-                
-                # Include publisher ID if it exists
-                if hasattr(dest, '_id') and dest._id:
-                    pub_config['id'] = dest._id
-                
-                # Include rate limit if it exists
-                if hasattr(dest, 'rate_limit') and dest.rate_limit is not None:
-                    pub_config['rate_limit'] = dest.rate_limit
-                
-                # Include image data flag if it exists
-                if hasattr(dest, 'include_image_data'):
-                    pub_config['include_image_data'] = getattr(dest, 'include_image_data', False)
-                
-                # Extract configuration based on destination type
-                if dest_type == 'mqtt':
-                    # MQTT destination - only save non-empty values
-                    config = {}
-                    if hasattr(dest, 'server') and getattr(dest, 'server', ''):
-                        config['server'] = getattr(dest, 'server')
-                    if hasattr(dest, 'port'):
-                        config['port'] = getattr(dest, 'port', 1883)
-                    if hasattr(dest, 'topic') and getattr(dest, 'topic', ''):
-                        config['topic'] = getattr(dest, 'topic')
-                    if hasattr(dest, 'username') and getattr(dest, 'username', ''):
-                        config['username'] = getattr(dest, 'username')
-                    if hasattr(dest, 'password') and getattr(dest, 'password', ''):
-                        config['password'] = getattr(dest, 'password')
-                    pub_config['config'] = config
-                elif dest_type == 'webhook':
-                    # Webhook destination - only save non-empty values
-                    config = {}
-                    if hasattr(dest, 'url') and getattr(dest, 'url', ''):
-                        config['url'] = getattr(dest, 'url')
-                    if hasattr(dest, 'headers') and getattr(dest, 'headers', {}):
-                        config['headers'] = getattr(dest, 'headers')
-                    if hasattr(dest, 'method'):
-                        config['method'] = getattr(dest, 'method', 'POST')
-                    pub_config['config'] = config
-                elif dest_type == 'serial':
-                    # Serial destination - only save non-empty values
-                    config = {}
-                    if hasattr(dest, 'com_port') and getattr(dest, 'com_port', ''):
-                        config['com_port'] = getattr(dest, 'com_port')
-                    if hasattr(dest, 'baud'):
-                        config['baud'] = getattr(dest, 'baud', 9600)
-                    if hasattr(dest, 'timeout'):
-                        config['timeout'] = getattr(dest, 'timeout', 1)
-                    pub_config['config'] = config
-                elif dest_type == 'file':
-                    # File destination - only save non-empty values
-                    config = {}
-                    if hasattr(dest, 'file_path') and getattr(dest, 'file_path', ''):
-                        config['file_path'] = getattr(dest, 'file_path')
-                    if hasattr(dest, 'format'):
-                        config['format'] = getattr(dest, 'format', 'json')
-                    pub_config['config'] = config
-                
-                settings['publishers'].append(pub_config)
+            settings['publishers'] = _serialize_publishers(self.result_publisher)
             
             # Save telemetry configuration
             if self.telemetry:
-                telemetry_config = {
-                    'enabled': getattr(self.telemetry, 'running', False),
-                    'publish_interval': getattr(self.telemetry, 'update_interval', 30)
-                }
+                telemetry_config = self.telemetry.snapshot_settings()
                 
-                # Add MQTT config if available
-                if hasattr(self.telemetry, 'mqtt_server') and getattr(self.telemetry, 'mqtt_server', ''):
-                    telemetry_config.update({
-                        'mqtt_server': getattr(self.telemetry, 'mqtt_server', ''),
-                        'mqtt_port': getattr(self.telemetry, 'mqtt_port', 1883),
-                        'mqtt_topic': getattr(self.telemetry, 'mqtt_topic', 'infernode/telemetry')
-                    })
+                # Only keep the MQTT config if a broker is set
+                if not telemetry_config['mqtt_server']:
+                    for key in ('mqtt_server', 'mqtt_port', 'mqtt_topic'):
+                        del telemetry_config[key]
                 
                 settings['telemetry'] = telemetry_config
             
@@ -520,60 +560,102 @@ class InferenceNode:
             
             # Write settings to file
             os.makedirs(os.path.dirname(self.settings_file), exist_ok=True)
-            with open(self.settings_file, 'w') as f:
-                json.dump(settings, f, indent=2)
+            write_settings_file(self.settings_file, settings)
             
             self.logger.info(f"Settings saved to {self.settings_file}")
             
         except Exception as e:
             self.logger.error(f"Failed to save settings: {str(e)}")
     
+    def _start_discovery(self):
+        """Start the discovery manager and an initial scan for existing nodes"""
+        _status(f"[DISCOVER] Starting discovery manager...")
+        self.discovery_manager.start_discovery()
+        _status(f"[OK] Discovery manager started - listening on port {self.discovery_manager.discovery_port}")
+        
+        # Perform initial network scan to discover existing nodes
+        _status(f"[SCAN] Performing initial network scan...")
+        scan_thread = threading.Thread(target=self.discovery_manager.scan_network, daemon=True)
+        scan_thread.start()
+        _status(f"[OK] Initial network scan started")
+    
+    def _start_telemetry(self):
+        """Start the telemetry service"""
+        _status(f"[DATA] Starting telemetry service...")
+        self.telemetry.start_telemetry()
+        _status(f"[OK] Telemetry service started")
+    
+    def _run_startup_steps(self, steps: Dict[str, Any]):
+        """Run independent startup steps concurrently, waiting a bounded time for each"""
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=len(steps), thread_name_prefix='startup')
+        futures = {name: executor.submit(step) for name, step in steps.items()}
+        executor.shutdown(wait=False)
+        
+        deadline = time.monotonic() + STARTUP_STEP_TIMEOUT
+        for name, future in futures.items():
+            try:
+                future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except concurrent.futures.TimeoutError:
+                self.logger.warning(f"Startup step '{name}' is still running; continuing without waiting for it")
+            except Exception as e:
+                self.logger.error(f"Startup step '{name}' failed: {str(e)}")
+    
     def start(self, enable_discovery: bool = True, enable_telemetry: bool = False, production: bool = False):
         """Start the inference node
         
         Args:
             enable_discovery (bool): Enable discovery manager for finding other nodes
             enable_telemetry (bool): Enable telemetry data collection
-            production (bool): If True, use Waitress WSGI server for production.
-                              If False, use Flask development server.
+            production (bool): If True, run in production mode, which requires Waitress.
+                              If False, Waitress is still used when installed,
+                              falling back to the Flask development server.
         """
         try:
-            # Initialize pipeline information in node_info
-            self._update_node_info_with_pipelines()
+            # Register API routes; their modules were imported in the background
+            self._setup_routes()
+            
+            # Pipeline stats, discovery (which may register mDNS) and telemetry are
+            # independent, so they start side by side; one that is still busy after
+            # STARTUP_STEP_TIMEOUT finishes in the background while the server starts
+            steps = {'pipeline info': self._update_node_info_with_pipelines}
             
-            # Start discovery manager (for finding other nodes)
             if enable_discovery and self.discovery_manager:
-                print(f"[DISCOVER] Starting discovery manager...")
-                self.discovery_manager.start_discovery()
-                print(f"[OK] Discovery manager started - listening on port {self.discovery_manager.discovery_port}")
-                
-                # Perform initial network scan to discover existing nodes
-                print(f"[SCAN] Performing initial network scan...")
-                import threading
-                scan_thread = threading.Thread(target=self.discovery_manager.scan_network, daemon=True)
-                scan_thread.start()
-                print(f"[OK] Initial network scan started")
+                steps['discovery'] = self._start_discovery
             elif enable_discovery and not self.discovery_manager:
-                print(f"[ERROR] Discovery manager requested but service not available")
+                _status(f"[ERROR] Discovery manager requested but service not available")
             
-            # Start telemetry if requested
             if enable_telemetry and self.telemetry:
-                print(f"[DATA] Starting telemetry service...")
-                self.telemetry.start_telemetry()
-                print(f"[OK] Telemetry service started")
+                steps['telemetry'] = self._start_telemetry
             elif enable_telemetry and not self.telemetry:
-                print(f"[ERROR] Telemetry requested but service not available")
+                _status(f"[ERROR] Telemetry requested but service not available")
+            
+            self._run_startup_steps(steps)
+            
+            # A node restarted on Windows is launched before its predecessor has
+            # exited, so it waits for the old process to release the port
+            restart_wait = os.environ.pop(RESTART_WAIT_ENV, None)
+            if restart_wait and not wait_for_port_free(self.port, float(restart_wait)):
+                self.logger.warning(f"Port {self.port} still in use after {restart_wait}s; starting anyway")
             
-            # Start the web server
-            if production:
+            # Start the web server; Waitress serves both modes since the Werkzeug
+            # server struggles with the UI's concurrent polling and preview streams
+            mode = 'production' if production else 'development'
+            try:
                 from waitress import serve
-                print(f"[LAUNCH] Starting production web server (Waitress) on port {self.port}...")
-                self.logger.info(f"Starting inference node in production mode on port {self.port}")
-                serve(self.app, host='0.0.0.0', port=self.port, threads=6)
+            except ImportError:
+                if production:
+                    raise
+                serve = None
+            
+            if serve is not None:
+                _status(f"[LAUNCH] Starting {mode} web server (Waitress) on port {self.port}...")
+                self.logger.info(f"Starting inference node in {mode} mode on port {self.port}")
+                serve(self.app, host='0.0.0.0', port=self.port,
+                      threads=API_WORKER_THREADS + self.max_preview_streams)
             else:
-                print(f"[LAUNCH] Starting development web server (Flask) on port {self.port}...")
+                _status(f"[LAUNCH] Waitress not installed, starting development web server (Flask) on port {self.port}...")
                 self.logger.info(f"Starting inference node in development mode on port {self.port}")
-                self.app.run(host='0.0.0.0', port=self.port, debug=False)
+                self.app.run(host='0.0.0.0', port=self.port, debug=False, threaded=True)
             
         except Exception as e:
             self.logger.error(f"Failed to start node: {str(e)}")
@@ -589,6 +671,9 @@ class InferenceNode:
         if self.telemetry:
             self.telemetry.stop_telemetry()
         
+        # Write batched settings changes before publishers are cleared
+        flush_settings(self)
+        
         # Clear publishers
         self.result_publisher.clear()
         
@@ -604,16 +689,16 @@ if __name__ == "__main__":
     parser.add_argument('--port', type=int, default=5555, help='Port to run the web interface on')
     parser.add_argument('--node-id', type=str, help='Specific node ID to use (optional)')
     parser.add_argument('--node-name', type=str, help='Human-readable node name')
-    parser.add_argument('--discovery', type=str, default='true', choices=['true', 'false'], help='Enable discovery service')
-    parser.add_argument('--telemetry', type=str, default='true', choices=['true', 'false'], help='Enable telemetry service')
+    parser.add_argument('--discovery', action=argparse.BooleanOptionalAction, default=True, help='Enable discovery service')
+    parser.add_argument('--telemetry', action=argparse.BooleanOptionalAction, default=True, help='Enable telemetry service')
     
     args = parser.parse_args()
     
     port = args.port
     node_name = args.node_name
     node_id = args.node_id
-    enable_discovery = args.discovery.lower() == 'true'
-    enable_telemetry = args.telemetry.lower() == 'true'
+    enable_discovery = args.discovery
+    enable_telemetry = args.telemetry
     
     # Create and start the node
     print(f"Starting InferenceNode...")
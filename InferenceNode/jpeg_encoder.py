@@ -0,0 +1,121 @@
+"""
+JPEG encoding for InferenceNode preview streams
+Handles GPU-accelerated encoding with nvJPEG, SIMD encoding with
+libjpeg-turbo, and falls back to OpenCV
+"""
+import logging
+from typing import Optional
+
+import cv2
+
+# PyNvJpeg is optional; it encodes on NVIDIA GPUs through nvJPEG
+try:
+    from nvjpeg import NvJpeg
+    HAS_NVJPEG = True
+except ImportError:
+    NvJpeg = None
+    HAS_NVJPEG = False
+
+# PyTurboJPEG is optional; it calls libjpeg-turbo's SIMD encoder directly
+try:
+    from turbojpeg import TurboJPEG, TJFLAG_FASTDCT, TJSAMP_420
+    HAS_TURBOJPEG = True
+except ImportError:
+    TurboJPEG = None
+    HAS_TURBOJPEG = False
+
+
+logger = logging.getLogger(__name__)
+
+
+class OpenCVJpegEncoder:
+    """CPU JPEG encoder backed by cv2.imencode"""
+
+    name = 'opencv'
+
+    def encode(self, frame, quality: int):
+        """Encode a BGR frame, returning a bytes-like JPEG buffer or None on failure
+
+        The encoded numpy buffer is returned as is; callers that need bytes can
+        join it into their output without an intermediate tobytes() copy.
+        """
+        ret, buffer = cv2.imencode('.jpg', frame, [
+            cv2.IMWRITE_JPEG_QUALITY, quality,
+            cv2.IMWRITE_JPEG_OPTIMIZE, 1
+        ])
+        return buffer if ret else None
+
+
+class NvJpegEncoder:
+    """GPU JPEG encoder backed by nvJPEG"""
+
+    name = 'nvjpeg'
+
+    def __init__(self):
+        self._encoder = NvJpeg()
+
+    def encode(self, frame, quality: int) -> Optional[bytes]:
+        """Encode a BGR frame, returning JPEG bytes or None on failure"""
+        return self._encoder.encode(frame, quality)
+
+
+class TurboJpegEncoder:
+    """CPU JPEG encoder backed by libjpeg-turbo with the fast integer DCT
+
+    Frames with even dimensions are converted to planar I420 by OpenCV's SIMD
+    colour conversion and handed to libjpeg-turbo already subsampled, which
+    skips the encoder's own colour conversion and downsampling.
+    """
+
+    name = 'turbojpeg'
+
+    def __init__(self):
+        # Raises if the libturbojpeg shared library cannot be found
+        self._encoder = TurboJPEG()
+        # encode_from_yuv arrived in PyTurboJPEG 1.6
+        self._has_yuv_input = hasattr(self._encoder, 'encode_from_yuv')
+
+    def encode(self, frame, quality: int) -> Optional[bytes]:
+        """Encode a BGR frame, returning JPEG bytes or None on failure"""
+        height, width = frame.shape[:2]
+        if self._has_yuv_input and not (height | width) & 1:
+            yuv = cv2.cvtColor(frame, cv2.COLOR_BGR2YUV_I420)
+            return self._encoder.encode_from_yuv(yuv, height, width, quality=quality,
+                                                 jpeg_subsample=TJSAMP_420, flags=TJFLAG_FASTDCT)
+        return self._encoder.encode(frame, quality=quality, jpeg_subsample=TJSAMP_420,
+                                    flags=TJFLAG_FASTDCT)
+
+
+def _is_nvidia_device(device: Optional[str]) -> bool:
+    device = (device or '').lower()
+    return device.startswith('cuda') or device.startswith('nvidia')
+
+
+def create_jpeg_encoder(device: Optional[str] = None):
+    """Create the fastest JPEG encoder available for a pipeline device
+
+    NVIDIA devices use nvJPEG when PyNvJpeg is installed. Otherwise
+    libjpeg-turbo is used through PyTurboJPEG when available, and OpenCV
+    covers everything else, including encoders that fail to initialise.
+    """
+    if HAS_NVJPEG and _is_nvidia_device(device):
+        try:
+            return NvJpegEncoder()
+        except Exception as e:
+            logger.warning("nvJPEG encoder unavailable: %s", e)
+    if HAS_TURBOJPEG:
+        try:
+            return TurboJpegEncoder()
+        except Exception as e:
+            logger.warning("libjpeg-turbo encoder unavailable: %s", e)
+    return OpenCVJpegEncoder()
+
+
+def get_pipeline_encoder(pipeline_info: dict):
+    """Get the JPEG encoder cached on an active pipeline entry, creating it on first use"""
+    encoder = pipeline_info.get('_jpeg_encoder')
+    if encoder is None:
+        device = pipeline_info.get('config', {}).get('model', {}).get('device')
+        encoder = create_jpeg_encoder(device)
+        pipeline_info['_jpeg_encoder'] = encoder
+    return encoder
@@ -1,11 +1,19 @@
 import logging
 import threading
 import json
+import re
+from functools import lru_cache
 from datetime import datetime
 from collections import deque
 from typing import List, Dict, Any, Optional
 
 
+@lru_cache(maxsize=128)
+def _compile_search(search: str) -> re.Pattern:
+    """Compile a case-insensitive literal matcher for a log search string"""
+    return re.compile(re.escape(search), re.IGNORECASE)
+
+
 class MemoryLogHandler(logging.Handler):
     """Custom logging handler that stores logs in memory for web interface access"""
     
@@ -105,29 +113,30 @@ class MemoryLogHandler(logging.Handler):
                  component: Optional[str] = None,
                  search: Optional[str] = None,
                  limit: Optional[int] = None) -> List[Dict[str, Any]]:
-        """Get filtered logs"""
+        """Get filtered logs, newest first"""
         with self._lock:
             logs = list(self.logs)
         
-        # Apply filters
-        if level:
-            logs = [log for log in logs if log['level'] == level.upper()]
-        
-        if component:
-            logs = [log for log in logs if log['component'] == component]
-        
-        if search:
-            search_lower = search.lower()
-            logs = [log for log in logs 
-                   if search_lower in log['message'].lower() or
-                      search_lower in log.get('logger', '').lower()]
+        level_upper = level.upper() if level else None
+        # Dashboards poll with the same search string, so the matcher is cached
+        search_match = _compile_search(search).search if search else None
         
-        # Apply limit
-        if limit:
-            logs = logs[-limit:]
+        # Single pass from newest to oldest, applying every filter per record
+        # and stopping as soon as the limit is reached
+        filtered = []
+        for log in reversed(logs):
+            if level_upper and log['level'] != level_upper:
+                continue
+            if component and log['component'] != component:
+                continue
+            if search_match and not (search_match(log['message']) or
+                                     search_match(log.get('logger', ''))):
+                continue
+            filtered.append(log)
+            if limit and len(filtered) >= limit:
+                break
         
-        # Return in reverse chronological order (newest first)
-        return list(reversed(logs))
+        return filtered
     
     def clear_logs(self):
         """Clear all stored logs"""
@@ -1,9 +1,41 @@
 import os
-import json
+import errno
 import shutil
 import hashlib
+import mmap
+import tempfile
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterator, Optional, Tuple
+
+from .settings_manager import read_settings_file, write_settings_file
+
+# Block size used when writing or hashing model files
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+def _fast_file_copy(src: str, dst: str):
+    """Copy a file using an in-kernel sendfile loop where available
+    
+    Falls back to shutil.copyfile, which itself uses the platform's fastest
+    copy primitive when one exists.
+    """
+    if hasattr(os, 'sendfile'):
+        try:
+            with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+                src_fd, dst_fd = fsrc.fileno(), fdst.fileno()
+                size = os.fstat(src_fd).st_size
+                offset = 0
+                while offset < size:
+                    sent = os.sendfile(dst_fd, src_fd, offset, size - offset)
+                    if sent == 0:
+                        break
+                    offset += sent
+            return
+        except OSError:
+            # e.g. filesystems that do not support sendfile; retry the portable way
+            pass
+    shutil.copyfile(src, dst)
+
 
 class ModelRepository:
     """Manages storage and retrieval of uploaded models"""
@@ -12,19 +44,51 @@ class ModelRepository:
         self.repo_path = repo_path
         self.models_dir = os.path.join(repo_path, 'models')
         self.metadata_file = os.path.join(repo_path, 'models_metadata.json')
+        # Uploads are staged next to the models so they can be renamed into place
+        self.staging_dir = os.path.join(repo_path, '.staging')
         
         # Create directories if they don't exist
         os.makedirs(self.models_dir, exist_ok=True)
+        os.makedirs(self.staging_dir, exist_ok=True)
+        self._clear_staging()
         
-        # Load existing metadata or create empty dict
+        # Load existing metadata or create empty dict; set when the file exists
+        # but can't be read, so the empty stand-in never overwrites it
+        self._metadata_unreadable = False
         self.metadata = self._load_metadata()
+        
+        # Bumped on every store/delete so listings can be cached between changes
+        self.listing_rev = 0
+        self._listing_cache = None  # (listing_rev, models, stats)
+        
+        # Running totals kept in step with metadata for get_storage_stats
+        self._bytes_total = 0
+        self._engine_counts: Dict[str, int] = {}
+        for model in self.metadata.values():
+            self._count_model(model, 1)
+    
+    def _clear_staging(self):
+        """Remove uploads left in the staging directory by an earlier run
+        
+        Nothing can be mid-upload while the repository is being created, so
+        anything still staged was abandoned by a crash or dropped connection.
+        """
+        try:
+            entries = list(os.scandir(self.staging_dir))
+        except OSError:
+            return
+        for entry in entries:
+            try:
+                if entry.is_file(follow_symlinks=False):
+                    os.unlink(entry.path)
+            except OSError as e:
+                print(f"Warning: Could not remove stale staged upload {entry.path}: {e}")
     
     def _load_metadata(self) -> Dict[str, Any]:
         """Load model metadata from file"""
         if os.path.exists(self.metadata_file):
             try:
-                with open(self.metadata_file, 'r') as f:
-                    metadata = json.load(f)
+                metadata = read_settings_file(self.metadata_file)
                 
                 # Migration: Add name field to existing models that don't have it
                 needs_save = False
@@ -37,67 +101,155 @@ class ModelRepository:
                 
                 # Save if we made any changes
                 if needs_save:
-                    with open(self.metadata_file, 'w') as f:
-                        json.dump(metadata, f, indent=2)
+                    write_settings_file(self.metadata_file, metadata)
                 
                 return metadata
             except Exception as e:
                 print(f"Warning: Could not load model metadata: {e}")
+                print(f"Warning: {self.metadata_file} will not be overwritten until it can be read")
+                self._metadata_unreadable = True
         return {}
     
+    def _count_model(self, model: Dict[str, Any], sign: int):
+        """Add (sign=1) or remove (sign=-1) a model from the running storage totals"""
+        self._bytes_total += sign * model.get('file_size', 0)
+        engine_type = model.get('engine_type')
+        count = self._engine_counts.get(engine_type, 0) + sign
+        if count > 0:
+            self._engine_counts[engine_type] = count
+        else:
+            self._engine_counts.pop(engine_type, None)
+    
     def _save_metadata(self):
         """Save model metadata to file"""
+        if self._metadata_unreadable:
+            print(f"Warning: Not saving model metadata over unreadable {self.metadata_file}")
+            return
         try:
-            with open(self.metadata_file, 'w') as f:
-                json.dump(self.metadata, f, indent=2)
+            write_settings_file(self.metadata_file, self.metadata)
         except Exception as e:
             print(f"Error saving model metadata: {e}")
     
-    def _generate_model_id(self, filename: str, file_content: bytes) -> str:
+    def new_content_hash(self):
+        """Create the hash object used to derive model IDs from file content"""
+        return hashlib.md5()
+    
+    def _hash_file(self, file_path: str) -> str:
+        """Compute the content hex digest of a file without loading it into memory"""
+        with open(file_path, 'rb') as f:
+            if hasattr(hashlib, 'file_digest'):
+                # Python 3.11+: hashes in C with the GIL released
+                return hashlib.file_digest(f, self.new_content_hash).hexdigest()
+            
+            digest = self.new_content_hash()
+            if os.fstat(f.fileno()).st_size:
+                # Map the file so the whole content is hashed in one C call
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    digest.update(mapped)
+            return digest.hexdigest()
+    
+    def _generate_model_id(self, filename: str, content_hash: str) -> str:
         """Generate a unique model ID based on filename and content hash"""
-        content_hash = hashlib.md5(file_content).hexdigest()[:8]
         base_name = os.path.splitext(filename)[0]
-        return f"{base_name}_{content_hash}"
+        return f"{base_name}_{content_hash[:8]}"
+    
+    def _stored_path(self, model_id: str, original_filename: str):
+        """Get the stored filename and path for a model ID"""
+        file_extension = os.path.splitext(original_filename)[1]
+        stored_filename = f"{model_id}{file_extension}"
+        return stored_filename, os.path.join(self.models_dir, stored_filename)
+    
+    def _record_model(self, model_id: str, stored_path: str, original_filename: str,
+                      engine_type: str, description: str, name: str):
+        """Record metadata for a model file that is already in the repository"""
+        file_extension = os.path.splitext(original_filename)[1]
+        
+        # Use provided name or fall back to original filename without extension
+        display_name = name.strip() if name.strip() else os.path.splitext(original_filename)[0]
+        
+        previous = self.metadata.get(model_id)
+        if previous:
+            self._count_model(previous, -1)
+        
+        self.metadata[model_id] = {
+            'id': model_id,
+            'name': display_name,
+            'original_filename': original_filename,
+            'stored_filename': os.path.basename(stored_path),
+            'stored_path': stored_path,
+            'engine_type': engine_type,
+            'description': description,
+            'file_size': os.path.getsize(stored_path),
+            'upload_date': datetime.now().isoformat(),
+            'file_extension': file_extension
+        }
+        self._count_model(self.metadata[model_id], 1)
+        self.listing_rev += 1
+        
+        self._save_metadata()
+    
+    def open_staging_file(self):
+        """Open a new writable file in the staging directory for an incoming upload
+        
+        The returned file object exposes the staged path as its name attribute.
+        """
+        return tempfile.NamedTemporaryFile(
+            mode='w+b', dir=self.staging_dir, suffix='.upload',
+            delete=False, buffering=COPY_BUFFER_SIZE
+        )
     
-    def store_model(self, temp_file_path: str, original_filename: str, engine_type: str, description: str = "", name: str = "") -> str:
-        """Store a model file in the repository and return model ID"""
+    def store_model(self, temp_file_path: str, original_filename: str, engine_type: str, description: str = "", name: str = "",
+                    move: bool = False) -> str:
+        """Store a model file in the repository and return model ID
+        
+        With move=True the source file is disposable: it is renamed into the
+        repository when both are on the same filesystem and only copied (then
+        removed) when they are not.
+        """
         try:
-            # Read file content for hashing
-            with open(temp_file_path, 'rb') as f:
-                file_content = f.read()
-            
-            # Generate unique model ID
-            model_id = self._generate_model_id(original_filename, file_content)
-            
-            # Get file extension
-            file_extension = os.path.splitext(original_filename)[1]
-            stored_filename = f"{model_id}{file_extension}"
-            stored_path = os.path.join(self.models_dir, stored_filename)
+            # Generate unique model ID from the content hash
+            model_id = self._generate_model_id(original_filename, self._hash_file(temp_file_path))
+            stored_filename, stored_path = self._stored_path(model_id, original_filename)
             
-            # Copy file to repository
-            shutil.copy2(temp_file_path, stored_path)
+            if move:
+                self._move_file(temp_file_path, stored_path)
+            else:
+                # Copy file to repository without staging it through Python buffers
+                _fast_file_copy(temp_file_path, stored_path)
             
-            # Get file size
-            file_size = os.path.getsize(stored_path)
+            self._record_model(model_id, stored_path, original_filename, engine_type, description, name)
+            return model_id
             
-            # Use provided name or fall back to original filename without extension
-            display_name = name.strip() if name.strip() else os.path.splitext(original_filename)[0]
+        except Exception as e:
+            raise Exception(f"Failed to store model: {str(e)}")
+    
+    def _move_file(self, src: str, dst: str):
+        """Rename src to dst, falling back to copy and delete across filesystems"""
+        try:
+            os.replace(src, dst)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            _fast_file_copy(src, dst)
+            os.unlink(src)
+    
+    def ingest_streamed(self, staged_path: str, original_filename: str, engine_type: str, description: str = "",
+                        name: str = "", content_hash: Optional[str] = None) -> str:
+        """Move an upload that was streamed into the staging directory into the repository
+        
+        The staged file is renamed into place, so no bytes are copied. Callers
+        that hashed the content while writing it can pass content_hash (from
+        new_content_hash()) to skip reading the file again.
+        """
+        try:
+            if content_hash is None:
+                content_hash = self._hash_file(staged_path)
+            model_id = self._generate_model_id(original_filename, content_hash)
+            stored_filename, stored_path = self._stored_path(model_id, original_filename)
             
-            # Store metadata
-            self.metadata[model_id] = {
-                'id': model_id,
-                'name': display_name,
-                'original_filename': original_filename,
-                'stored_filename': stored_filename,
-                'stored_path': stored_path,
-                'engine_type': engine_type,
-                'description': description,
-                'file_size': file_size,
-                'upload_date': datetime.now().isoformat(),
-                'file_extension': file_extension
-            }
+            self._move_file(staged_path, stored_path)
             
-            self._save_metadata()
+            self._record_model(model_id, stored_path, original_filename, engine_type, description, name)
             return model_id
             
         except Exception as e:
@@ -113,9 +265,30 @@ class ModelRepository:
         """Get metadata for a specific model"""
         return self.metadata.get(model_id)
     
+    def _get_listing(self):
+        """Get the (models, stats) snapshot for the current listing revision"""
+        cache = self._listing_cache
+        if cache is None or cache[0] != self.listing_rev:
+            cache = (self.listing_rev, dict(self.metadata), self._build_storage_stats())
+            self._listing_cache = cache
+        return cache[1], cache[2]
+    
     def list_models(self) -> Dict[str, Any]:
         """List all stored models with their metadata"""
-        return dict(self.metadata)
+        return self._get_listing()[0]
+    
+    def iter_models(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield (model_id, metadata) pairs one at a time
+        
+        Iterates over a snapshot of the model IDs, so stores and deletes made
+        while iterating do not interrupt it.
+        """
+        for model_id, model in list(self.metadata.items()):
+            yield model_id, model
+    
+    def model_count(self) -> int:
+        """Get the number of stored models"""
+        return len(self.metadata)
     
     def delete_model(self, model_id: str) -> bool:
         """Delete a model from the repository"""
@@ -125,11 +298,14 @@ class ModelRepository:
         try:
             # Delete file
             model_path = self.metadata[model_id]['stored_path']
-            if os.path.exists(model_path):
-                os.remove(model_path)
+            try:
+                os.unlink(model_path)
+            except FileNotFoundError:
+                pass
             
             # Remove from metadata
-            del self.metadata[model_id]
+            self._count_model(self.metadata.pop(model_id), -1)
+            self.listing_rev += 1
             self._save_metadata()
             
             return True
@@ -139,19 +315,14 @@ class ModelRepository:
     
     def get_storage_stats(self) -> Dict[str, Any]:
         """Get storage statistics"""
-        total_models = len(self.metadata)
-        total_size = sum(model['file_size'] for model in self.metadata.values())
-        
-        # Group by engine type
-        engine_counts = {}
-        for model in self.metadata.values():
-            engine_type = model['engine_type']
-            engine_counts[engine_type] = engine_counts.get(engine_type, 0) + 1
-        
+        return self._get_listing()[1]
+    
+    def _build_storage_stats(self) -> Dict[str, Any]:
+        """Build storage statistics from the running totals"""
         return {
-            'total_models': total_models,
-            'total_size_bytes': total_size,
-            'total_size_mb': round(total_size / (1024 * 1024), 2),
-            'engine_counts': engine_counts,
+            'total_models': len(self.metadata),
+            'total_size_bytes': self._bytes_total,
+            'total_size_mb': round(self._bytes_total / (1024 * 1024), 2),
+            'engine_counts': dict(self._engine_counts),
             'repository_path': self.repo_path
         }
@@ -4,8 +4,8 @@ import os
 import threading
 import uuid
 import time
-import json
 import cv2
+import numpy as np
 from typing import Dict, Any, Optional
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -18,6 +18,38 @@ from ResultPublisher import ResultPublisher
 from ResultPublisher.result_destinations import MQTTDestination
 
 
+def _publisher_state(destination) -> Dict[str, Any]:
+    """Describe a destination's runtime state using only JSON-safe types
+    
+    Every attribute read here is defined by BaseResultDestination, so they are
+    read directly; the values are coerced because settings restored from disk
+    or set through the API may carry strings where numbers are expected.
+    """
+    failure_count = destination.failure_count
+    if not isinstance(failure_count, int):
+        failure_count = int(failure_count) if str(failure_count).isdigit() else 0
+    
+    max_frames = destination.max_frames
+    if max_frames is not None:
+        try:
+            max_frames = int(max_frames)
+        except (ValueError, TypeError):
+            max_frames = None
+    
+    last_error = destination.last_error
+    return {
+        'enabled': bool(destination.enabled),
+        'type': str(destination.type),
+        'configured': bool(destination.is_configured),
+        'failure_count': failure_count,
+        'auto_disabled': bool(destination.auto_disabled),
+        'is_paused': bool(destination.is_paused),
+        'frame_count': int(destination.frame_count),
+        'max_frames': max_frames,
+        'last_error': str(last_error) if last_error is not None else None
+    }
+
+
 class InferencePipeline:
     def __init__(self) -> None:
         self.id = str(uuid.uuid4())
@@ -30,6 +62,9 @@ class InferencePipeline:
         self._inference_enabled = True  # Flag to enable/disable inference processing
 
         self._frame_lock = threading.Lock()  # Thread-safe access to latest frame
+        self._frame_ready = threading.Condition(self._frame_lock)  # Notified when a new frame is stored
+        self._frame_seq = 0  # Incremented for every stored frame
+        self.first_frame_ready = threading.Event()  # Set once the first frame has been stored
 
         self._frame_counter = 0  # Count processed frames
         self._inference_counter = 0  # Count inferences performed
@@ -256,94 +291,20 @@ class InferencePipeline:
 
     def get_publisher_states(self) -> Dict[str, Any]:
         """Get the current state of all publishers"""
-        try:
-            if not self.result_publisher:
-                return {}
-            
-            states = {}
-            
-            for i, destination in enumerate(self.result_publisher.destinations):
-                try:
-                    if hasattr(destination, '_id'):
-                        dest_id = str(destination._id)  # Ensure ID is string
-                        
-                        # Get attributes with type safety for JSON serialization
-                        enabled = bool(getattr(destination, 'enabled', True))
-                        dest_type = str(getattr(destination, 'type', 'unknown'))
-                        is_configured = bool(getattr(destination, 'is_configured', False))
-                        
-                        # Ensure failure_count is always an integer
-                        failure_count = getattr(destination, 'failure_count', 0)
-                        
-                        if not isinstance(failure_count, int):
-                            try:
-                                failure_count = int(failure_count) if str(failure_count).isdigit() else 0
-                            except (ValueError, TypeError):
-                                failure_count = 0
-                        
-                        # Get auto_disabled safely as boolean
-                        try:
-                            auto_disabled = bool(getattr(destination, 'auto_disabled', False))
-                        except Exception:
-                            auto_disabled = False
-                        
-                        # Get paused state (frame limit reached)
-                        try:
-                            is_paused = bool(getattr(destination, 'is_paused', False))
-                        except Exception:
-                            is_paused = False
-                        
-                        # Get frame count information
-                        frame_count = int(getattr(destination, 'frame_count', 0))
-                        max_frames = getattr(destination, 'max_frames', None)
-                        if max_frames is not None:
-                            try:
-                                max_frames = int(max_frames)
-                            except (ValueError, TypeError):
-                                max_frames = None
-                        
-                        # Get last_error as string or None
-                        last_error = getattr(destination, 'last_error', None)
-                        if last_error is not None:
-                            last_error = str(last_error)
-                        
-                        # Create the state dictionary with JSON-safe types
-                        state_dict = {
-                            'enabled': enabled,
-                            'type': dest_type,
-                            'configured': is_configured,
-                            'failure_count': failure_count,
-                            'auto_disabled': auto_disabled,
-                            'is_paused': is_paused,
-                            'frame_count': frame_count,
-                            'max_frames': max_frames,
-                            'last_error': last_error
-                        }
-                        
-                        # Test JSON serialization of this state to catch issues early
-                        try:
-                            import json
-                            json.dumps(state_dict)
-                            states[dest_id] = state_dict
-                        except Exception:
-                            # Skip this destination to prevent the entire API from failing
-                            pass
-                            
-                except Exception:
-                    # Skip problematic destinations
-                    pass
-            
-            # Test JSON serialization of the entire states dictionary
+        if not self.result_publisher:
+            return {}
+        
+        states = {}
+        for destination in self.result_publisher.destinations:
+            dest_id = getattr(destination, '_id', None)
+            if dest_id is None:
+                continue
             try:
-                import json
-                json.dumps(states)
+                states[str(dest_id)] = _publisher_state(destination)
             except Exception:
-                return {}  # Return empty dict if serialization fails
-            
-            return states
-            
-        except Exception:
-            return {}
+                # Skip problematic destinations rather than failing the whole status call
+                pass
+        return states
 
 
     def enable_inference(self):
@@ -571,7 +532,7 @@ class InferencePipeline:
                         # Draw results on frame and store for streaming or publishing
                         with self._frame_lock:
                             output = self.inference_engine.draw(frame, results)
-                            self._latest_frame = output.copy()
+                            self._store_latest_frame(output)
                         
                             # Capture thumbnail on first successful inference (with drawn results)
                             if not self._thumbnail_captured and self._thumbnail_path:
@@ -579,7 +540,7 @@ class InferencePipeline:
                     else:
                         # Store raw frame without drawing (for quick preview when streaming starts)
                         with self._frame_lock:
-                            self._latest_frame = frame.copy()
+                            self._store_latest_frame(frame)
                             
                             # Capture thumbnail on first successful frame if needed
                             if not self._thumbnail_captured and self._thumbnail_path:
@@ -587,7 +548,7 @@ class InferencePipeline:
                 else:
                     # If no results, store the original frame for streaming
                     with self._frame_lock:
-                        self._latest_frame = frame.copy()
+                        self._store_latest_frame(frame)
                         
                         # Capture thumbnail on first successful frame (original frame if no inference)
                         if not self._thumbnail_captured and self._thumbnail_path:
@@ -669,6 +630,10 @@ class InferencePipeline:
         self._stop_requested = True  # Signal the run loop to stop
         self._is_streaming = False  # Reset streaming flag when pipeline stops
         
+        # Wake stream clients blocked in wait_for_frame so they notice the stop
+        with self._frame_ready:
+            self._frame_ready.notify_all()
+        
         # Update thumbnail with the last received frame before stopping
         if self._latest_frame is not None and self._thumbnail_path:
             try:
@@ -697,6 +662,31 @@ class InferencePipeline:
         
         print(f"Pipeline {self.id} stopped")
 
+    def _store_latest_frame(self, frame):
+        """Store a copy of frame for streaming and wake waiting clients (hold _frame_lock)"""
+        self._latest_frame = frame.copy()
+        self._frame_seq += 1
+        self._frame_ready.notify_all()
+        if not self.first_frame_ready.is_set():
+            self.first_frame_ready.set()
+
+    def wait_for_frame(self, last_seq: int, timeout: float, out=None):
+        """Wait for a frame newer than last_seq
+        
+        Returns (seq, frame); frame is None if no new frame arrived within timeout.
+        When out is an array of the frame's shape and dtype the frame is copied
+        into it rather than into a newly allocated array.
+        """
+        with self._frame_ready:
+            self._frame_ready.wait_for(lambda: self._frame_seq != last_seq or self._stop_requested, timeout)
+            frame = self._latest_frame
+            if self._frame_seq == last_seq or frame is None:
+                return last_seq, None
+            if out is not None and out.shape == frame.shape and out.dtype == frame.dtype:
+                np.copyto(out, frame)
+                return self._frame_seq, out
+            return self._frame_seq, frame.copy()
+
     def get_latest_frame(self):
         """Get the latest processed frame for streaming"""
         with self._frame_lock:
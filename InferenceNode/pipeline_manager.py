@@ -4,16 +4,16 @@ import sys
 import os
 import threading
 import uuid
-import json
 import time
 import logging
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Set
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from ResultPublisher import ResultPublisher
 from .pipeline import InferencePipeline
+from .settings_manager import read_settings_file, write_settings_file
 
 class PipelineManager:
     """Manages inference pipelines and their execution"""
@@ -35,6 +35,9 @@ class PipelineManager:
         self.active_pipelines = {}  # Dict[str, Dict] - pipeline_info
         self.pipeline_threads = {}  # Dict[str, threading.Thread]
         
+        # Bumped on every metadata or run-state change; API routes build ETags from it
+        self.metadata_rev = 0
+        
         # Store node info for context variables in destinations
         self.node_id = node_id
         self.node_name = node_name
@@ -46,7 +49,9 @@ class PipelineManager:
         os.makedirs(self.pipelines_base_dir, exist_ok=True)
         os.makedirs(self.thumbnails_dir, exist_ok=True)
         
-        # Load existing metadata
+        # Load existing metadata; set when the file exists but can't be read,
+        # so the empty stand-in never overwrites it
+        self._metadata_unreadable = False
         self.metadata = self._load_metadata()
         # Reset all pipeline statuses to 'stopped' on startup
         # (pipelines don't support auto-run on system start yet)
@@ -115,19 +120,24 @@ class PipelineManager:
         
     def _load_metadata(self) -> Dict[str, Any]:
         """Load pipeline metadata from file"""
-        if os.path.exists(self.metadata_file):
-            try:
-                with open(self.metadata_file, 'r') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"Warning: Could not load pipeline metadata: {e}")
+        try:
+            return read_settings_file(self.metadata_file)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Warning: Could not load pipeline metadata: {e}")
+            print(f"Warning: {self.metadata_file} will not be overwritten until it can be read")
+            self._metadata_unreadable = True
         return {}
     
     def _save_metadata(self):
         """Save pipeline metadata to file"""
+        self.metadata_rev += 1
+        if self._metadata_unreadable:
+            self.logger.warning(f"Not saving pipeline metadata over unreadable {self.metadata_file}")
+            return
         try:
-            with open(self.metadata_file, 'w') as f:
-                json.dump(self.metadata, f, indent=2)
+            write_settings_file(self.metadata_file, self.metadata)
         except Exception as e:
             print(f"Error saving pipeline metadata: {e}")
     
@@ -196,6 +206,10 @@ class PipelineManager:
         """Get pipeline configuration"""
         return self.metadata.get(pipeline_id)
     
+    def get_pipeline_names(self) -> Set[str]:
+        """Get the names of all pipelines without collecting their metrics"""
+        return {pipeline['name'] for pipeline in self.metadata.values()}
+    
     def list_pipelines(self) -> Dict[str, Any]:
         """List all pipelines with current metrics"""
         pipelines_with_metrics = {}
@@ -423,6 +437,7 @@ class PipelineManager:
             
             # Mark as starting
             self.metadata[pipeline_id]['status'] = 'starting'
+            self.metadata_rev += 1
             self.active_pipelines[pipeline_id] = {
                 'config': pipeline_config,
                 'start_time': time.time(),
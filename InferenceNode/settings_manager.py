@@ -5,65 +5,266 @@ Handles loading and saving node configuration
 import os
 import json
 import logging
+import threading
+import time
+import atexit
+from concurrent.futures import ThreadPoolExecutor
+
+# orjson is optional; it parses and encodes settings in C, straight from bytes
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    orjson = None
+    HAS_ORJSON = False
+
+# zstandard is optional; large settings files are written compressed with it
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    zstandard = None
+    HAS_ZSTD = False
 
 
 logger = logging.getLogger(__name__)
 
+# Seconds without further changes before requested settings are written
+SAVE_DEBOUNCE_DELAY = 0.2
+
+# Longest a requested save is postponed while changes keep arriving
+SAVE_MAX_DELAY = 2.0
+
+# Saved publishers configured at once while settings load
+PUBLISHER_RESTORE_WORKERS = 8
+
+# Settings files are written compact; set INFERNODE_SETTINGS_PRETTY=1 to
+# indent them for reading by hand
+SETTINGS_PRETTY = os.environ.get('INFERNODE_SETTINGS_PRETTY') == '1'
+
+# Compact settings larger than this many bytes are zstd-compressed when the
+# caller asks for it and zstandard is installed; smaller files stay plain JSON
+SETTINGS_COMPRESS_THRESHOLD = 4096
+
+# Layout version written to node settings files; load_settings refuses
+# files from newer versions instead of guessing at their contents
+SETTINGS_SCHEMA_VERSION = 2
+
+_ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+
+# path -> ((mtime_ns, size), bytes) for the settings file contents last read or
+# written, so unchanged files are neither re-read nor rewritten
+_file_cache = {}
+_file_cache_lock = threading.Lock()
+
+# path -> lock serializing writes to that file; metadata files are saved from
+# request, pipeline and job threads at once, and every write of a path goes
+# through the same temporary file
+_write_locks = {}
+
+
+def _write_lock(path: str) -> threading.Lock:
+    with _file_cache_lock:
+        lock = _write_locks.get(path)
+        if lock is None:
+            lock = _write_locks[path] = threading.Lock()
+        return lock
+
+
+def _stat_key(st: os.stat_result) -> tuple:
+    return st.st_mtime_ns, st.st_size
+
+
+# Flushes file data (and the size needed to read it back) without the rest of
+# the inode metadata such as timestamps; platforms without it fall back to fsync
+_fdatasync = getattr(os, 'fdatasync', os.fsync)
+
+
+def _fsync_directory(directory: str):
+    """Sync a directory so a rename inside it survives power loss (POSIX only)"""
+    if os.name != 'posix':
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    except OSError:
+        # Some filesystems do not support syncing directories
+        pass
+    finally:
+        os.close(fd)
+
+
+def read_settings_file(path: str) -> dict:
+    """Read and parse a settings file in a single binary read
+    
+    The raw bytes are remembered with the file's mtime and size, so reading
+    an unchanged file again skips the disk read. Each call still parses a new
+    dict, because callers keep and mutate parts of the result.
+    """
+    with _file_cache_lock:
+        cached = _file_cache.get(path)
+    if cached is not None and cached[0] == _stat_key(os.stat(path)):
+        data = cached[1]
+    else:
+        with open(path, 'rb') as f:
+            key = _stat_key(os.fstat(f.fileno()))
+            data = f.read()
+        with _file_cache_lock:
+            _file_cache[path] = (key, data)
+    if data[:4] == _ZSTD_MAGIC:
+        if not HAS_ZSTD:
+            raise ValueError(f"{path} is zstd-compressed but zstandard is not installed")
+        data = zstandard.ZstdDecompressor().decompress(data)
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def write_settings_file(path: str, settings: dict, pretty: bool = None, compress: bool = False):
+    """Write settings as JSON, atomically replacing the old file
+    
+    Output is compact unless pretty is set (default: SETTINGS_PRETTY), in
+    which case it is indented by two spaces. With compress, compact output
+    larger than SETTINGS_COMPRESS_THRESHOLD is zstd-compressed if zstandard is
+    installed; read_settings_file recognizes either form. The data goes to a temporary file
+    in the same directory and is synced to disk before being renamed over
+    path, so a crash mid-write leaves the previous settings intact instead of
+    a truncated file. Writes to the same path from different threads take
+    turns. Nothing is written when the file on disk already holds exactly
+    these settings.
+    """
+    if pretty is None:
+        pretty = SETTINGS_PRETTY
+    if HAS_ORJSON:
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        data = orjson.dumps(settings, option=option)
+    elif pretty:
+        data = json.dumps(settings, indent=2).encode('utf-8')
+    else:
+        data = json.dumps(settings, separators=(',', ':')).encode('utf-8')
+    if compress and HAS_ZSTD and not pretty and len(data) > SETTINGS_COMPRESS_THRESHOLD:
+        data = zstandard.ZstdCompressor(level=3).compress(data)
+    
+    with _write_lock(path):
+        with _file_cache_lock:
+            cached = _file_cache.get(path)
+        if cached is not None and cached[1] == data:
+            try:
+                if cached[0] == _stat_key(os.stat(path)):
+                    return
+            except FileNotFoundError:
+                pass
+        
+        tmp_path = path + '.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+                f.flush()
+                _fdatasync(f.fileno())
+            os.replace(tmp_path, path)
+            _fsync_directory(os.path.dirname(os.path.abspath(path)))
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        
+        with _file_cache_lock:
+            _file_cache[path] = (_stat_key(os.stat(path)), data)
+
 
 def load_settings(node):
     """Load saved settings from file"""
     try:
-        if os.path.exists(node.settings_file):
-            with open(node.settings_file, 'r') as f:
-                settings = json.load(f)
-                
-                # Restore node name if saved
-                if 'node_name' in settings:
-                    node.node_name = settings['node_name']
-                    node.node_info['node_name'] = node.node_name
-                
-                # Restore favorite configurations
-                if 'favorite_configs' in settings:
-                    node.favorite_configs = settings['favorite_configs']
-                    logger.info(f"Loaded {len(node.favorite_configs)} favorite configurations")
-                
-                # Restore result publishers
-                if 'result_publishers' in settings:
-                    _deserialize_publishers(settings['result_publishers'], node)
-                
-                # Restore telemetry settings
-                if 'telemetry' in settings and node.telemetry:
-                    telemetry_settings = settings['telemetry']
-                    
-                    # Configure MQTT if settings exist
-                    if 'mqtt_server' in telemetry_settings:
-                        try:
-                            node.telemetry.configure_mqtt(
-                                mqtt_server=telemetry_settings['mqtt_server'],
-                                mqtt_port=telemetry_settings.get('mqtt_port', 1883),
-                                mqtt_topic=telemetry_settings.get('mqtt_topic', 'infernode/telemetry')
-                            )
-                        except Exception as e:
-                            logger.warning(f"Failed to restore telemetry MQTT config: {e}")
-                    
-                    # Set publish interval
-                    if 'publish_interval' in telemetry_settings:
-                        node.telemetry.update_interval = telemetry_settings['publish_interval']
-                    
-                    # Start telemetry if it was enabled
-                    if telemetry_settings.get('enabled', False):
-                        node.telemetry.start_telemetry()
-                
-                logger.info(f"Settings loaded from {node.settings_file}")
-                
-    except Exception as e:
-        logger.warning(f"Failed to load settings: {e}")
+        settings = read_settings_file(node.settings_file)
+    except FileNotFoundError:
+        # First boot; nothing has been saved yet
+        return
+    except (OSError, ValueError) as e:
+        # Unreadable, empty or malformed file (JSON decode errors are ValueErrors)
+        logger.warning(f"Failed to read settings from {node.settings_file}: {e}")
+        return
+    
+    if not isinstance(settings, dict):
+        logger.warning(f"Ignoring settings in {node.settings_file}: expected a JSON object")
+        return
+    
+    # Files saved before versioning have no schema_version
+    version = settings.get('schema_version', 1)
+    loader = _LOADERS.get(version)
+    if loader is None:
+        logger.warning(f"Ignoring settings in {node.settings_file}: unsupported schema version {version!r} "
+                       f"(this version of the node reads up to {SETTINGS_SCHEMA_VERSION})")
+        return
+    
+    try:
+        loader(settings, node)
+        logger.info(f"Settings loaded from {node.settings_file}")
+        
+    except Exception:
+        # The file parsed, so this is a bug in restoring it; keep the traceback
+        logger.exception("Failed to apply saved settings")
+
+
+def _apply_settings(settings, node):
+    """Apply settings in the current schema (versions 1 and 2 share a layout)"""
+    # Restore node name if saved
+    node_name = settings.get('node_name')
+    if node_name is not None:
+        node.node_name = node_name
+        node.node_info['node_name'] = node_name
+        node.publish_node_info()
+    
+    # Restore favorite configurations
+    favorite_configs = settings.get('favorite_configs')
+    if favorite_configs is not None:
+        node.set_favorite_configs(favorite_configs)
+        logger.info(f"Loaded {len(node.favorite_configs)} favorite configurations")
+    
+    # Restore result publishers
+    publishers_data = settings.get('result_publishers')
+    if publishers_data:
+        _deserialize_publishers(publishers_data, node)
+    
+    # Restore telemetry settings
+    telemetry_settings = settings.get('telemetry')
+    if telemetry_settings and node.telemetry:
+        # Configure MQTT if settings exist
+        if 'mqtt_server' in telemetry_settings:
+            try:
+                node.telemetry.configure_mqtt(
+                    mqtt_server=telemetry_settings['mqtt_server'],
+                    mqtt_port=telemetry_settings.get('mqtt_port', 1883),
+                    mqtt_topic=telemetry_settings.get('mqtt_topic', 'infernode/telemetry')
+                )
+            except Exception as e:
+                logger.warning(f"Failed to restore telemetry MQTT config: {e}")
+        
+        # Set publish interval
+        if 'publish_interval' in telemetry_settings:
+            node.telemetry.update_interval = telemetry_settings['publish_interval']
+        
+        # Start telemetry if it was enabled
+        if telemetry_settings.get('enabled', False):
+            node.telemetry.start_telemetry()
+
+
+# Settings loaders by the schema_version they read
+_LOADERS = {
+    1: _apply_settings,
+    2: _apply_settings,
+}
 
 
 def save_settings(node):
     """Save current settings to file"""
     try:
         settings = {
+            'schema_version': SETTINGS_SCHEMA_VERSION,
             'node_name': node.node_name,
             'favorite_configs': node.favorite_configs,
             'result_publishers': _serialize_publishers(node.result_publisher),
@@ -71,16 +272,9 @@ def save_settings(node):
         
         # Save telemetry settings if available
         if node.telemetry:
-            settings['telemetry'] = {
-                'enabled': getattr(node.telemetry, 'running', False),
-                'publish_interval': getattr(node.telemetry, 'update_interval', 30),
-                'mqtt_server': getattr(node.telemetry, 'mqtt_server', ''),
-                'mqtt_port': getattr(node.telemetry, 'mqtt_port', 1883),
-                'mqtt_topic': getattr(node.telemetry, 'mqtt_topic', 'infernode/telemetry')
-            }
+            settings['telemetry'] = node.telemetry.snapshot_settings()
         
-        with open(node.settings_file, 'w') as f:
-            json.dump(settings, f, indent=2)
+        write_settings_file(node.settings_file, settings, compress=True)
             
         logger.debug(f"Settings saved to {node.settings_file}")
         
@@ -88,92 +282,163 @@ def save_settings(node):
         logger.error(f"Failed to save settings: {e}")
 
 
+class _SettingsWriter:
+    """Daemon thread that coalesces save requests into one settings write per burst"""
+    
+    def __init__(self, node):
+        self.node = node
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._first_request = None  # monotonic time of the oldest unsaved change
+        self._last_request = None
+        self._thread = threading.Thread(target=self._run, name='settings-writer', daemon=True)
+        self._thread.start()
+    
+    def request(self):
+        """Mark settings dirty; they are written once changes pause"""
+        with self._cond:
+            now = time.monotonic()
+            if self._first_request is None:
+                self._first_request = now
+            self._last_request = now
+            self._cond.notify()
+    
+    def _take_pending(self) -> bool:
+        pending = self._first_request is not None
+        self._first_request = None
+        self._last_request = None
+        return pending
+    
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._first_request is None:
+                    self._cond.wait()
+                while True:
+                    now = time.monotonic()
+                    quiet_at = self._last_request + SAVE_DEBOUNCE_DELAY
+                    deadline = self._first_request + SAVE_MAX_DELAY
+                    if now >= quiet_at or now >= deadline:
+                        break
+                    self._cond.wait(min(quiet_at, deadline) - now)
+                self._take_pending()
+            self._write()
+    
+    def _write(self):
+        with self._write_lock:
+            save_settings(self.node)
+    
+    def flush(self):
+        """Write any pending changes now"""
+        with self._cond:
+            pending = self._take_pending()
+        if pending:
+            self._write()
+
+
+_writers_lock = threading.Lock()
+
+
+def request_save(node):
+    """Schedule a settings save, batching changes made in quick succession"""
+    writer = getattr(node, '_settings_writer', None)
+    if writer is None:
+        with _writers_lock:
+            writer = getattr(node, '_settings_writer', None)
+            if writer is None:
+                writer = _SettingsWriter(node)
+                node._settings_writer = writer
+                atexit.register(writer.flush)
+    writer.request()
+
+
+def flush_settings(node):
+    """Write settings changes still waiting in the batch, if any"""
+    writer = getattr(node, '_settings_writer', None)
+    if writer is not None:
+        writer.flush()
+
+
 def _serialize_publishers(result_publisher):
     """Serialize result publishers to JSON-compatible format"""
     serialized = []
     
     for dest in result_publisher.destinations:
-        dest_data = {
+        serialized.append({
             'id': getattr(dest, '_id', None),
-            'type': dest.__class__.__name__.replace('Destination', '').lower(),
+            'type': dest.type_name,
             'rate_limit': dest.rate_limit,
-            'config': {}
-        }
+            'config': dest.to_dict()
+        })
+    
+    return serialized
+
+
+def _restore_destination(destination_class, pub_data, node):
+    """Create and configure one saved destination, or return None if it fails"""
+    dest_type = pub_data['type']
+    config = pub_data.get('config') or {}
+    rate_limit = pub_data.get('rate_limit')
+    dest_id = pub_data.get('id')
+    
+    try:
+        # Create destination
+        destination = destination_class()
         
-        # Extract configuration based on destination type
-        # MQTT
-        if hasattr(dest, 'server'):
-            dest_data['config']['server'] = dest.server
-            dest_data['config']['port'] = dest.port
-            dest_data['config']['topic'] = dest.topic
-            if hasattr(dest, 'username') and dest.username:
-                dest_data['config']['username'] = dest.username
-            if hasattr(dest, 'password') and dest.password:
-                dest_data['config']['password'] = dest.password
-            if hasattr(dest, 'include_image_data'):
-                dest_data['config']['include_image_data'] = dest.include_image_data
+        # Set ID if available
+        if dest_id:
+            destination._id = dest_id
         
-        # Webhook
-        elif hasattr(dest, 'url'):
-            dest_data['config']['url'] = dest.url
-            if hasattr(dest, 'timeout'):
-                dest_data['config']['timeout'] = dest.timeout
-            if hasattr(dest, 'include_image_data'):
-                dest_data['config']['include_image_data'] = dest.include_image_data
+        # Set context variables
+        destination.set_context_variables(
+            node_id=node.node_id,
+            node_name=node.node_name
+        )
         
-        # Serial
-        elif hasattr(dest, 'com_port'):
-            dest_data['config']['com_port'] = dest.com_port
-            dest_data['config']['baud'] = dest.baud
-            if hasattr(dest, 'include_image_data'):
-                dest_data['config']['include_image_data'] = dest.include_image_data
+        # Configure destination
+        destination.configure(**config)
         
-        # Folder
-        elif hasattr(dest, 'folder_path'):
-            dest_data['config']['folder_path'] = dest.folder_path
-            if hasattr(dest, 'format'):
-                dest_data['config']['format'] = dest.format
+        # Set rate limit
+        if rate_limit is not None:
+            destination.set_rate_limit(rate_limit)
         
-        # Add other destination types as needed
+        return destination
         
-        serialized.append(dest_data)
-    
-    return serialized
+    except Exception as e:
+        # configure() fails for ordinary reasons, e.g. a broker that is down
+        logger.warning(f"Failed to restore publisher {dest_type}: {e}")
+        return None
 
 
 def _deserialize_publishers(publishers_data, node):
-    """Deserialize and restore result publishers"""
-    from ResultPublisher import ResultDestination
+    """Deserialize and restore result publishers
     
-    for pub_data in publishers_data:
-        try:
-            dest_type = pub_data['type']
-            config = pub_data.get('config', {})
-            rate_limit = pub_data.get('rate_limit')
-            dest_id = pub_data.get('id')
-            
-            # Create destination
-            destination = ResultDestination(dest_type)
-            
-            # Set ID if available
-            if dest_id:
-                destination._id = dest_id
-            
-            # Set context variables
-            destination.set_context_variables(
-                node_id=node.node_id,
-                node_name=node.node_name
-            )
-            
-            # Configure destination
-            destination.configure(**config)
-            
-            # Set rate limit
-            if rate_limit is not None:
-                destination.set_rate_limit(rate_limit)
-            
-            # Add to publisher
+    configure() may connect to a broker or open a port, so destinations are
+    set up side by side and then added in their saved order.
+    """
+    # Imported here rather than at module level so that importing this module
+    # doesn't load every destination plugin; once per restore, not per publisher
+    from ResultPublisher import DESTINATION_CLASSES
+    
+    # Resolve each entry's class up front, dropping malformed entries rather
+    # than letting them fail mid-restore
+    restores = []
+    for pub_data in publishers_data or []:
+        destination_class = None
+        if isinstance(pub_data, dict):
+            destination_class = DESTINATION_CLASSES.get(pub_data.get('type'))
+        if destination_class is None:
+            logger.warning(f"Skipping saved publisher with unknown type: {pub_data!r:.200}")
+            continue
+        restores.append((destination_class, pub_data))
+    
+    if not restores:
+        return
+    
+    workers = min(PUBLISHER_RESTORE_WORKERS, len(restores))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='publisher-restore') as executor:
+        destinations = list(executor.map(lambda args: _restore_destination(*args, node), restores))
+    
+    for destination in destinations:
+        if destination is not None:
             node.result_publisher.add(destination)
-            
-        except Exception as e:
-            logger.warning(f"Failed to restore publisher {pub_data.get('type', 'unknown')}: {e}")
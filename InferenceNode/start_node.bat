@@ -54,12 +54,12 @@ goto end
 
 :no_discovery
 echo Starting with discovery disabled...
-%PYTHON_EXE% inference_node.py --port 5555 --discovery false
+%PYTHON_EXE% inference_node.py --port 5555 --no-discovery
 goto end
 
 :with_telemetry
 echo Starting with telemetry enabled...
-%PYTHON_EXE% inference_node.py --port 5555 --telemetry true
+%PYTHON_EXE% inference_node.py --port 5555 --telemetry
 goto end
 
 :custom
@@ -72,11 +72,16 @@ if "%port%"=="" set port=5555
 if "%discovery%"=="" set discovery=true
 if "%telemetry%"=="" set telemetry=false
 
+set discovery_flag=--discovery
+if /i "%discovery%"=="false" set discovery_flag=--no-discovery
+set telemetry_flag=--telemetry
+if /i "%telemetry%"=="false" set telemetry_flag=--no-telemetry
+
 echo Starting with custom configuration...
 if "%name%"=="" (
-    %PYTHON_EXE% inference_node.py --port %port% --discovery %discovery% --telemetry %telemetry%
+    %PYTHON_EXE% inference_node.py --port %port% %discovery_flag% %telemetry_flag%
 ) else (
-    %PYTHON_EXE% inference_node.py --port %port% --node-name "%name%" --discovery %discovery% --telemetry %telemetry%
+    %PYTHON_EXE% inference_node.py --port %port% --node-name "%name%" %discovery_flag% %telemetry_flag%
 )
 goto end
 
@@ -5,9 +5,13 @@ import psutil
 import platform
 import threading
 import logging
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Dict, Any, Optional
 from datetime import datetime
 
+from .utils import platform_info
+
+
 class NodeTelemetry:
     """Handles node telemetry collection and publishing"""
     
@@ -20,35 +24,113 @@ class NodeTelemetry:
         self.mqtt_topic = None
         self.mqtt_server = None
         self.mqtt_port = 1883
+        self.mqtt_status = 'disconnected'  # disconnected, connecting, connected or error
+        self.mqtt_error = None
+        self._mqtt_generation = 0  # bumped by every MQTT reconfiguration
+        self._mqtt_executor = None
+        self._mqtt_lock = threading.Lock()
         self.update_interval = 5.0  # seconds
         
+    def snapshot_settings(self) -> Dict[str, Any]:
+        """Get the persisted telemetry settings
+        
+        The MQTT target is read under the same lock that reconfiguration holds,
+        so server, port and topic always belong to the same configuration.
+        """
+        with self._mqtt_lock:
+            return {
+                'enabled': self.running,
+                'publish_interval': self.update_interval,
+                'mqtt_server': self.mqtt_server,
+                'mqtt_port': self.mqtt_port,
+                'mqtt_topic': self.mqtt_topic
+            }
+    
     def configure_mqtt(self, mqtt_server: str, mqtt_topic: str, 
                       mqtt_port: int = 1883, mqtt_username: Optional[str] = None,
                       mqtt_password: Optional[str] = None):
         """Configure MQTT for telemetry publishing"""
-        try:
-            import paho.mqtt.client as mqtt
-            
-            # Store configuration
+        generation = self._set_mqtt_target(mqtt_server, mqtt_topic, mqtt_port)
+        self._connect_mqtt(generation, mqtt_username, mqtt_password)
+    
+    def configure_mqtt_async(self, mqtt_server: str, mqtt_topic: str,
+                             mqtt_port: int = 1883, mqtt_username: Optional[str] = None,
+                             mqtt_password: Optional[str] = None) -> Future:
+        """Configure MQTT for telemetry publishing, connecting to the broker in the background
+        
+        The new server, port and topic are stored before this returns; the
+        connection itself runs on a single worker thread, so requests are
+        applied in order and one superseded before it starts is skipped.
+        Progress is reported through mqtt_status and mqtt_error.
+        """
+        generation = self._set_mqtt_target(mqtt_server, mqtt_topic, mqtt_port)
+        with self._mqtt_lock:
+            if self._mqtt_executor is None:
+                self._mqtt_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='telemetry-mqtt')
+            executor = self._mqtt_executor
+        return executor.submit(self._connect_mqtt, generation, mqtt_username, mqtt_password)
+    
+    def _set_mqtt_target(self, mqtt_server: str, mqtt_topic: str, mqtt_port: int) -> int:
+        """Store the broker to publish to and return the configuration generation"""
+        with self._mqtt_lock:
             self.mqtt_server = mqtt_server
             self.mqtt_port = mqtt_port
             self.mqtt_topic = mqtt_topic
+            self.mqtt_status = 'connecting'
+            self.mqtt_error = None
+            self._mqtt_generation += 1
+            return self._mqtt_generation
+    
+    def _connect_mqtt(self, generation: int, mqtt_username: Optional[str] = None,
+                      mqtt_password: Optional[str] = None):
+        """Connect to the stored broker, replacing any previous client"""
+        with self._mqtt_lock:
+            if generation != self._mqtt_generation:
+                return
+            mqtt_server, mqtt_port, mqtt_topic = self.mqtt_server, self.mqtt_port, self.mqtt_topic
+        
+        try:
+            import paho.mqtt.client as mqtt
             
-            self.mqtt_client = mqtt.Client()
+            client = mqtt.Client()
             
             if mqtt_username and mqtt_password:
-                self.mqtt_client.username_pw_set(mqtt_username, mqtt_password)
+                client.username_pw_set(mqtt_username, mqtt_password)
             
-            self.mqtt_client.connect(mqtt_server, mqtt_port, 60)
-            self.mqtt_client.loop_start()
+            client.connect(mqtt_server, mqtt_port, 60)
+            client.loop_start()
+            
+            with self._mqtt_lock:
+                previous, self.mqtt_client = self.mqtt_client, client
+                if generation == self._mqtt_generation:
+                    self.mqtt_status = 'connected'
+            self._close_mqtt_client(previous)
             
             self.logger.info(f"MQTT telemetry configured: {mqtt_server}:{mqtt_port}/{mqtt_topic}")
             
         except ImportError:
+            self._set_mqtt_error(generation, "paho-mqtt package not installed")
             self.logger.error("paho-mqtt package not installed for telemetry")
         except Exception as e:
+            self._set_mqtt_error(generation, str(e))
             self.logger.error(f"MQTT telemetry configuration failed: {str(e)}")
     
+    def _set_mqtt_error(self, generation: int, error: str):
+        with self._mqtt_lock:
+            if generation == self._mqtt_generation:
+                self.mqtt_status = 'error'
+                self.mqtt_error = error
+    
+    @staticmethod
+    def _close_mqtt_client(client):
+        if client is None:
+            return
+        try:
+            client.loop_stop()
+            client.disconnect()
+        except Exception:
+            pass
+    
     def get_system_info(self) -> Dict[str, Any]:
         """Collect system information"""
         try:
@@ -72,14 +154,15 @@ class NodeTelemetry:
             # GPU information (basic)
             gpu_info = self._get_gpu_info()
             
+            host = platform_info()
             return {
                 "node_id": self.node_id,
                 "timestamp": datetime.utcnow().isoformat(),
                 "system": {
-                    "platform": self._parse_windows_platform(platform.platform()),
-                    "platform_raw": platform.platform(),
-                    "processor": platform.processor(),
-                    "architecture": platform.architecture()[0]
+                    "platform": host['platform'],
+                    "platform_raw": host['platform_raw'],
+                    "processor": host['processor'],
+                    "architecture": host['architecture']
                 },
                 "cpu": {
                     "count": cpu_count,
@@ -234,77 +317,6 @@ class NodeTelemetry:
             self.logger.debug(f"Generic GPU detection failed: {str(e)}")
             return {"available": False, "message": "GPU detection failed"}
     
-    def _parse_windows_platform(self, platform_string: str) -> str:
-        """Parse Windows platform string to readable format"""
-        try:
-            # Windows version mapping
-            windows_versions = {
-                "6.1.7600": "Windows 7",
-                "6.1.7601": "Windows 7 with Service Pack 1",
-                "6.2.9200": "Windows 8",
-                "6.3.9200": "Windows 8.1",
-                "6.3.9600": "Windows 8.1 with Update 1",
-                "10.0.10240": "Windows 10 Version 1507",
-                "10.0.10586": "Windows 10 Version 1511 (November Update)",
-                "10.0.14393": "Windows 10 Version 1607 (Anniversary Update)",
-                "10.0.15063": "Windows 10 Version 1703 (Creators Update)",
-                "10.0.16299": "Windows 10 Version 1709 (Fall Creators Update)",
-                "10.0.17134": "Windows 10 Version 1803 (April 2018 Update)",
-                "10.0.17763": "Windows 10 Version 1809 (October 2018 Update)",
-                "10.0.18362": "Windows 10 Version 1903 (May 2019 Update)",
-                "10.0.18363": "Windows 10 Version 1909 (November 2019 Update)",
-                "10.0.19041": "Windows 10 Version 2004 (May 2020 Update)",
-                "10.0.19042": "Windows 10 Version 20H2 (October 2020 Update)",
-                "10.0.19043": "Windows 10 Version 21H1 (May 2021 Update)",
-                "10.0.19044": "Windows 10 Version 21H2 (November 2021 Update)",
-                "10.0.19045": "Windows 10 Version 22H2 (2022 Update)",
-                "10.0.20348": "Windows Server 2022 Version 21H2",
-                "10.0.22000": "Windows 11 Version 21H2 (original release)",
-                "10.0.22621": "Windows 11 Version 22H2 (2022 Update)",
-                "10.0.22631": "Windows 11 Version 23H2 (2023 Update)",
-                "10.0.26100": "Windows 11 Version 24H2 (2024 Update)"
-            }
-            
-            # Check if this is a Windows platform string
-            if not platform_string.startswith("Windows"):
-                return platform_string
-            
-            # Extract version number from platform string
-            # Format: Windows-10-10.0.26100-SP0
-            import re
-            version_match = re.search(r'(\d+\.\d+\.\d+)', platform_string)
-            
-            if version_match:
-                version = version_match.group(1)
-                readable_version = windows_versions.get(version)
-                
-                if readable_version:
-                    # Check if it's a server version based on platform string
-                    if "Server" in platform_string or any(server_indicator in platform_string.lower() 
-                                                         for server_indicator in ["datacenter", "standard", "enterprise"]):
-                        # Handle server versions
-                        if version == "6.1.7600" or version == "6.1.7601":
-                            return "Windows Server 2008 R2" + (" with Service Pack 1" if version == "6.1.7601" else "")
-                        elif version == "6.2.9200":
-                            return "Windows Server 2012"
-                        elif version == "6.3.9200" or version == "6.3.9600":
-                            return "Windows Server 2012 R2"
-                        elif version == "10.0.14393":
-                            return "Windows Server 2016"
-                        elif version == "10.0.17763":
-                            return "Windows Server 2019"
-                        elif version == "10.0.20348":
-                            return "Windows Server 2022 Version 21H2"
-                    
-                    return readable_version
-            
-            # If no match found, return original string
-            return platform_string
-            
-        except Exception as e:
-            self.logger.debug(f"Platform parsing failed: {str(e)}")
-            return platform_string
-    
     def _get_cpu_temperature(self):
         """Get CPU temperature in Celsius"""
         try:
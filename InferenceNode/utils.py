@@ -2,7 +2,77 @@
 Utility functions for InferenceNode
 """
 import re
+import socket
+import struct
+import time
 import logging
+import platform
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict
+
+
+# Environment variable a restarting node sets on its replacement: the seconds
+# the replacement waits for the old process to release the API port
+RESTART_WAIT_ENV = 'INFERNODE_RESTART_WAIT'
+
+
+# (whole second, isoformat string) for the most recent iso_now() call
+_iso_cache = (0, '')
+
+
+def iso_now() -> str:
+    """
+    Get the current local time as an ISO 8601 string, at one-second resolution.
+    
+    The formatted string is cached per second so hot API endpoints that stamp
+    every response avoid rebuilding it on each call.
+    """
+    global _iso_cache
+    second = int(time.time())
+    cached_second, cached_value = _iso_cache
+    if second != cached_second:
+        cached_value = datetime.fromtimestamp(second).isoformat()
+        _iso_cache = (second, cached_value)
+    return cached_value
+
+
+def detect_primary_ip() -> str:
+    """
+    Get the IP address of the interface used for outbound traffic.
+    
+    Connecting a UDP socket only selects a route; no packet is sent and no DNS
+    lookup is made, unlike socket.gethostbyname(socket.gethostname()).
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        sock.connect(('10.255.255.255', 1))
+        return sock.getsockname()[0]
+    except OSError:
+        return '127.0.0.1'
+    finally:
+        sock.close()
+
+
+def wait_for_port_free(port: int, timeout: float, interval: float = 0.25) -> bool:
+    """
+    Wait until a TCP port can be bound on all interfaces.
+    
+    Returns True once a test bind succeeds, or False if the port is still in
+    use after timeout seconds.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            sock.bind(('0.0.0.0', port))
+            return True
+        except OSError:
+            if time.monotonic() >= deadline:
+                return False
+        finally:
+            sock.close()
+        time.sleep(interval)
 
 
 def parse_windows_platform(platform_string: str) -> str:
@@ -92,6 +162,31 @@ def parse_windows_platform(platform_string: str) -> str:
         return platform_string
 
 
+@lru_cache(maxsize=1)
+def platform_info() -> Dict[str, str]:
+    """
+    Describe the host and interpreter, gathered once per process.
+    
+    platform.platform() and platform.uname() may read files, the registry or
+    spawn processes, so each is called only once per process and the result
+    cached. The architecture comes from the pointer size rather than
+    platform.architecture(), which runs `file` on the interpreter.
+    
+    Returns:
+        Dict with 'platform' (readable), 'platform_raw', 'processor',
+        'architecture' (e.g. '64bit') and 'hostname'
+    """
+    uname = platform.uname()
+    platform_raw = platform.platform()
+    return {
+        'platform': parse_windows_platform(platform_raw),
+        'platform_raw': platform_raw,
+        'processor': uname.processor,
+        'architecture': f"{struct.calcsize('P') * 8}bit",
+        'hostname': uname.node
+    }
+
+
 if __name__ == "__main__":
     # Simple test
     logging.basicConfig(level=logging.INFO)
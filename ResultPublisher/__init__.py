@@ -12,29 +12,30 @@ from .plugins.roboflow_destination import RoboflowDestination
 from .plugins.geti_destination import GetiDestination
 from .publisher import ResultPublisher
 
+# Destination classes by the type names accepted by ResultDestination()
+DESTINATION_CLASSES = {
+    'mqtt': MQTTDestination,
+    'webhook': WebhookDestination,
+    'serial': SerialDestination,
+    'file': FolderDestination,
+    'folder': FolderDestination,
+    'zmq': ZeroMQDestination,
+    'zeromq': ZeroMQDestination,
+    'opcua': OPCUADestination,
+    'opc-ua': OPCUADestination,
+    'ros2': ROS2Destination,
+    'ros': ROS2Destination,
+    'roboflow': RoboflowDestination,
+    'geti': GetiDestination,
+    'null': NullDestination
+}
+
 def ResultDestination(destination_type: str):
     """Factory function to create result destinations"""
-    destinations = {
-        'mqtt': MQTTDestination,
-        'webhook': WebhookDestination,
-        'serial': SerialDestination,
-        'file': FolderDestination,
-        'folder': FolderDestination,
-        'zmq': ZeroMQDestination,
-        'zeromq': ZeroMQDestination,
-        'opcua': OPCUADestination,
-        'opc-ua': OPCUADestination,
-        'ros2': ROS2Destination,
-        'ros': ROS2Destination,
-        'roboflow': RoboflowDestination,
-        'geti': GetiDestination,
-        'null': NullDestination
-    }
-    
-    if destination_type not in destinations:
-        raise ValueError(f"Unsupported destination type: {destination_type}. Available: {list(destinations.keys())}")
+    if destination_type not in DESTINATION_CLASSES:
+        raise ValueError(f"Unsupported destination type: {destination_type}. Available: {list(DESTINATION_CLASSES.keys())}")
     
-    return destinations[destination_type]()
+    return DESTINATION_CLASSES[destination_type]()
 
 def get_available_destination_types():
     """Get list of available destination types with metadata"""
@@ -166,6 +167,7 @@ def get_available_destination_types():
 
 __all__ = [
     'ResultDestination', 
+    'DESTINATION_CLASSES',
     'ResultPublisher',
     'BaseResultDestination',
     'MQTTDestination',
@@ -1,16 +1,27 @@
 import json
 import time
+import inspect
 import logging
 import socket
 import threading
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime
 
 
 class BaseResultDestination(ABC):
     """Base class for all result destinations"""
     
+    # Type name this destination is saved under and created from; subclasses
+    # that don't set one get their class name minus 'Destination', lowercased
+    type_name = None
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if 'type_name' not in cls.__dict__:
+            cls.type_name = cls.__name__.replace('Destination', '').lower()
+    
     def __init__(self):
         self.type = self.__class__.__name__
         self.logger = logging.getLogger(self.__class__.__name__)
@@ -98,6 +109,39 @@ class BaseResultDestination(ABC):
             ]
         }
 
+    @classmethod
+    @lru_cache(maxsize=None)
+    def _configure_parameters(cls) -> Tuple[frozenset, frozenset, bool]:
+        """Required and accepted configure() keywords, and whether it takes **kwargs"""
+        required, accepted, var_keyword = set(), set(), False
+        for name, param in inspect.signature(cls.configure).parameters.items():
+            if name == 'self':
+                continue
+            if param.kind == inspect.Parameter.VAR_KEYWORD:
+                var_keyword = True
+            elif param.kind in (inspect.Parameter.POSITIONAL_OR_KEYWORD, inspect.Parameter.KEYWORD_ONLY):
+                accepted.add(name)
+                if param.default is inspect.Parameter.empty:
+                    required.add(name)
+        return frozenset(required), frozenset(accepted), var_keyword
+    
+    @classmethod
+    def validate_config(cls, config: Dict[str, Any]) -> List[str]:
+        """
+        Check a configuration against the keywords configure() accepts.
+        
+        Args:
+            config: Keyword arguments that would be passed to configure()
+        
+        Returns:
+            List of error messages, empty if the configuration can be applied
+        """
+        required, accepted, var_keyword = cls._configure_parameters()
+        errors = [f"Missing required field: {name}" for name in sorted(required - config.keys())]
+        if not var_keyword:
+            errors.extend(f"Unknown field: {name}" for name in sorted(config.keys() - accepted))
+        return errors
+
     def __str__(self) -> str:
         status = "enabled" if self.enabled else "disabled"
         if self.failure_threshold_reached:
@@ -386,6 +430,14 @@ class BaseResultDestination(ABC):
         """Configure the destination"""
         pass
     
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the configure() arguments needed to recreate this destination
+        
+        Used when saving node settings; destinations that are not persisted
+        keep this default and are saved with an empty config.
+        """
+        return {}
+    
     @abstractmethod
     def _publish(self, data: Dict[str, Any]) -> bool:
         """Actual publish implementation"""
@@ -14,6 +14,9 @@ except ImportError:
 class FolderDestination(BaseResultDestination):
     """Folder/File result destination"""
     
+    # Type name this destination is saved under and created from
+    type_name = 'folder'
+    
     def __init__(self):
         super().__init__()
         self.folder_path_template = None  # Store the original folder path template with variables
@@ -105,6 +108,10 @@ class FolderDestination(BaseResultDestination):
             self.logger.error(f"Failed to create folder '{folder_path}': {str(e)}")
             self.is_configured = False
     
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the configure() arguments needed to recreate this destination"""
+        return {'folder_path': self.folder_path}
+    
     def _publish(self, data: Dict[str, Any]) -> bool:
         """Publish to folder as a JSON file"""
         import os
@@ -18,6 +18,9 @@ except ImportError:
 class GetiDestination(BaseResultDestination):
     """Geti result destination for uploading images to Geti platform"""
     
+    # Type name this destination is saved under and created from
+    type_name = 'geti'
+    
     def __init__(self):
         super().__init__()
         self.host = None
@@ -12,6 +12,9 @@ except ImportError:
 class MQTTDestination(BaseResultDestination):
     """MQTT result destination"""
     
+    # Type name this destination is saved under and created from
+    type_name = 'mqtt'
+    
     def __init__(self):
         super().__init__()
         self.client = None
@@ -119,6 +122,16 @@ class MQTTDestination(BaseResultDestination):
             self.is_configured = False
             # Don't raise - allow pipeline to continue without this destination
     
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the configure() arguments needed to recreate this destination"""
+        config = {'server': self.server, 'port': self.port, 'topic': self.topic}
+        if self.username:
+            config['username'] = self.username
+        if self.password:
+            config['password'] = self.password
+        config['include_image_data'] = self.include_image_data
+        return config
+    
     def _publish(self, data: Dict[str, Any]) -> bool:
         """Publish to MQTT topic"""
         try:
@@ -8,6 +8,9 @@ except ImportError:
 
 class NullDestination(BaseResultDestination):
     """A destination that does nothing (no-op)."""
+    
+    # Type name this destination is saved under and created from
+    type_name = 'null'
 
     @classmethod
     def get_config_schema(cls) -> Dict[str, Any]:
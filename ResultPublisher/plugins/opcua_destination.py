@@ -11,6 +11,9 @@ except ImportError:
 class OPCUADestination(BaseResultDestination):
     """OPC UA result destination"""
     
+    # Type name this destination is saved under and created from
+    type_name = 'opcua'
+    
     def __init__(self):
         super().__init__()
         self.client = None
@@ -17,6 +17,9 @@ except ImportError:
 class RoboflowDestination(BaseResultDestination):
     """Roboflow result destination for uploading images to Roboflow workspace"""
     
+    # Type name this destination is saved under and created from
+    type_name = 'roboflow'
+    
     def __init__(self):
         super().__init__()
         self.api_key = None
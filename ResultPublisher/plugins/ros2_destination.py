@@ -10,6 +10,9 @@ except ImportError:
 class ROS2Destination(BaseResultDestination):
     """ROS2 result destination"""
     
+    # Type name this destination is saved under and created from
+    type_name = 'ros2'
+    
     def __init__(self):
         super().__init__()
         self.node = None
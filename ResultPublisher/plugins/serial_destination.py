@@ -10,6 +10,9 @@ except ImportError:
 class SerialDestination(BaseResultDestination):
     """Serial port result destination"""
     
+    # Type name this destination is saved under and created from
+    type_name = 'serial'
+    
     def __init__(self):
         super().__init__()
         self.serial_port = None
@@ -80,6 +83,10 @@ class SerialDestination(BaseResultDestination):
             self.is_configured = False
             # Don't raise - allow pipeline to continue without this destination
     
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the configure() arguments needed to recreate this destination"""
+        return {'com_port': self.com_port, 'baud': self.baud_rate, 'include_image_data': self.include_image_data}
+    
     def _publish(self, data: Dict[str, Any]) -> bool:
         """Publish to serial port"""
         try:
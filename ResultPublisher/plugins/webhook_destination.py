@@ -10,6 +10,9 @@ except ImportError:
 class WebhookDestination(BaseResultDestination):
     """Webhook/HTTP POST result destination"""
     
+    # Type name this destination is saved under and created from
+    type_name = 'webhook'
+    
     def __init__(self):
         super().__init__()
         self.url_template = None  # Store the original URL template with variables
@@ -75,6 +78,10 @@ class WebhookDestination(BaseResultDestination):
         self.is_configured = True
         self.logger.info(f"Webhook configured: {url}")
     
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the configure() arguments needed to recreate this destination"""
+        return {'url': self.url, 'timeout': self.timeout, 'include_image_data': self.include_image_data}
+    
     def _publish(self, data: Dict[str, Any]) -> bool:
         """Publish to webhook URL"""
         try:
@@ -10,6 +10,9 @@ except ImportError:
 class ZeroMQDestination(BaseResultDestination):
     """ZeroMQ result destination"""
     
+    # Type name this destination is saved under and created from
+    type_name = 'zeromq'
+    
     def __init__(self):
         super().__init__()
         self.socket = None
@@ -11,8 +11,6 @@ def main():
     # Add the current directory to the path to ensure imports work
     sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
     
-    # Import and run the inference node
-    from InferenceNode.inference_node import InferenceNode
     import argparse
     
     parser = argparse.ArgumentParser(description='InferNode - Scalable Inference Platform')
@@ -24,6 +22,9 @@ def main():
     
     args = parser.parse_args()
     
+    # Imported after argument parsing so --help doesn't load the node's dependencies
+    from InferenceNode.inference_node import InferenceNode
+    
     # Create node
     node = InferenceNode(args.name, port=args.port)
     